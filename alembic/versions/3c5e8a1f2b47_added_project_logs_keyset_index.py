@@ -0,0 +1,28 @@
+"""Added project_logs keyset index
+
+Revision ID: 3c5e8a1f2b47
+Revises: 6998458c4487
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5e8a1f2b47'
+down_revision: Union[str, None] = '6998458c4487'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_project_logs_project_time', 'project_logs', ['project_id', 'log_time', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_project_logs_project_time', table_name='project_logs')
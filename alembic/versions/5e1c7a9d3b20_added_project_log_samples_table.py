@@ -0,0 +1,46 @@
+"""Added project_log_samples table
+
+Revision ID: 5e1c7a9d3b20
+Revises: 7b2d9e4c1a63
+Create Date: 2026-10-19 14:21:40.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1c7a9d3b20'
+down_revision: Union[str, None] = '7b2d9e4c1a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('project_log_samples',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('fingerprint', sa.String(length=16), nullable=False),
+    sa.Column('window_start', sa.DateTime(), nullable=False),
+    sa.Column('log_level', sa.String(), nullable=False),
+    sa.Column('template', sa.String(), nullable=False),
+    sa.Column('message', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('first_seen', sa.DateTime(), nullable=True),
+    sa.Column('last_seen', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('project_id', 'fingerprint', 'window_start', name='uq_project_log_samples_window')
+    )
+    op.create_index(op.f('ix_project_log_samples_id'), 'project_log_samples', ['id'], unique=False)
+    op.create_index('ix_project_log_samples_project_seen', 'project_log_samples', ['project_id', 'last_seen'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_project_log_samples_project_seen', table_name='project_log_samples')
+    op.drop_index(op.f('ix_project_log_samples_id'), table_name='project_log_samples')
+    op.drop_table('project_log_samples')
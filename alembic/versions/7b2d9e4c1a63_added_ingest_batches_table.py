@@ -0,0 +1,36 @@
+"""Added ingest_batches table
+
+Revision ID: 7b2d9e4c1a63
+Revises: 3c5e8a1f2b47
+Create Date: 2026-10-19 13:02:17.552910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2d9e4c1a63'
+down_revision: Union[str, None] = '3c5e8a1f2b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ingest_batches',
+    sa.Column('batch_id', sa.String(length=64), nullable=False),
+    sa.Column('last_seq', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('batch_id')
+    )
+    op.create_index(op.f('ix_ingest_batches_created_at'), 'ingest_batches', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_ingest_batches_created_at'), table_name='ingest_batches')
+    op.drop_table('ingest_batches')
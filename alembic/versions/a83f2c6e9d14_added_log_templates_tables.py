@@ -0,0 +1,54 @@
+"""Added log_templates tables and project_logs.template_id
+
+Revision ID: a83f2c6e9d14
+Revises: 5e1c7a9d3b20
+Create Date: 2026-10-19 15:04:12.906531
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83f2c6e9d14'
+down_revision: Union[str, None] = '5e1c7a9d3b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('log_templates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('log_level', sa.String(), nullable=False),
+    sa.Column('template', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('first_seen', sa.DateTime(), nullable=True),
+    sa.Column('last_seen', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_log_templates_id'), 'log_templates', ['id'], unique=False)
+    op.create_index('ix_log_templates_project_level', 'log_templates', ['project_id', 'log_level'], unique=False)
+    op.create_table('log_template_counts',
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['template_id'], ['log_templates.id'], ),
+    sa.PrimaryKeyConstraint('template_id', 'hour')
+    )
+    op.add_column('project_logs', sa.Column('template_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_project_logs_template_id'), 'project_logs', ['template_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_project_logs_template_id'), table_name='project_logs')
+    op.drop_column('project_logs', 'template_id')
+    op.drop_table('log_template_counts')
+    op.drop_index('ix_log_templates_project_level', table_name='log_templates')
+    op.drop_index(op.f('ix_log_templates_id'), table_name='log_templates')
+    op.drop_table('log_templates')
@@ -0,0 +1,47 @@
+"""Added structured fields to project_logs
+
+Revision ID: c41d8b7e2f95
+Revises: a83f2c6e9d14
+Create Date: 2026-10-19 16:12:33.481920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8b7e2f95'
+down_revision: Union[str, None] = 'a83f2c6e9d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('project_logs', sa.Column('context', sa.String(), nullable=True))
+    op.add_column('project_logs', sa.Column('controller', sa.String(), nullable=True))
+    op.add_column('project_logs', sa.Column('line_number', sa.Integer(), nullable=True))
+    op.add_column('project_logs', sa.Column('file_path', sa.String(), nullable=True))
+    # Normalize stored levels the same way new rows are normalized at ingest
+    op.execute("UPDATE project_logs SET log_level = UPPER(TRIM(log_level))")
+    for level, aliases in {
+        'DEBUG': ('TRACE', 'VERBOSE', 'FINE', 'FINER', 'FINEST'),
+        'INFO': ('NOTICE', 'INFORMATION', 'LOG', 'CONFIG'),
+        'WARNING': ('WARN',),
+        'ERROR': ('ERR', 'SEVERE'),
+        'CRITICAL': ('CRIT', 'FATAL', 'ALERT', 'EMERGENCY', 'EMERG', 'PANIC'),
+    }.items():
+        names = ", ".join(f"'{alias}'" for alias in aliases)
+        op.execute(f"UPDATE project_logs SET log_level = '{level}' WHERE log_level IN ({names})")
+    op.create_index('ix_project_logs_project_level_time', 'project_logs', ['project_id', 'log_level', 'log_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_project_logs_project_level_time', table_name='project_logs')
+    op.drop_column('project_logs', 'file_path')
+    op.drop_column('project_logs', 'line_number')
+    op.drop_column('project_logs', 'controller')
+    op.drop_column('project_logs', 'context')
@@ -0,0 +1,30 @@
+"""Added project_logs controller and file_path indexes
+
+Revision ID: d92e5f1a7c38
+Revises: c41d8b7e2f95
+Create Date: 2026-10-19 16:58:07.127645
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd92e5f1a7c38'
+down_revision: Union[str, None] = 'c41d8b7e2f95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_project_logs_project_controller_time', 'project_logs', ['project_id', 'controller', 'log_time'], unique=False)
+    op.create_index('ix_project_logs_project_file_time', 'project_logs', ['project_id', 'file_path', 'log_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_project_logs_project_file_time', table_name='project_logs')
+    op.drop_index('ix_project_logs_project_controller_time', table_name='project_logs')
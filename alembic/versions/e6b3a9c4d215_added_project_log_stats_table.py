@@ -0,0 +1,45 @@
+"""Added project_log_stats table
+
+Revision ID: e6b3a9c4d215
+Revises: d92e5f1a7c38
+Create Date: 2026-10-19 17:41:55.603218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b3a9c4d215'
+down_revision: Union[str, None] = 'd92e5f1a7c38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('project_log_stats',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('level', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('last_log_time', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('project_id', 'hour', 'level')
+    )
+    op.create_index('ix_project_log_stats_level_hour', 'project_log_stats', ['level', 'hour'], unique=False)
+    # Backfill from the logs already stored
+    op.execute(
+        "INSERT INTO project_log_stats (project_id, hour, level, count, last_log_time) "
+        "SELECT project_id, strftime('%Y-%m-%d %H:00:00.000000', log_time), log_level, COUNT(*), MAX(log_time) "
+        "FROM project_logs WHERE log_time IS NOT NULL "
+        "GROUP BY project_id, strftime('%Y-%m-%d %H:00:00.000000', log_time), log_level"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_project_log_stats_level_hour', table_name='project_log_stats')
+    op.drop_table('project_log_stats')
@@ -1,145 +1,319 @@
-from fastapi import APIRouter,Depends
+import os
+import json
+import math
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Optional, Tuple
+from fastapi import APIRouter,Depends,Query,Request,Response,WebSocket,WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from ..services.project_service import get_all_projects
 from sqlalchemy.orm import Session
 from ..core.database import get_db
 from ..schemas.monitoring_schema import MonitoringData
-from ..services.project_log_service import create_project_logs_batch
-from ..schemas.project_log_schema import ProjectLogCreate
-from ..services.system_metric_service import create_system_metric, get_system_metrics_last_30_days
-from ..schemas.system_metric_schema import SystemMetricCreate
-from ..services.service_worker_service import update_worker_from_agent,get_all_workers
-from ..schemas.service_worker_schema import ServiceWorkerUpdateAgent
+from ..services.monitoring_service import (
+    ingest_monitoring_data,
+    ingest_system_metric,
+    ingest_services,
+    parse_log_type,
+    parse_stream_log_record,
+    prepare_project_logs,
+    store_project_log_chunk,
+    LogChunk,
+)
+from ..schemas.monitoring_schema import SystemMetrics, ServiceStatus, LogEntry
+from ..core.database import SessionLocal
+from ..services.system_metric_service import get_system_metrics_last_30_days, iter_system_metric_export, METRIC_EXPORT_COLUMNS
+from ..services.project_log_service import iter_log_project_export, LOG_EXPORT_COLUMNS
+from ..services.service_worker_service import get_all_workers
 from ..services.threshold_monitor import run_threshold_monitoring, get_threshold_monitoring_status
 from ..services.alarm_service import create_alarm
 from ..schemas.alarm_schema import AlarmCreate
-from datetime import datetime
 from ..core.logging_config import get_logger
+from ..utils.payload_codec import decode_body, is_msgpack, unpack_msgpack, iter_ndjson_lines
+from ..utils.entity_cache import entity_cache, PROJECTS, WORKERS
+from ..utils.rate_limiter import ingest_limiter, RateLimited
+from ..services.ingest_batch_service import BatchInFlight
+from ..services.log_archive_service import log_archive
+from ..services.log_partition_service import log_partitions
+from ..utils.export_codec import EXPORT_MEDIA_TYPES, check_export_format, encode_export, export_filename
+from ..utils.db_context import db_context
 
 logger = get_logger("app.api")
 router = APIRouter()
 
+# Rows written per transaction by /api/logs/stream
+LOG_STREAM_CHUNK_SIZE = int(os.getenv('LOG_STREAM_CHUNK_SIZE', '500'))
+
+# Agent WebSocket channel: ack batching and the report interval pushed to agents
+AGENT_WS_ACK_INTERVAL = float(os.getenv('AGENT_WS_ACK_INTERVAL', '1'))
+AGENT_WS_ACK_BATCH = int(os.getenv('AGENT_WS_ACK_BATCH', '100'))
+AGENT_REPORT_INTERVAL = int(os.getenv('AGENT_REPORT_INTERVAL', '30'))
+
+# Longest a streaming ingest waits for rate limit tokens before answering 429
+INGEST_MAX_WAIT = float(os.getenv('INGEST_MAX_WAIT', '5'))
+
+def _agent_source(connection) -> Tuple[str, str]:
+    """
+    Rate limit key and log label of the sending agent.
+
+    The key is the peer address: the X-Agent-Id header is chosen by the
+    client, so it only names the agent in log messages.
+    """
+    peer = connection.client.host if connection.client else "unknown"
+    agent_id = connection.headers.get("x-agent-id")
+    return peer, f"{agent_id} ({peer})" if agent_id else peer
+
+def _lines_by_project(entries) -> Dict[int, int]:
+    counts = {}
+    for entry in entries:
+        counts[entry.project_id] = counts.get(entry.project_id, 0) + 1
+    return counts
+
+@asynccontextmanager
+async def ingest_slot(peer: str, lines_by_project: Dict[int, int], max_wait: float = 0, label: Optional[str] = None):
+    """
+    Hold an ingest slot from the rate limiter while storing a batch.
+
+    Waits for tokens up to ``max_wait`` seconds, which slows a streaming
+    sender down instead of failing it, and raises RateLimited after that.
+    """
+    deadline = time.monotonic() + max_wait
+    while True:
+        try:
+            ingest_limiter.acquire(peer, lines_by_project, label)
+            break
+        except RateLimited as e:
+            if time.monotonic() + e.retry_after > deadline:
+                raise
+            await asyncio.sleep(e.retry_after)
+    try:
+        yield
+    finally:
+        ingest_limiter.release()
+
+def _rate_limited_response(error: RateLimited, **extra) -> JSONResponse:
+    limit = error.to_dict()
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(limit["retry_after"])},
+        content={"status": "error", "message": f"Rate limited: {error.reason}", "limit": limit, **extra},
+    )
+
+async def read_monitoring_data(request: Request) -> MonitoringData:
+    """Parse an agent report sent as JSON or msgpack, optionally gzip/zstd compressed"""
+    body = decode_body(await request.body(), request.headers.get("content-encoding", ""))
+    try:
+        if is_msgpack(request.headers.get("content-type", "")):
+            return MonitoringData.model_validate(unpack_msgpack(body))
+        return MonitoringData.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors()) from e
+
+def _alarm_details(created_alarms) -> list:
+    return [
+        {
+            "id": alarm.id,
+            "title": alarm.title,
+            "severity": alarm.severity,
+            "source": alarm.source
+        } for alarm in created_alarms
+    ]
+
 @router.post("/api/monitoring-data")
-async def store_monitoring(data : MonitoringData,db:Session=Depends(get_db)):
-    created_alarms = []
+async def store_monitoring(request: Request, lean: bool = False, db:Session=Depends(get_db)):
+    """
+    Store an agent report.
+
+    Accepts JSON or ``application/msgpack`` bodies with an optional
+    ``Content-Encoding`` of gzip or zstd. With ``?lean=true`` the response
+    only carries ids and counts instead of echoing the report back.
+
+    Reports over the agent or project log rate, arriving while the ingest
+    queue is full, or retried while the original is still being stored, are
+    answered with 429 and a Retry-After header.
+    """
+    data = await read_monitoring_data(request)
+    lines_by_project = {}
+    for log_type, entries in data.logs.items():
+        project_id = parse_log_type(log_type)
+        if project_id is not None:
+            lines_by_project[project_id] = lines_by_project.get(project_id, 0) + len(entries)
     
+    peer, agent_label = _agent_source(request)
     try:
-        # 1. Insert logs
-        all_log_entries = []
-        for log_type in data.logs.keys():
-            try:
-                # Split dengan limit untuk handle project_id yang mungkin ada underscore
-                parts = log_type.split("_", 1)
-                if len(parts) != 2:
-                    error_msg = f"Invalid log_type format: {log_type}, expected 'framework_projectid'"
-                    logger.warning(error_msg)
-                    continue
-                
-                fw_type, project_id_str = parts
-                project_id = int(project_id_str)
-                
-                # Process all logs for this log_type
-                logs = data.logs.get(log_type, [])
-                for log in logs:
-                    log_entry = ProjectLogCreate(
-                        log_level=log.level,
-                        log_time=log.timestamp,
-                        project_id=project_id,
-                        message=log.message
-                    )
-                    all_log_entries.append(log_entry)
-                
-                
-                logger.debug(f"Prepared {len(logs)} logs for {log_type} (project_id: {project_id})")
-                
-            except (ValueError, TypeError) as e:
-                error_msg = f"Error processing log_type '{log_type}': {e}"
-                logger.warning(error_msg)
-                continue
-        
-        # Batch insert all logs at once
-        inserted_logs = []
-        if all_log_entries:
-            try:
-                inserted_logs = create_project_logs_batch(db, all_log_entries)
-            except Exception as e:
-                logger.error(f"Failed to batch insert logs: {e}")
-                # Don't fail the entire request, continue with other operations
-        else:
-            logger.info("No valid log entries to insert")
-        
-        # 2. Insert system metric
-        system_metrics_dict = data.system_metrics.model_dump() if hasattr(data.system_metrics, "dict") else dict(data.system_metrics)
-        if isinstance(system_metrics_dict["timestamp"], str):
-        # convert to datetime jika masih string dan belum ISO
-            system_metrics_dict["timestamp"] = datetime.fromisoformat(system_metrics_dict["timestamp"])
-        
-        # Create system metric
-        system_metric = create_system_metric(
-            db,
-            SystemMetricCreate.model_validate(system_metrics_dict)
+        async with ingest_slot(peer, lines_by_project, label=agent_label):
+            result = await run_in_threadpool(ingest_monitoring_data, db, data)
+    except RateLimited as e:
+        return _rate_limited_response(e)
+    except BatchInFlight as e:
+        return JSONResponse(
+            status_code=429,
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+            content={"status": "error", "message": str(e)},
         )
-        logger.info(f"Created system metric: {system_metric.id}")
-        
-        # 3. Update service workers
-        for sw in data.services:
-            update_worker_from_agent(
-                db,
-                sw.name,  # Pass the worker's ID (int) instead of name (str)
-                ServiceWorkerUpdateAgent(
-                    name=sw.name,
-                    description=sw.name,
-                    is_monitoring=True,
-                    is_enabled=sw.enabled,
-                    status=sw.status)
-            )
-        
-        # 4. THRESHOLD MONITORING - Check thresholds and create alarms
-        logger.info("Running threshold monitoring...")
-        
-        # Run threshold monitoring to check for violations using the same db session
-        run_threshold_monitoring()
-        
-        
-        return {
-            "status": "ok", 
-            "message": "Store Monitoring", 
-            "data": data,
-            "monitoring_result": {
-                "system_metric_id": system_metric.id,
-                "alarms_created": len(created_alarms),
-                "alarm_details": [
-                    {
-                        "id": alarm.id,
-                        "title": alarm.title,
-                        "severity": alarm.severity,
-                        "source": alarm.source
-                    } for alarm in created_alarms
-                ] if created_alarms else []
-            }
-        }
-        
     except Exception as e:
         logger.error(f"Error processing monitoring data: {str(e)}")
         # Still return success for data storage, but log the threshold monitoring error
         return {
             "status": "ok", 
             "message": "Store Monitoring (threshold monitoring failed)", 
-            "data": data,
+            **({} if lean else {"data": data}),
             "monitoring_result": {
                 "error": str(e),
                 "alarms_created": 0
             }
         }
+    
+    created_alarms = result["created_alarms"]
+    if lean:
+        return {
+            "status": "ok",
+            "message": "Store Monitoring",
+            "monitoring_result": {
+                "system_metric_id": result["system_metric_id"],
+                "duplicate": result["duplicate"],
+                "log_ids": result["log_ids"],
+                "logs_received": result["logs_received"],
+                "logs_inserted": result["logs_inserted"],
+                "workers_updated": result["workers_updated"],
+                "alarms_created": len(created_alarms),
+                "alarm_ids": [alarm.id for alarm in created_alarms],
+            }
+        }
+    
+    return {
+        "status": "ok", 
+        "message": "Store Monitoring", 
+        "data": data,
+        "monitoring_result": {
+            "system_metric_id": result["system_metric_id"],
+            "duplicate": result["duplicate"],
+            "alarms_created": len(created_alarms),
+            "alarm_details": _alarm_details(created_alarms)
+        }
+    }
+
+@router.post("/api/logs/stream")
+async def stream_logs(request: Request, batch_id: Optional[str] = None):
+    """
+    Ingest newline-delimited JSON log records from a streamed request body.
+
+    Each line is a log entry with either ``project_id`` or ``log_type``
+    ('framework_projectid'). Records are written in chunks of
+    LOG_STREAM_CHUNK_SIZE and the body is only read further once the previous
+    chunk is committed, so memory stays flat for any backlog size.
+
+    Records with a ``seq`` and a ``batch_id`` (per record or for the whole
+    body) that were already stored are skipped and counted as duplicates.
+
+    Each chunk waits for rate limit tokens, which slows the sender down. If
+    they are not available within INGEST_MAX_WAIT seconds the stream stops
+    with 429 and the counts stored so far.
+    """
+    received = inserted = rejected = failed = duplicates = 0
+    errors = []
+    chunk = LogChunk()
+    peer, agent_label = _agent_source(request)
+    
+    async def flush():
+        nonlocal inserted, failed
+        async with ingest_slot(peer, _lines_by_project(chunk.entries), INGEST_MAX_WAIT, agent_label):
+            pending = chunk.take()
+            try:
+                inserted += await run_in_threadpool(store_project_log_chunk, pending)
+            except Exception as e:
+                logger.error(f"Failed to store streamed log chunk: {e}")
+                failed += len(pending)
+                if len(errors) < 10:
+                    errors.append(f"chunk of {len(pending)} records failed: {e}")
+    
+    def summary():
+        return {
+            "received": received,
+            "inserted": inserted,
+            "rejected": rejected,
+            "duplicates": duplicates,
+            "failed": failed,
+            "errors": errors,
+        }
+    
+    try:
+        async for line in iter_ndjson_lines(request.stream(), request.headers.get("content-encoding", "")):
+            received += 1
+            try:
+                if not line:
+                    raise ValueError("record too large")
+                if not chunk.add_record(parse_stream_log_record(line), batch_id):
+                    duplicates += 1
+                    continue
+            except ValueError as e:
+                rejected += 1
+                if len(errors) < 10:
+                    errors.append(f"line {received}: {str(e).splitlines()[0]}")
+                continue
+            
+            if len(chunk) >= LOG_STREAM_CHUNK_SIZE:
+                await flush()
+        
+        if chunk:
+            await flush()
+    except RateLimited as e:
+        logger.warning(f"Log stream from {agent_label} stopped after {inserted} records: {e.reason}")
+        return _rate_limited_response(e, result=summary())
+    
+    logger.info(f"Log stream stored {inserted}/{received} records ({rejected} rejected, {duplicates} duplicates, {failed} failed)")
+    return {
+        "status": "ok" if not failed else "partial",
+        "message": "Log stream stored",
+        "result": summary()
+    }
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def _versioned_list(request: Request, response: Response, entity: str, since: Optional[int], load_all: Callable[[], list]):
+    """
+    Serve an agent-facing config list with a strong ETag and delta sync.
+
+    With ``since`` only rows changed or deleted after that version are
+    returned; ``full`` tells the agent whether it got the whole list instead
+    (unknown or expired version).
+    """
+    version = entity_cache.version(entity)
+    changes = entity_cache.changes_since(entity, since) if since is not None else None
+    etag = f'"{entity}-{version}"' if changes is None else f'"{entity}-{version}-{since}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    rows = load_all()
+    if changes is None:
+        return {"message" : "OK", "data" : rows, "version": version, "full": True}
+
+    changed, deleted = changes
+    return {
+        "message" : "OK",
+        "data" : [row for row in rows if row.id in changed],
+        "deleted": sorted(deleted),
+        "version": version,
+        "full": False,
+    }
 
 @router.get("/api/projects")
-def get_log_path(db:Session = Depends(get_db)):
-    projects = get_all_projects(db)
-    return {"message" : "OK", "data" : projects}
+def get_log_path(request: Request, response: Response, since: Optional[int] = None, db:Session = Depends(get_db)):
+    return _versioned_list(request, response, PROJECTS, since, lambda: get_all_projects(db))
 
 @router.get("/api/workers")
-def get_workers(db:Session = Depends(get_db)):
-    workers = get_all_workers(db)
-    return {"message" : "OK", "data" : workers}
+def get_workers(request: Request, response: Response, since: Optional[int] = None, db:Session = Depends(get_db)):
+    return _versioned_list(request, response, WORKERS, since, lambda: get_all_workers(db))
 
 @router.post("/api/threshold/check")
 async def manual_threshold_check():
@@ -199,6 +373,276 @@ async def threshold_monitoring_status():
             }
         }
 
+class AgentChannel:
+    """
+    State of one agent WebSocket connection.
+
+    Frames are JSON text (or msgpack binary) objects with a ``type`` and an
+    optional increasing ``seq``:
+
+    - ``report``: a full MonitoringData document
+    - ``metric``: ``data`` is SystemMetrics
+    - ``logs``: ``logs`` is grouped like MonitoringData.logs, with an
+      optional ``batch_id``
+    - ``log``: the frame itself is one /api/logs/stream record
+    - ``services``: ``services`` is a list of ServiceStatus
+    - ``ping``: answered with ``pong``
+
+    Log records are buffered and committed in chunks, waiting for rate limit
+    tokens (the socket is not read meanwhile). An ``ack`` with the
+    highest stored ``seq`` is sent every AGENT_WS_ACK_INTERVAL seconds or
+    AGENT_WS_ACK_BATCH frames, after pending logs are committed. Otherwise a
+    ``nack`` up to ``seq`` lists the log frames that are not stored: the
+    ``pending`` ones were rate limited and stay buffered for the next ack,
+    the ``failed`` ones must be resent. A log frame arriving while a full
+    buffer is rate limited is rejected in ``errors``. Project and
+    worker changes are pushed as ``config`` frames. Log frames and reports
+    already stored under their batch id are acknowledged without storing
+    them again; a report whose batch is still being stored after
+    INGEST_MAX_WAIT is rejected in ``errors`` and must be resent.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.peer, self.agent_label = _agent_source(websocket)
+        self.send_lock = asyncio.Lock()
+        self.log_buffer = LogChunk()
+        self.unacked = 0
+        self.last_seq = None
+        # Seqs of log frames in the buffer, and of frames whose chunk failed
+        self.pending_seqs = []
+        self.failed_seqs = []
+        self.errors = []
+        self.ack_deadline = time.monotonic() + AGENT_WS_ACK_INTERVAL
+
+    async def send(self, message: dict):
+        async with self.send_lock:
+            await self.websocket.send_json(message)
+
+    async def send_config(self, *_):
+        def load():
+            db = SessionLocal()
+            try:
+                return {
+                    "projects": [project.model_dump(mode="json") for project in get_all_projects(db)],
+                    "workers": [worker.model_dump(mode="json") for worker in get_all_workers(db)],
+                }
+            finally:
+                db.close()
+        
+        config = await run_in_threadpool(load)
+        await self.send({
+            "type": "config",
+            "interval": AGENT_REPORT_INTERVAL,
+            "versions": {entity: entity_cache.version(entity) for entity in (PROJECTS, WORKERS)},
+            **config,
+        })
+
+    async def handle(self, frame: dict):
+        frame_type = frame.get("type")
+        if frame_type == "ping":
+            await self.send({"type": "pong"})
+            return
+        if frame_type in ("log", "logs"):
+            if len(self.log_buffer) >= LOG_STREAM_CHUNK_SIZE:
+                await self.flush_logs()
+            if frame_type == "log":
+                self.log_buffer.add_record(parse_stream_log_record(json.dumps(frame)))
+            else:
+                logs = {key: [LogEntry.model_validate(entry) for entry in entries] for key, entries in frame.get("logs", {}).items()}
+                self.log_buffer.add_group(prepare_project_logs(logs), frame.get("batch_id"))
+            if frame.get("seq") is not None:
+                self.pending_seqs.append(frame["seq"])
+            return
+        elif frame_type == "metric":
+            await self.flush_logs()
+            await run_in_threadpool(ingest_system_metric, SystemMetrics.model_validate(frame.get("data")))
+        elif frame_type == "services":
+            services = [ServiceStatus.model_validate(service) for service in frame.get("services", [])]
+            await run_in_threadpool(ingest_services, services)
+        elif frame_type == "report":
+            await self.flush_logs()
+            report = MonitoringData.model_validate(frame.get("data"))
+            
+            def store_report():
+                db = SessionLocal()
+                try:
+                    return ingest_monitoring_data(db, report)
+                finally:
+                    db.close()
+            
+            async with ingest_slot(self.peer, _lines_by_project(prepare_project_logs(report.logs)),
+                                   INGEST_MAX_WAIT, self.agent_label):
+                await run_in_threadpool(store_report)
+        else:
+            raise ValueError(f"Unknown frame type: {frame_type}")
+
+    async def flush_logs(self):
+        """Commit buffered log frames; when rate limited they stay in the buffer"""
+        if self.log_buffer.entries or self.log_buffer.marks:
+            async with ingest_slot(self.peer, _lines_by_project(self.log_buffer.entries), INGEST_MAX_WAIT, self.agent_label):
+                chunk, seqs = self.log_buffer.take(), self.pending_seqs
+                self.pending_seqs = []
+                try:
+                    await run_in_threadpool(store_project_log_chunk, chunk)
+                except Exception:
+                    self.failed_seqs.extend(seqs)
+                    raise
+
+    async def ack(self):
+        self.ack_deadline = time.monotonic() + AGENT_WS_ACK_INTERVAL
+        if not self.unacked and not self.errors:
+            return
+        nack = {}
+        try:
+            await self.flush_logs()
+        except RateLimited as e:
+            logger.warning(f"Agent {self.agent_label} log frames rate limited: {e.reason}")
+            nack = {"error": f"Rate limited: {e.reason}", "limit": e.to_dict()}
+        except Exception as e:
+            logger.error(f"Failed to store agent log frames: {e}")
+            nack = {"error": str(e)}
+        if nack or self.failed_seqs:
+            await self.send({
+                "type": "nack", "seq": self.last_seq, "pending": list(self.pending_seqs),
+                "failed": self.failed_seqs, "error": "Log frames not stored", "errors": self.errors, **nack,
+            })
+            self.failed_seqs = []
+        else:
+            await self.send({"type": "ack", "seq": self.last_seq, "count": self.unacked, "errors": self.errors})
+        self.unacked = 0
+        self.errors = []
+
+@router.websocket("/api/agent/ws")
+async def agent_channel(websocket: WebSocket):
+    """Persistent ingest channel for agents, see AgentChannel for the protocol"""
+    await websocket.accept()
+    channel = AgentChannel(websocket)
+    
+    def on_config_change(entity, version):
+        if entity in (PROJECTS, WORKERS):
+            asyncio.ensure_future(channel.send_config())
+    
+    unsubscribe = entity_cache.changes.subscribe(on_config_change)
+    try:
+        await channel.send_config()
+        while True:
+            timeout = max(channel.ack_deadline - time.monotonic(), 0)
+            try:
+                message = await asyncio.wait_for(websocket.receive(), timeout=timeout)
+            except asyncio.TimeoutError:
+                await channel.ack()
+                continue
+            
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            frame = None
+            try:
+                if message.get("bytes") is not None:
+                    frame = unpack_msgpack(message["bytes"])
+                else:
+                    frame = json.loads(message.get("text") or "")
+                if not isinstance(frame, dict):
+                    raise ValueError("Frame must be an object")
+                await channel.handle(frame)
+                if frame.get("seq") is not None:
+                    channel.last_seq = frame["seq"]
+            except Exception as e:
+                detail = getattr(e, "detail", None) or str(e).splitlines()[0]
+                channel.errors.append({"seq": frame.get("seq") if isinstance(frame, dict) else None, "error": detail})
+            channel.unacked += 1
+            
+            if channel.unacked >= AGENT_WS_ACK_BATCH:
+                await channel.ack()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        unsubscribe()
+        try:
+            await channel.flush_logs()
+        except Exception as e:
+            logger.error(f"Failed to store agent log frames on disconnect: {e}")
+
+@router.get("/api/cache/stats")
+def cache_stats():
+    """Get entity cache versions and hit/miss counters"""
+    return {
+        "status": "ok",
+        "message": "Cache statistics",
+        "data": entity_cache.get_stats()
+    }
+
+@router.get("/api/ingest/limits")
+def ingest_limits():
+    """Get ingest rate limiter buckets and rejection counters"""
+    return {
+        "status": "ok",
+        "message": "Ingest rate limits",
+        "data": ingest_limiter.get_stats()
+    }
+
+@router.get("/api/logs/archive")
+def log_archive_stats():
+    """Get archived log days and rows per project"""
+    return {
+        "status": "ok",
+        "message": "Log archive",
+        "data": log_archive.get_stats()
+    }
+
+@router.get("/api/logs/partitions")
+def log_partition_stats():
+    """Get log partition files and their time ranges"""
+    return {
+        "status": "ok",
+        "message": "Log partitions",
+        "data": log_partitions.get_stats()
+    }
+
+# Query parameters of the export endpoints that are not QueryAdapter filters
+EXPORT_PARAMS = ("project_id", "format", "gzip")
+
+def _export_response(rows, columns: dict, export_format: str, compress: bool, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        encode_export(rows, columns, export_format, compress),
+        media_type="application/gzip" if compress else EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(name, export_format, compress)}"'},
+    )
+
+@router.get("/api/logs/export")
+def export_project_logs(
+    request: Request,
+    project_id: int,
+    export_format: str = Query("csv", alias="format"),
+    gzip: bool = False,
+):
+    """Stream a project's logs as CSV, NDJSON or Parquet, with QueryAdapter filters"""
+    check_export_format(export_format)
+    query_params = {key: value for key, value in request.query_params.items() if key not in EXPORT_PARAMS}
+
+    def rows():
+        with db_context() as db:
+            yield from iter_log_project_export(db, project_id, query_params)
+
+    return _export_response(rows(), LOG_EXPORT_COLUMNS, export_format, gzip, f"project-{project_id}-logs")
+
+@router.get("/api/metrics/export")
+def export_system_metrics(
+    request: Request,
+    export_format: str = Query("csv", alias="format"),
+    gzip: bool = False,
+):
+    """Stream system metrics as CSV, NDJSON or Parquet, with QueryAdapter filters"""
+    check_export_format(export_format)
+    query_params = {key: value for key, value in request.query_params.items() if key not in EXPORT_PARAMS}
+
+    def rows():
+        with db_context() as db:
+            yield from iter_system_metric_export(db, query_params)
+
+    return _export_response(rows(), METRIC_EXPORT_COLUMNS, export_format, gzip, "system-metrics")
+
 @router.get("/api/metrics/recent")
 async def get_recent_metrics(db: Session = Depends(get_db)):
     """Get recent metrics for debugging threshold monitoring"""
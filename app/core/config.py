@@ -1,7 +1,17 @@
 
 import os
 from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
 
 load_dotenv()
 
 DB_URL = os.getenv("DATABASE_URL", "sqlite:///./log.db")
+
+
+def path_next_to_db(name: str) -> str:
+    """Absolute path of ``name`` in the SQLite database file's directory (the working directory otherwise)"""
+    url = make_url(DB_URL)
+    database = url.database if url.get_backend_name() == "sqlite" else None
+    if not database or database == ":memory:":
+        return os.path.abspath(name)
+    return os.path.join(os.path.dirname(os.path.abspath(database)), name)
@@ -15,12 +15,32 @@ from app.ui.user import user_management
 from app.ui.profile import profile_page
 from app.api.route import router
 from app.core.logging_config import setup_logging
+from app.utils.agent_controller import agent_client
+from app.utils.agent_health import agent_health
+from app.services.alarm_counter import active_alarm_counter
+from app.services.ingest_batch_service import recent_batches
+from app.services.log_template_service import log_template_miner
+from app.services.log_archive_service import log_archive
+from app.services.log_partition_service import log_partitions
 
 # Initialize logging
 logger = setup_logging()
 logger.info("Starting Devopin Community Backend")
 
 app.include_router(router)
+app.on_startup(agent_health.start)
+app.on_startup(active_alarm_counter.load)
+app.on_startup(recent_batches.load)
+app.on_startup(log_partitions.load)
+app.on_startup(log_template_miner.start)
+app.on_startup(log_archive.start)
+app.on_startup(log_partitions.start)
+app.on_shutdown(agent_health.stop)
+app.on_shutdown(log_template_miner.stop)
+app.on_shutdown(log_archive.stop)
+app.on_shutdown(log_partitions.stop)
+app.on_shutdown(agent_client.close)
+
 @ui.page("/")
 def index():
     ui.navigate.to("/login")
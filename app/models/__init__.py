@@ -4,4 +4,9 @@ from .user import User
 from .service_worker import ServiceWorker
 from .system_metric import SystemMetric
 from .alarm import Alarm
-from .threshold import Threshold
\ No newline at end of file
+from .threshold import Threshold
+from .ingest_batch import IngestBatch
+from .project_log_sample import ProjectLogSample
+from .log_template import LogTemplate
+from .log_template_count import LogTemplateCount
+from .project_log_stat import ProjectLogStat
\ No newline at end of file
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime, timezone
+from app.core.database import Base
+
+
+class IngestBatch(Base):
+    """Recently stored agent batches, used to skip retried uploads"""
+    __tablename__ = "ingest_batches"
+
+    batch_id = Column(String(64), primary_key=True)
+    # Highest record sequence stored for streamed batches, NULL for whole reports
+    last_seq = Column(Integer)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
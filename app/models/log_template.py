@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from app.core.database import Base
+
+class LogTemplate(Base):
+    """Message template mined from a project's logs, '<*>' marks variable tokens"""
+    __tablename__ = "log_templates"
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    log_level = Column(String, nullable=False)
+    template = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    first_seen = Column(DateTime)
+    last_seen = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_log_templates_project_level", "project_id", "log_level"),
+    )
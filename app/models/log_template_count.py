@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from app.core.database import Base
+
+class LogTemplateCount(Base):
+    """Rows matching a log template per hour of log time"""
+    __tablename__ = "log_template_counts"
+    template_id = Column(Integer, ForeignKey("log_templates.id"), primary_key=True)
+    hour = Column(DateTime, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
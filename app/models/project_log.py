@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime,ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime,ForeignKey, Index
 from datetime import datetime,timezone
 from app.core.database import Base
 
@@ -9,5 +9,22 @@ class ProjectLog(Base):
     log_level = Column(String,nullable=False)
     message = Column(String,nullable=False)
     log_time = Column(DateTime)
+    # Structured fields sent by the agent or parsed from the message
+    context = Column(String)
+    controller = Column(String)
+    line_number = Column(Integer)
+    file_path = Column(String)
+    # Mined message template, filled in the background after insert
+    template_id = Column(Integer, index=True)
     created_at = Column(DateTime, default=datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+
+    __table_args__ = (
+        # Keyset pagination of a project's logs, newest first
+        Index("ix_project_logs_project_time", "project_id", "log_time", "id"),
+        # Level filter, levels are normalized to LogLevelEnum at ingest
+        Index("ix_project_logs_project_level_time", "project_id", "log_level", "log_time"),
+        # Controller / file filters, and facet counts answered from the index alone
+        Index("ix_project_logs_project_controller_time", "project_id", "controller", "log_time"),
+        Index("ix_project_logs_project_file_time", "project_id", "file_path", "log_time"),
+    )
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
+from app.core.database import Base
+
+class ProjectLogSample(Base):
+    """Occurrences of a repeated log message that were counted instead of stored"""
+    __tablename__ = "project_log_samples"
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    fingerprint = Column(String(16), nullable=False)
+    window_start = Column(DateTime, nullable=False)
+    log_level = Column(String, nullable=False)
+    template = Column(String, nullable=False)
+    # Latest suppressed message, as an example
+    message = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    first_seen = Column(DateTime)
+    last_seen = Column(DateTime)
+
+    __table_args__ = (
+        # One counter row per message template and sampling window
+        UniqueConstraint("project_id", "fingerprint", "window_start", name="uq_project_log_samples_window"),
+        Index("ix_project_log_samples_project_seen", "project_id", "last_seen"),
+    )
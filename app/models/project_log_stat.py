@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from app.core.database import Base
+
+class ProjectLogStat(Base):
+    """Logs per project, hour and level, kept up to date at ingest"""
+    __tablename__ = "project_log_stats"
+    project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
+    hour = Column(DateTime, primary_key=True)
+    level = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    # Latest log time within the hour, for "last error at"
+    last_log_time = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_project_log_stats_level_hour", "level", "hour"),
+    )
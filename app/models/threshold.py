@@ -8,6 +8,7 @@ class ThresholdType(enum.Enum):
     MEMORY = "memory"
     DISK = "disk"
     SERVICE_WORKER_INACTIVE = "service_worker_inactive"
+    LOG_ERROR_RATE = "log_error_rate"
 
 class ThresholdCondition(enum.Enum):
     GREATER_THAN = "greater_than"
@@ -28,7 +29,7 @@ class Threshold(Base):
     description = Column(Text)
     
     # Threshold configuration
-    metric_type = Column(Enum(ThresholdType), nullable=False)  # cpu, memory, disk
+    metric_type = Column(Enum(ThresholdType), nullable=False)  # cpu, memory, disk, service_worker_inactive, log_error_rate
     condition = Column(Enum(ThresholdCondition), nullable=False, default=ThresholdCondition.GREATER_THAN)
     threshold_value = Column(Float, nullable=False)  # percentage value (e.g., 85.0 for 85%)
     duration_minutes = Column(Integer, nullable=False, default=1)  # how long the condition must persist
@@ -38,7 +39,7 @@ class Threshold(Base):
     is_enabled = Column(Boolean, default=True, nullable=False)
     
     # Additional configuration
-    source_filter = Column(String(100))  # optional filter for specific sources
+    source_filter = Column(String(100))  # optional filter for specific sources (worker name, project id)
     cooldown_minutes = Column(Integer, default=5)  # prevent spam alarms
     
     # Metadata
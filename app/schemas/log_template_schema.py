@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class LogTemplatePattern(BaseModel):
+    """A log template with its row count over the requested period"""
+    id: int
+    template: str
+    log_level: str
+    count: int
+    last_seen: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -11,6 +11,16 @@ class LogEntry(BaseModel):
     controller: Optional[str] = None
     line_number: Optional[int] = None
     file_path: Optional[str] = None
+    # Position of the record in its agent batch, used to skip retried records
+    seq: Optional[int] = None
+
+
+class StreamLogEntry(LogEntry):
+    """One NDJSON record of /api/logs/stream, tied to a project either
+    directly or through the 'framework_projectid' key used by MonitoringData"""
+    project_id: Optional[int] = None
+    log_type: Optional[str] = None
+    batch_id: Optional[str] = None
 
 
 class SystemMetrics(BaseModel):
@@ -31,4 +41,6 @@ class MonitoringData(BaseModel):
     logs: Dict[str, List[LogEntry]]
     system_metrics: SystemMetrics
     services: List[ServiceStatus]
+    # Agent generated id, a retried report with the same id is not stored twice
+    batch_id: Optional[str] = None
     
@@ -1,12 +1,25 @@
 from pydantic import BaseModel
+from typing import List, Optional
 from fastapi import Form
 from datetime import datetime,timezone
+from enum import Enum
+
+class LogLevelEnum(str, Enum):
+    DEBUG = "DEBUG"
+    INFO = "INFO"
+    WARNING = "WARNING"
+    ERROR = "ERROR"
+    CRITICAL = "CRITICAL"
 
 # User
 class ProjectLogBase(BaseModel):
     log_level:str
     message:str
     log_time:datetime
+    context: Optional[str] = None
+    controller: Optional[str] = None
+    line_number: Optional[int] = None
+    file_path: Optional[str] = None
 
 class ProjectLogCreate(ProjectLogBase):
     project_id: int
@@ -28,4 +41,8 @@ class LogResponse(ProjectLogBase):
     project_id : int
     class Config:
         from_attributes = True
- 
+
+
+class LogBlockResponse(BaseModel):
+    data: List[LogResponse]
+    next_cursor: Optional[str] = None
@@ -8,6 +8,7 @@ class ThresholdTypeEnum(str, Enum):
     MEMORY = "memory"
     DISK = "disk"
     SERVICE_WORKER_INACTIVE = "service_worker_inactive"
+    LOG_ERROR_RATE = "log_error_rate"
 
 class ThresholdConditionEnum(str, Enum):
     GREATER_THAN = "greater_than"
@@ -38,6 +39,10 @@ class ThresholdBase(BaseModel):
         if hasattr(info, 'data') and info.data.get('metric_type') == ThresholdTypeEnum.SERVICE_WORKER_INACTIVE:
             if v < 1 or v > 1440:  # 1 minute to 24 hours
                 raise ValueError("Service worker inactive threshold must be between 1 and 1440 minutes")
+        elif hasattr(info, 'data') and info.data.get('metric_type') == ThresholdTypeEnum.LOG_ERROR_RATE:
+            # For log error rate, threshold_value represents errors per minute
+            if v < 0 or v > 1000000:
+                raise ValueError("Log error rate threshold must be between 0 and 1000000 errors per minute")
         else:
             # For CPU, memory, disk - percentage based
             if v < 0 or v > 100:
@@ -57,6 +62,16 @@ class ThresholdBase(BaseModel):
         if v < 0 or v > 120:
             raise ValueError("Cooldown must be between 0 and 120 minutes")
         return v
+    
+    @field_validator("source_filter")
+    @classmethod
+    def validate_source_filter(cls, v: Optional[str], info) -> Optional[str]:
+        # For log error rate, source_filter is the project id (empty for all projects)
+        if v and hasattr(info, 'data') and info.data.get('metric_type') == ThresholdTypeEnum.LOG_ERROR_RATE:
+            if not v.strip().isdigit():
+                raise ValueError("Log error rate source filter must be a project id")
+            return v.strip()
+        return v
 
 class ThresholdCreate(ThresholdBase):
     is_enabled: bool = True
@@ -81,6 +96,10 @@ class ThresholdUpdate(BaseModel):
             if hasattr(info, 'data') and info.data.get('metric_type') == ThresholdTypeEnum.SERVICE_WORKER_INACTIVE:
                 if v < 1 or v > 1440:  # 1 minute to 24 hours
                     raise ValueError("Service worker inactive threshold must be between 1 and 1440 minutes")
+            elif hasattr(info, 'data') and info.data.get('metric_type') == ThresholdTypeEnum.LOG_ERROR_RATE:
+                # For log error rate, threshold_value represents errors per minute
+                if v < 0 or v > 1000000:
+                    raise ValueError("Log error rate threshold must be between 0 and 1000000 errors per minute")
             else:
                 # For CPU, memory, disk - percentage based
                 if v < 0 or v > 100:
@@ -100,6 +119,16 @@ class ThresholdUpdate(BaseModel):
         if v is not None and (v < 0 or v > 120):
             raise ValueError("Cooldown must be between 0 and 120 minutes")
         return v
+    
+    @field_validator("source_filter")
+    @classmethod
+    def validate_source_filter(cls, v: Optional[str], info) -> Optional[str]:
+        # For log error rate, source_filter is the project id (empty for all projects)
+        if v and hasattr(info, 'data') and info.data.get('metric_type') == ThresholdTypeEnum.LOG_ERROR_RATE:
+            if not v.strip().isdigit():
+                raise ValueError("Log error rate source filter must be a project id")
+            return v.strip()
+        return v
 
 class ThresholdResponse(ThresholdBase):
     id: int
@@ -0,0 +1,78 @@
+import threading
+from typing import Dict, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models.alarm import Alarm as AlarmModel, AlarmStatus, AlarmSeverity
+from ..utils.broadcast import Broadcaster
+from ..utils.db_context import db_context
+from ..core.logging_config import get_logger
+
+logger = get_logger("app.alarm_counter")
+
+
+class ActiveAlarmCounter:
+    """Process-wide count of active alarms by severity.
+
+    Loaded once with a grouped query, then kept current by the alarm service
+    on every write. Changes are pushed through ``changes`` so pages showing the
+    counter never poll the database.
+    """
+
+    def __init__(self):
+        self.changes = Broadcaster()
+        self._counts: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return active alarm counts keyed by severity value"""
+        if self._counts is None:
+            self.load()
+        return dict(self._counts or self._empty())
+
+    def total(self) -> int:
+        return sum(self.snapshot().values())
+
+    def load(self):
+        """Count active alarms from the database"""
+        try:
+            with db_context() as db:
+                self.recount(db)
+        except Exception as e:
+            logger.error(f"Failed to load active alarm counts: {e}")
+
+    def recount(self, db: Session):
+        """Recount after writes whose effect on the counts is not known upfront"""
+        rows = db.query(AlarmModel.severity, func.count(AlarmModel.id)).filter(
+            AlarmModel.is_active,
+            AlarmModel.status == AlarmStatus.ACTIVE
+        ).group_by(AlarmModel.severity).all()
+
+        counts = self._empty()
+        for severity, count in rows:
+            counts[severity.value] = count
+        self._set(counts)
+
+    def alarm_created(self, severity: str):
+        """Count a newly created (active) alarm without querying"""
+        with self._lock:
+            if self._counts is None:
+                # Not loaded yet, the first snapshot will count it
+                return
+            key = severity.lower()
+            self._counts = {**self._counts, key: self._counts.get(key, 0) + 1}
+            counts = dict(self._counts)
+        self.changes.publish(counts)
+
+    def _set(self, counts: Dict[str, int]):
+        with self._lock:
+            changed = counts != self._counts
+            self._counts = counts
+        if changed:
+            self.changes.publish(dict(counts))
+
+    @staticmethod
+    def _empty() -> Dict[str, int]:
+        return {severity.value: 0 for severity in AlarmSeverity}
+
+
+active_alarm_counter = ActiveAlarmCounter()
@@ -1,24 +1,32 @@
+import os
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from typing import Optional, List
 from fastapi import Request
 from datetime import datetime, timezone
 from ..models.alarm import Alarm as AlarmModel, AlarmStatus, AlarmSeverity
-from ..models.user import User
 from ..schemas.alarm_schema import AlarmResponse, AlarmCreate, AlarmUpdate
 from ..schemas import AdapterListResponse
 from ..utils.query_adapter import QueryAdapter
-from ..utils.timezone_utils import convert_utc_to_user_timezone
+from ..utils.timezone_utils import convert_utc_to_user_timezone, convert_fields_to_user_timezone
+from ..utils.ttl_cache import TTLCache
+from .alarm_counter import active_alarm_counter
+from .user_service import resolve_user_timezone
+
+ALARM_TIME_FIELDS = ("triggered_at", "acknowledged_at", "resolved_at", "created_at", "updated_at")
+
+# Shared by every viewer of the alarm page, dropped on alarm writes
+alarm_summary_cache = TTLCache(ttl=float(os.getenv('SUMMARY_CACHE_TTL', '5')))
+
+def _alarms_changed(db: Session):
+    """Refresh derived alarm state after a committed write"""
+    active_alarm_counter.recount(db)
+    alarm_summary_cache.invalidate()
 
 def get_user_timezone_for_alarm(db: Session, user_id: Optional[int]) -> str:
-    """Get user timezone from database, fallback to UTC"""
-    if not user_id:
-        return 'UTC'
-    
-    user = db.query(User).filter(User.id == user_id).first()
-    if user and hasattr(user, 'user_timezone'):
-        return str(user.user_timezone)
-    return 'UTC'
+    """Get user timezone (cached per user), fallback to UTC"""
+    return resolve_user_timezone(db, user_id)
 
 def convert_alarm_times_to_user_timezone(alarm_response: AlarmResponse, user_timezone: str) -> AlarmResponse:
     """Convert alarm timestamp fields to user timezone"""
@@ -52,11 +60,9 @@ def get_pagination_alarms(
     user_timezone = get_user_timezone_for_alarm(db, user_id)
     
     # Convert times to user timezone
-    data = []
-    for item in items:
-        alarm_response = AlarmResponse.model_validate(item)
-        alarm_response = convert_alarm_times_to_user_timezone(alarm_response, user_timezone)
-        data.append(alarm_response)
+    data = convert_fields_to_user_timezone(
+        (AlarmResponse.model_validate(item) for item in items), ALARM_TIME_FIELDS, user_timezone
+    )
     
     return AdapterListResponse[AlarmResponse](
         page=page, limit=limit, total=count, data=data
@@ -70,11 +76,9 @@ def get_all_alarms(db: Session, user_id: Optional[int] = None) -> List[AlarmResp
     user_timezone = get_user_timezone_for_alarm(db, user_id)
     
     # Convert times to user timezone
-    data = []
-    for alarm in alarms:
-        alarm_response = AlarmResponse.model_validate(alarm)
-        alarm_response = convert_alarm_times_to_user_timezone(alarm_response, user_timezone)
-        data.append(alarm_response)
+    data = convert_fields_to_user_timezone(
+        (AlarmResponse.model_validate(alarm) for alarm in alarms), ALARM_TIME_FIELDS, user_timezone
+    )
     
     return data
 
@@ -92,6 +96,8 @@ def create_alarm(db: Session, payload: AlarmCreate) -> AlarmResponse:
         db.add(alarm)
         db.commit()
         db.refresh(alarm)
+        active_alarm_counter.alarm_created(alarm.severity.value)
+        alarm_summary_cache.invalidate()
         return AlarmResponse.model_validate(alarm)
     except IntegrityError as e:
         db.rollback()
@@ -124,6 +130,7 @@ def update_alarm(db: Session, id: int, payload: AlarmUpdate) -> Optional[AlarmRe
             setattr(alarm, field, value)
         db.commit()
         db.refresh(alarm)
+        _alarms_changed(db)
         return AlarmResponse.model_validate(alarm)
     except IntegrityError as e:
         db.rollback()
@@ -137,6 +144,7 @@ def delete_alarm(db: Session, id: int) -> bool:
     try:
         db.delete(alarm)
         db.commit()
+        _alarms_changed(db)
         return True
     except IntegrityError as e:
         db.rollback()
@@ -153,6 +161,7 @@ def acknowledge_alarm(db: Session, id: int) -> Optional[AlarmResponse]:
         setattr(alarm, 'acknowledged_at', datetime.now(timezone.utc))
         db.commit()
         db.refresh(alarm)
+        _alarms_changed(db)
         return AlarmResponse.model_validate(alarm)
     except IntegrityError as e:
         db.rollback()
@@ -170,6 +179,7 @@ def resolve_alarm(db: Session, id: int) -> Optional[AlarmResponse]:
         setattr(alarm, 'is_active', False)
         db.commit()
         db.refresh(alarm)
+        _alarms_changed(db)
         return AlarmResponse.model_validate(alarm)
     except IntegrityError as e:
         db.rollback()
@@ -186,11 +196,9 @@ def get_active_alarms(db: Session, user_id: Optional[int] = None) -> List[AlarmR
     user_timezone = get_user_timezone_for_alarm(db, user_id)
     
     # Convert times to user timezone
-    data = []
-    for alarm in alarms:
-        alarm_response = AlarmResponse.model_validate(alarm)
-        alarm_response = convert_alarm_times_to_user_timezone(alarm_response, user_timezone)
-        data.append(alarm_response)
+    data = convert_fields_to_user_timezone(
+        (AlarmResponse.model_validate(alarm) for alarm in alarms), ALARM_TIME_FIELDS, user_timezone
+    )
     
     return data
 
@@ -226,6 +234,7 @@ def acknowledge_all_alarms(db: Session, alarm_ids: Optional[List[int]] = None) -
         }, synchronize_session=False)
         
         db.commit()
+        _alarms_changed(db)
         return updated_count
     except IntegrityError as e:
         db.rollback()
@@ -251,6 +260,7 @@ def resolve_all_alarms(db: Session, alarm_ids: Optional[List[int]] = None) -> in
         }, synchronize_session=False)
         
         db.commit()
+        _alarms_changed(db)
         return updated_count
     except IntegrityError as e:
         db.rollback()
@@ -258,31 +268,27 @@ def resolve_all_alarms(db: Session, alarm_ids: Optional[List[int]] = None) -> in
 
 def get_alarm_summary(db: Session) -> dict:
     """Get alarm summary statistics"""
-    total_alarms = db.query(AlarmModel).count()
-    active_alarms = db.query(AlarmModel).filter(
+    return alarm_summary_cache.get_or_compute("summary", lambda: _compute_alarm_summary(db))
+
+def _compute_alarm_summary(db: Session) -> dict:
+    rows = db.query(
+        AlarmModel.status,
+        AlarmModel.severity,
         AlarmModel.is_active,
-        AlarmModel.status == AlarmStatus.ACTIVE
-    ).count()
-    
-    critical_alarms = db.query(AlarmModel).filter(
-        AlarmModel.severity == AlarmSeverity.CRITICAL,
-        AlarmModel.is_active
-    ).count()
-    
-    high_alarms = db.query(AlarmModel).filter(
-        AlarmModel.severity == AlarmSeverity.HIGH,
-        AlarmModel.is_active
-    ).count()
+        func.count(AlarmModel.id)
+    ).group_by(AlarmModel.status, AlarmModel.severity, AlarmModel.is_active).all()
     
-    return {
-        "total": total_alarms,
-        "active": active_alarms,
-        "critical": critical_alarms,
-        "high": high_alarms,
-        "acknowledged": db.query(AlarmModel).filter(
-            AlarmModel.status == AlarmStatus.ACKNOWLEDGED
-        ).count(),
-        "resolved": db.query(AlarmModel).filter(
-            AlarmModel.status == AlarmStatus.RESOLVED
-        ).count()
-    }
\ No newline at end of file
+    summary = {"total": 0, "active": 0, "critical": 0, "high": 0, "acknowledged": 0, "resolved": 0}
+    for status, severity, is_active, count in rows:
+        summary["total"] += count
+        if is_active and status == AlarmStatus.ACTIVE:
+            summary["active"] += count
+        if is_active and severity == AlarmSeverity.CRITICAL:
+            summary["critical"] += count
+        if is_active and severity == AlarmSeverity.HIGH:
+            summary["high"] += count
+        if status == AlarmStatus.ACKNOWLEDGED:
+            summary["acknowledged"] += count
+        elif status == AlarmStatus.RESOLVED:
+            summary["resolved"] += count
+    return summary
@@ -0,0 +1,164 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from ..models.ingest_batch import IngestBatch
+from ..utils.db_context import db_context
+from ..core.logging_config import get_logger
+
+logger = get_logger("app.ingest_batch")
+
+# Marker for batches stored as a whole (reports), as opposed to a sequence
+WHOLE_BATCH = None
+
+
+class BatchInFlight(Exception):
+    """Raised when a duplicate batch waited too long for the original to be stored"""
+
+    def __init__(self, batch_id: str, retry_after: float):
+        super().__init__(f"Batch {batch_id} is still being stored")
+        self.batch_id = batch_id
+        self.retry_after = retry_after
+
+
+class RecentBatchIndex:
+    """
+    Index of recently stored agent batch ids used to drop retried uploads.
+
+    The ``ingest_batches`` table is loaded once; from then on every lookup is
+    a dictionary hit because all writes go through ``mark``/``remember``.
+    Whole reports are stored with ``last_seq`` NULL; streamed batches keep the
+    highest record sequence committed so far, so sequences are expected to
+    increase within a batch.
+
+    Whole reports are ``claim``ed before processing so a retry arriving
+    while the original is still being stored waits for it, up to
+    ``claim_timeout`` seconds, instead of storing the report twice; the
+    results of the last ``result_capacity`` reports are kept to answer
+    such duplicates.
+    """
+
+    def __init__(self, capacity: int = 100000, retention_hours: float = 24, result_capacity: int = 1000,
+                 claim_timeout: float = 5):
+        self.capacity = capacity
+        self.retention = timedelta(hours=retention_hours)
+        self.result_capacity = result_capacity
+        self.claim_timeout = claim_timeout
+        self._batches: "OrderedDict[str, Optional[int]]" = OrderedDict()
+        # Whole batches being processed -> event set once they are released
+        self._in_flight: Dict[str, threading.Event] = {}
+        self._results: "OrderedDict[str, dict]" = OrderedDict()
+        self._loaded = False
+        self._marks_since_prune = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load batch ids stored within the retention window"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                with db_context() as db:
+                    since = datetime.now(timezone.utc) - self.retention
+                    rows = db.query(IngestBatch.batch_id, IngestBatch.last_seq).filter(
+                        IngestBatch.created_at >= since
+                    ).order_by(IngestBatch.created_at).all()
+                for batch_id, last_seq in rows[-self.capacity:]:
+                    self._batches[batch_id] = last_seq
+                logger.info(f"Loaded {len(self._batches)} recent ingest batch ids")
+            except Exception as e:
+                logger.error(f"Failed to load recent ingest batches: {e}")
+            self._loaded = True
+
+    def is_stored(self, batch_id: str) -> bool:
+        """Whether a whole batch with this id has been stored"""
+        self.load()
+        return batch_id in self._batches and self._batches[batch_id] is WHOLE_BATCH
+
+    def claim(self, batch_id: str) -> bool:
+        """
+        Reserve a whole batch for processing; pair with ``release``. Returns
+        False when it is already stored, waiting first if another request
+        is storing it; raises BatchInFlight when that takes longer than
+        ``claim_timeout`` seconds.
+        """
+        self.load()
+        deadline = time.monotonic() + self.claim_timeout
+        while True:
+            with self._lock:
+                if batch_id in self._batches and self._batches[batch_id] is WHOLE_BATCH:
+                    return False
+                in_flight = self._in_flight.get(batch_id)
+                if in_flight is None:
+                    self._in_flight[batch_id] = threading.Event()
+                    return True
+            # Stored, or failed and free to be claimed again, once released
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not in_flight.wait(remaining):
+                raise BatchInFlight(batch_id, max(self.claim_timeout, 1))
+
+    def release(self, batch_id: str, result: Optional[dict] = None):
+        """End a claim, keeping the result handed out to later duplicates"""
+        with self._lock:
+            if result is not None:
+                self._results[batch_id] = result
+                self._results.move_to_end(batch_id)
+                while len(self._results) > self.result_capacity:
+                    self._results.popitem(last=False)
+            in_flight = self._in_flight.pop(batch_id, None)
+        if in_flight is not None:
+            in_flight.set()
+
+    def result(self, batch_id: str) -> Optional[dict]:
+        """Result of a recently stored whole batch, None when not kept"""
+        with self._lock:
+            return self._results.get(batch_id)
+
+    def stored_seq(self, batch_id: str) -> Optional[int]:
+        """Highest committed record sequence of a streamed batch, None if unknown"""
+        self.load()
+        return self._batches.get(batch_id)
+
+    def mark(self, db: Session, batch_id: str, last_seq: Optional[int] = WHOLE_BATCH):
+        """Record a batch in the session; call ``remember`` once it is committed"""
+        db.merge(IngestBatch(batch_id=batch_id, last_seq=last_seq))
+
+    def remember(self, batch_id: str, last_seq: Optional[int] = WHOLE_BATCH):
+        with self._lock:
+            self._batches[batch_id] = last_seq
+            self._batches.move_to_end(batch_id)
+            while len(self._batches) > self.capacity:
+                self._batches.popitem(last=False)
+            self._marks_since_prune += 1
+            prune = self._marks_since_prune >= 1000
+            if prune:
+                self._marks_since_prune = 0
+        if prune:
+            self.prune()
+
+    def prune(self):
+        """Delete batch ids older than the retention window from the table"""
+        try:
+            with db_context() as db:
+                cutoff = datetime.now(timezone.utc) - self.retention
+                deleted = db.query(IngestBatch).filter(IngestBatch.created_at < cutoff).delete(synchronize_session=False)
+                db.commit()
+            if deleted:
+                logger.info(f"Pruned {deleted} old ingest batch ids")
+        except Exception as e:
+            logger.error(f"Failed to prune ingest batches: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"tracked": len(self._batches), "capacity": self.capacity}
+
+
+recent_batches = RecentBatchIndex(
+    capacity=int(os.getenv('INGEST_BATCH_INDEX_SIZE', '100000')),
+    retention_hours=float(os.getenv('INGEST_BATCH_RETENTION_HOURS', '24')),
+    claim_timeout=float(os.getenv('INGEST_MAX_WAIT', '5')),
+)
@@ -0,0 +1,438 @@
+import os
+import gzip
+import json
+import heapq
+import asyncio
+import threading
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import func
+from ..models.project_log import ProjectLog
+from ..utils.db_context import db_context
+from ..core.logging_config import get_logger
+from ..core.config import path_next_to_db
+
+logger = get_logger("app.log_archive")
+
+# Columns kept for every archived row
+ARCHIVE_FIELDS = (
+    "id", "project_id", "log_level", "message", "log_time", "context", "controller",
+    "line_number", "file_path", "template_id", "created_at", "updated_at",
+)
+ARCHIVE_TIME_FIELDS = ("log_time", "created_at", "updated_at")
+
+CODEC_SUFFIXES = {"zstd": "zst", "gzip": "gz"}
+
+
+def _compressor(codec: str) -> Callable[[bytes], bytes]:
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=9).compress
+    return lambda data: gzip.compress(data, mtime=0)
+
+
+def _decompressor(codec: str) -> Callable[[bytes], bytes]:
+    if codec == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ValueError("zstd log archives require the 'zstandard' package") from e
+        return zstandard.ZstdDecompressor().decompress
+    return gzip.decompress
+
+
+def _encode_record(record: dict) -> bytes:
+    return json.dumps(
+        {key: value.isoformat() if isinstance(value, datetime) else value for key, value in record.items()},
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode()
+
+
+def _decode_record(line: bytes) -> dict:
+    record = json.loads(line)
+    for key in ARCHIVE_TIME_FIELDS:
+        if record.get(key):
+            record[key] = datetime.fromisoformat(record[key])
+    return record
+
+
+def _parse_time(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+_LOOKUPS: Dict[str, Callable[[object, object], bool]] = {
+    "eq": lambda field, value: field == value,
+    "neq": lambda field, value: field != value,
+    "lt": lambda field, value: field is not None and field < value,
+    "lte": lambda field, value: field is not None and field <= value,
+    "gt": lambda field, value: field is not None and field > value,
+    "gte": lambda field, value: field is not None and field >= value,
+    # SQLite LIKE is case-insensitive as well
+    "like": lambda field, value: field is not None and str(value).lower() in str(field).lower(),
+    "ilike": lambda field, value: field is not None and str(value).lower() in str(field).lower(),
+    "in": lambda field, value: field is not None and str(field) in str(value).split(","),
+}
+
+
+class ArchiveFilter:
+    """
+    QueryAdapter-style filters (``search`` plus ``field__lookup`` params)
+    evaluated on archived records. ``date_from`` / ``date_to`` bound the
+    log_time range so only overlapping segments and frames are read.
+    """
+
+    def __init__(self, query_params: Optional[Dict[str, str]] = None,
+                 search_fields: Tuple[str, ...] = ("log_level", "message")):
+        self.date_from: Optional[datetime] = None
+        self.date_to: Optional[datetime] = None
+        self.search = None
+        self.search_fields = search_fields
+        self.conditions: List[Tuple[str, Callable, object]] = []
+        for key, value in (query_params or {}).items():
+            if key == "search":
+                self.search = str(value).lower() if value else None
+                continue
+            if "__" not in key:
+                continue
+            field, lookup = key.split("__", 1)
+            if field not in ARCHIVE_FIELDS or lookup not in _LOOKUPS:
+                continue
+            if field in ARCHIVE_TIME_FIELDS:
+                value = _parse_time(value)
+                if value is None:
+                    continue
+                if field == "log_time" and lookup in ("gt", "gte"):
+                    self.date_from = max(self.date_from or value, value)
+                elif field == "log_time" and lookup in ("lt", "lte"):
+                    self.date_to = min(self.date_to or value, value)
+            elif field in ("id", "project_id", "line_number", "template_id") and lookup != "in":
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    continue
+            self.conditions.append((field, _LOOKUPS[lookup], value))
+
+    @property
+    def is_time_only(self) -> bool:
+        return not self.search and all(field == "log_time" for field, _, _ in self.conditions)
+
+    def matches(self, record: dict) -> bool:
+        for field, lookup, value in self.conditions:
+            if not lookup(record.get(field), value):
+                return False
+        if self.search:
+            return any(self.search in str(record.get(field) or "").lower() for field in self.search_fields)
+        return True
+
+
+class LogArchive:
+    """
+    Cold storage for old project logs.
+
+    Off unless ``after_days`` is set; logs older than ``after_days`` days
+    are then moved out of ``project_logs``
+    into one segment per project and day
+    (``<directory>/<project_id>/<day>.<generation>.jsonl.zst``). A segment is
+    a series of independently compressed frames of ``frame_rows`` JSON
+    lines in (log_time, id) order; its sparse index
+    (``<day>.idx.json``) holds the time range, byte offset and size of every
+    frame, so a query decompresses only the frames overlapping its range.
+
+    Segments use zstd when the ``zstandard`` package is installed and gzip
+    otherwise; the codec is recorded in the index. Re-archiving a day
+    (late logs) merges into a new generation, and the index swap is the
+    commit point: rows leave the database only after it.
+    """
+
+    def __init__(self, directory: str = "data/log_archive", after_days: int = 0,
+                 frame_rows: int = 1000, interval: float = 3600, codec: str = "zstd"):
+        self.directory = directory
+        self.after_days = after_days
+        self.frame_rows = frame_rows
+        self.interval = interval
+        self.codec = codec
+        # project_id -> day -> segment index
+        self._indexes: Dict[int, Dict[date, dict]] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # Background job
+
+    def start(self):
+        if self.after_days and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.archive_old_logs)
+            except Exception as e:
+                logger.error(f"Log archiving failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    # Segment files
+
+    def _project_dir(self, project_id: int) -> str:
+        return os.path.join(self.directory, str(project_id))
+
+    def _index_path(self, project_id: int, day: date) -> str:
+        return os.path.join(self._project_dir(project_id), f"{day.isoformat()}.idx.json")
+
+    def _write_codec(self) -> str:
+        if self.codec == "zstd":
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                return "gzip"
+        return self.codec if self.codec in CODEC_SUFFIXES else "gzip"
+
+    def segments(self, project_id: int) -> Dict[date, dict]:
+        """Indexes of a project's archived days (loaded once, kept up to date by the archiver)"""
+        indexes = self._indexes.get(project_id)
+        if indexes is None:
+            indexes = {}
+            project_dir = self._project_dir(project_id)
+            if os.path.isdir(project_dir):
+                for name in os.listdir(project_dir):
+                    if not name.endswith(".idx.json"):
+                        continue
+                    try:
+                        with open(os.path.join(project_dir, name), encoding="utf-8") as f:
+                            index = self._load_index(json.load(f))
+                        indexes[index["day"]] = index
+                    except (OSError, ValueError, KeyError) as e:
+                        logger.error(f"Skipping unreadable log archive index {name}: {e}")
+            self._indexes[project_id] = indexes
+        return indexes
+
+    @staticmethod
+    def _load_index(raw: dict) -> dict:
+        raw["day"] = date.fromisoformat(raw["day"])
+        raw["first_time"] = datetime.fromisoformat(raw["first_time"])
+        raw["last_time"] = datetime.fromisoformat(raw["last_time"])
+        raw["frames"] = [
+            (datetime.fromisoformat(first), datetime.fromisoformat(last), offset, size, rows)
+            for first, last, offset, size, rows in raw["frames"]
+        ]
+        return raw
+
+    def newest_time(self, project_id: int) -> Optional[datetime]:
+        """log_time of the newest archived row of a project"""
+        segments = self.segments(project_id)
+        return max((index["last_time"] for index in segments.values()), default=None)
+
+    def _read_frames(self, project_id: int, index: dict, frames: Iterable[tuple]) -> Iterator[List[dict]]:
+        decompress = _decompressor(index["codec"])
+        with open(os.path.join(self._project_dir(project_id), index["file"]), "rb") as f:
+            for _, _, offset, size, _ in frames:
+                f.seek(offset)
+                yield [_decode_record(line) for line in decompress(f.read(size)).splitlines() if line]
+
+    def iter_rows(self, project_id: int, archive_filter: Optional[ArchiveFilter] = None,
+                  before: Optional[Tuple[datetime, int]] = None) -> Iterator[dict]:
+        """
+        Archived rows of a project newest first, matching ``archive_filter``
+        and, with ``before``, strictly after that (log_time, id) keyset position.
+        """
+        archive_filter = archive_filter or ArchiveFilter()
+        upper = archive_filter.date_to
+        if before is not None and (upper is None or before[0] < upper):
+            upper = before[0]
+        lower = archive_filter.date_from
+        segments = self.segments(project_id)
+        for day in sorted(segments, reverse=True):
+            index = segments[day]
+            if upper is not None and index["first_time"] > upper:
+                continue
+            if lower is not None and index["last_time"] < lower:
+                break
+            frames = [
+                frame for frame in reversed(index["frames"])
+                if (upper is None or frame[0] <= upper) and (lower is None or frame[1] >= lower)
+            ]
+            for rows in self._read_frames(project_id, index, frames):
+                for record in reversed(rows):
+                    if before is not None and (record["log_time"], record["id"]) >= before:
+                        continue
+                    if archive_filter.matches(record):
+                        yield record
+
+    def count(self, project_id: int, archive_filter: Optional[ArchiveFilter] = None) -> int:
+        """Archived rows matching the filter; plain time ranges are counted from the index"""
+        archive_filter = archive_filter or ArchiveFilter()
+        if not archive_filter.is_time_only:
+            return sum(1 for _ in self.iter_rows(project_id, archive_filter))
+        lower, upper = archive_filter.date_from, archive_filter.date_to
+        total = 0
+        for index in self.segments(project_id).values():
+            partial = []
+            for frame in index["frames"]:
+                first, last, _, _, rows = frame
+                if (lower is not None and last < lower) or (upper is not None and first > upper):
+                    continue
+                if (lower is None or first >= lower) and (upper is None or last <= upper):
+                    total += rows
+                else:
+                    partial.append(frame)
+            for rows in self._read_frames(project_id, index, partial) if partial else ():
+                total += sum(1 for record in rows if archive_filter.matches(record))
+        return total
+
+    def write_segment(self, project_id: int, day: date, records: Iterable[dict]) -> List[int]:
+        """
+        Write a day's records (in (log_time, id) order) into a new generation of
+        its segment, merged with what is already archived for that day.
+        Returns the ids of ``records`` now in the archive.
+        """
+        project_dir = self._project_dir(project_id)
+        os.makedirs(project_dir, exist_ok=True)
+        previous = self.segments(project_id).get(day)
+        generation = previous["generation"] + 1 if previous else 1
+        codec = self._write_codec()
+        name = f"{day.isoformat()}.{generation}.jsonl.{CODEC_SUFFIXES[codec]}"
+        compress = _compressor(codec)
+
+        ids: List[int] = []
+
+        def fresh() -> Iterator[dict]:
+            for record in records:
+                ids.append(record["id"])
+                yield record
+
+        sources = [fresh()]
+        if previous:
+            sources.append(record for rows in self._read_frames(project_id, previous, previous["frames"]) for record in rows)
+        merged = heapq.merge(*sources, key=lambda record: (record["log_time"], record["id"]))
+
+        frames = []
+        offset = 0
+        last_id = None
+        batch: List[dict] = []
+
+        def flush(f):
+            nonlocal offset
+            data = compress(b"\n".join(_encode_record(record) for record in batch) + b"\n")
+            f.write(data)
+            frames.append((batch[0]["log_time"], batch[-1]["log_time"], offset, len(data), len(batch)))
+            offset += len(data)
+            batch.clear()
+
+        with open(os.path.join(project_dir, name), "wb") as f:
+            for record in merged:
+                if record["id"] == last_id:
+                    continue
+                last_id = record["id"]
+                batch.append(record)
+                if len(batch) >= self.frame_rows:
+                    flush(f)
+            if batch:
+                flush(f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if not frames:
+            os.remove(os.path.join(project_dir, name))
+            return []
+
+        index = {
+            "day": day.isoformat(),
+            "generation": generation,
+            "file": name,
+            "codec": codec,
+            "rows": sum(frame[4] for frame in frames),
+            "first_time": frames[0][0].isoformat(),
+            "last_time": frames[-1][1].isoformat(),
+            "frames": [(first.isoformat(), last.isoformat(), start, size, rows) for first, last, start, size, rows in frames],
+        }
+        index_path = self._index_path(project_id, day)
+        with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(index_path + ".tmp", index_path)
+        self.segments(project_id)[day] = self._load_index(index)
+        return ids
+
+    def _remove_stale_generations(self, project_id: int):
+        """Drop segment files no index points to; readers never hold them for long"""
+        project_dir = self._project_dir(project_id)
+        current = {index["file"] for index in self.segments(project_id).values()}
+        for name in os.listdir(project_dir):
+            if ".jsonl." in name and name not in current:
+                try:
+                    os.remove(os.path.join(project_dir, name))
+                except OSError as e:
+                    logger.warning(f"Could not remove stale log archive file {name}: {e}")
+
+    # Archiving
+
+    def archive_old_logs(self) -> int:
+        """Move logs older than the configured age into segments, returns the rows moved"""
+        if not self.after_days:
+            return 0
+        cutoff = datetime.combine(
+            datetime.now(timezone.utc).date() - timedelta(days=self.after_days), time()
+        )
+        moved = 0
+        with self._lock:
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    if name.isdigit():
+                        self._remove_stale_generations(int(name))
+            with db_context() as db:
+                days = db.query(ProjectLog.project_id, func.date(ProjectLog.log_time)).filter(
+                    ProjectLog.log_time < cutoff
+                ).distinct().all()
+                for project_id, day in sorted(days):
+                    moved += self._archive_day(db, project_id, date.fromisoformat(day))
+        if moved:
+            logger.info(f"Archived {moved} project logs older than {cutoff.date()}")
+        return moved
+
+    def _archive_day(self, db, project_id: int, day: date) -> int:
+        start = datetime.combine(day, time())
+        columns = [getattr(ProjectLog, field) for field in ARCHIVE_FIELDS]
+        query = db.query(*columns).filter(
+            ProjectLog.project_id == project_id,
+            ProjectLog.log_time >= start,
+            ProjectLog.log_time < start + timedelta(days=1),
+        ).order_by(ProjectLog.log_time, ProjectLog.id)
+        ids = self.write_segment(project_id, day, (row._asdict() for row in query.yield_per(self.frame_rows)))
+        # Small deletes keep the write lock short for concurrent ingest
+        for position in range(0, len(ids), 500):
+            db.query(ProjectLog).filter(ProjectLog.id.in_(ids[position:position + 500])).delete(synchronize_session=False)
+            db.commit()
+        return len(ids)
+
+    def get_stats(self) -> dict:
+        """Archived days and rows per project found on disk"""
+        projects = {}
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.isdigit():
+                    segments = self.segments(int(name))
+                    projects[int(name)] = {
+                        "days": len(segments),
+                        "rows": sum(index["rows"] for index in segments.values()),
+                    }
+        return {"after_days": self.after_days, "codec": self._write_codec(), "projects": projects}
+
+
+log_archive = LogArchive(
+    directory=os.getenv('LOG_ARCHIVE_DIR') or path_next_to_db('log_archive'),
+    after_days=int(os.getenv('LOG_ARCHIVE_AFTER_DAYS', '0')),
+    frame_rows=int(os.getenv('LOG_ARCHIVE_FRAME_ROWS', '1000')),
+    interval=float(os.getenv('LOG_ARCHIVE_INTERVAL', '3600')),
+    codec=os.getenv('LOG_ARCHIVE_CODEC', 'zstd'),
+)
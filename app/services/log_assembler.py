@@ -0,0 +1,69 @@
+import os
+import re
+from typing import Dict, List, Optional, Pattern
+from ..schemas.project_log_schema import ProjectLogCreate
+
+# Longest assembled event body, in lines; the rest is summarized
+LOG_EVENT_MAX_LINES = int(os.getenv('LOG_EVENT_MAX_LINES', '50'))
+
+_PYTHON_CONTINUATION = (
+    r"Traceback \(most recent call last\):"
+    r"|During handling of the above exception"
+    r"|The above exception was the direct cause"
+    r"|[A-Za-z_][\w.]*(?:Error|Exception|Exit|Interrupt|Warning)(?::|$)"
+)
+
+# Lines that continue the previous event (stack frames, causes) per framework;
+# indented lines continue an event in every framework
+CONTINUATION_PATTERNS: Dict[str, Pattern] = {
+    framework: re.compile(rf"^(?:\s+\S|{pattern})")
+    for framework, pattern in {
+        "laravel": r"#\d+ |\[stacktrace\]|Stack trace:|\{main\}|\"\}|Next [\w\\]+",
+        "python": _PYTHON_CONTINUATION,
+        "django": _PYTHON_CONTINUATION,
+        "flask": _PYTHON_CONTINUATION,
+        "fastapi": _PYTHON_CONTINUATION,
+        "spring": r"at [\w$.]+\(|\.\.\. \d+ (?:more|common frames omitted)|Caused by: |Suppressed: ",
+        "express": r"at \S",
+    }.items()
+}
+
+_INDENT = re.compile(r"^\s+")
+
+
+def get_continuation_pattern(framework: Optional[str]) -> Optional[Pattern]:
+    return CONTINUATION_PATTERNS.get((framework or "").lower())
+
+
+def compact_event_lines(lines: List[str], max_lines: int = LOG_EVENT_MAX_LINES) -> str:
+    """Join event lines without blank lines, trailing spaces or deep indentation"""
+    compact = [_INDENT.sub("  ", line.rstrip()) for line in lines if line.strip()]
+    if len(compact) > max_lines:
+        omitted = len(compact) - max_lines
+        compact = compact[:max_lines] + [f"  ... {omitted} more lines"]
+    return "\n".join(compact)
+
+
+def assemble_log_events(entries: List[ProjectLogCreate], frameworks: Dict[int, str]) -> List[ProjectLogCreate]:
+    """
+    Join continuation lines (stack traces) into the preceding event of the
+    same project, using the continuation pattern of the project framework.
+
+    Entries must be in arrival order. A continuation line with no earlier
+    event in ``entries`` is kept as its own row.
+    """
+    events: List[ProjectLogCreate] = []
+    lines: Dict[int, List[str]] = {}
+    last_event: Dict[int, int] = {}
+    for entry in entries:
+        pattern = get_continuation_pattern(frameworks.get(entry.project_id))
+        index = last_event.get(entry.project_id)
+        if pattern is not None and index is not None and pattern.match(entry.message):
+            lines.setdefault(index, [events[index].message]).append(entry.message)
+            continue
+        last_event[entry.project_id] = len(events)
+        events.append(entry)
+
+    for index, event_lines in lines.items():
+        events[index] = events[index].model_copy(update={"message": compact_event_lines(event_lines)})
+    return events
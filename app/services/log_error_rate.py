@@ -0,0 +1,71 @@
+import time
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+from ..schemas.project_log_schema import LogLevelEnum, ProjectLogCreate
+
+ERROR_LEVELS = (LogLevelEnum.ERROR.value, LogLevelEnum.CRITICAL.value)
+
+
+class LogErrorRateCounter:
+    """
+    In-memory error counts per project and minute, fed at ingest.
+
+    Lets the threshold monitor read errors/minute without counting
+    ``project_logs`` rows. Logs are bucketed by log time (clamped to now);
+    only the last ``retention`` minutes are kept. Counts start empty at
+    startup, so a window is only reported once the counter has been
+    running for all of it.
+    """
+
+    def __init__(self, retention: int = 61, levels: Sequence[str] = ERROR_LEVELS):
+        self.retention = retention
+        self.levels = set(levels)
+        self.started = int(time.time() // 60)
+        # project_id -> minute (epoch minutes) -> errors
+        self._counts: Dict[int, Dict[int, int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _minute(log_time: Optional[datetime], now: int) -> int:
+        if log_time is None:
+            return now
+        if log_time.tzinfo is None:
+            log_time = log_time.replace(tzinfo=timezone.utc)
+        return min(int(log_time.timestamp() // 60), now)
+
+    def record(self, entries: Iterable[ProjectLogCreate]):
+        now = int(time.time() // 60)
+        oldest = now - self.retention
+        with self._lock:
+            for entry in entries:
+                if entry.log_level not in self.levels:
+                    continue
+                minute = self._minute(entry.log_time, now)
+                if minute <= oldest:
+                    continue
+                counts = self._counts.setdefault(entry.project_id, {})
+                counts[minute] = counts.get(minute, 0) + 1
+            for counts in self._counts.values():
+                for minute in [minute for minute in counts if minute <= oldest]:
+                    del counts[minute]
+
+    def per_minute(self, project_id: int, minutes: int) -> Optional[List[int]]:
+        """
+        Errors in each of the last ``minutes`` complete minutes, oldest first;
+        None while the counter has not covered that window yet.
+        """
+        now = int(time.time() // 60)
+        first = now - minutes
+        if first < self.started:
+            return None
+        with self._lock:
+            counts = self._counts.get(project_id, {})
+            return [counts.get(minute, 0) for minute in range(first, now)]
+
+    def projects(self) -> List[int]:
+        with self._lock:
+            return [project_id for project_id, counts in self._counts.items() if counts]
+
+
+log_error_rates = LogErrorRateCounter()
@@ -0,0 +1,198 @@
+import re
+import time
+from typing import Callable, Dict, List, Optional, Pattern
+from ..schemas.project_log_schema import LogLevelEnum, ProjectLogCreate
+
+# Every spelling agents and frameworks use, mapped to the stored level
+LEVEL_ALIASES: Dict[str, str] = {}
+for _level, _aliases in {
+    LogLevelEnum.DEBUG: ("debug", "trace", "verbose", "fine", "finer", "finest"),
+    LogLevelEnum.INFO: ("info", "notice", "information", "log", "config"),
+    LogLevelEnum.WARNING: ("warning", "warn"),
+    LogLevelEnum.ERROR: ("error", "err", "severe"),
+    LogLevelEnum.CRITICAL: ("critical", "crit", "fatal", "alert", "emergency", "emerg", "panic"),
+}.items():
+    for _alias in _aliases:
+        for _spelling in (_alias, _alias.upper(), _alias.title()):
+            LEVEL_ALIASES[_spelling] = _level.value
+
+
+def normalize_log_level(level: Optional[str], default: str = LogLevelEnum.INFO.value) -> str:
+    """Map any level spelling to a LogLevelEnum value"""
+    if not level:
+        return default
+    normalized = LEVEL_ALIASES.get(level)
+    if normalized is None:
+        normalized = LEVEL_ALIASES.get(level.strip().lower(), default)
+    return normalized
+
+
+_TIME = r"\d{4}-\d\d-\d\d[ T][\d:.,]+"
+
+
+class LogLineParser:
+    """
+    Parser for the log line format of one framework.
+
+    ``line`` matches a whole raw line (named groups level, message and any
+    of context, controller, file_path). ``details`` finds structured fields
+    (controller, file_path, line_number) at the end of a message, whether
+    it came from ``line`` or was already split by the agent.
+
+    Fast paths keep regex work down: ``prefix`` lists the characters a raw
+    line starts with, anything else skips ``line``; ``suffix`` is how a
+    message carrying details ends, anything else skips ``details``; and
+    ``details`` is only tried at the last occurrence of ``anchor``.
+    """
+
+    def __init__(self, line: Pattern, details: Optional[Pattern] = None, anchor: str = "",
+                 prefix: Optional[str] = None, suffix: Optional[str] = None):
+        self.line = line
+        self.details = details
+        self.anchor = anchor
+        self.prefix = prefix
+        self.suffix = suffix
+
+    def parse(self, text: str) -> Optional[dict]:
+        """Fields found in one line (or message), None when nothing matched"""
+        fields = None
+        if text and (self.prefix is None or text[0] in self.prefix):
+            match = self.line.match(text)
+            if match is not None:
+                fields = match.groupdict()
+                text = fields["message"]
+        if self.details is not None and (self.suffix is None or text.endswith(self.suffix)):
+            position = text.rfind(self.anchor)
+            match = self.details.match(text, position) if position >= 0 else None
+            if match is not None:
+                if fields is None:
+                    return match.groupdict()
+                fields.update(match.groupdict())
+                if self.suffix is not None:
+                    # Details closing a raw line are not part of the message
+                    fields["message"] = text[:match.start()]
+        return fields
+
+
+_DIGITS = "0123456789"
+_FILE_LINE = re.compile(r" \[(?P<file_path>[^\]\s:]+):(?P<line_number>\d+)\]$")
+
+LOG_PARSERS: Dict[str, LogLineParser] = {
+    # [2023-12-01 10:30:45] production.ERROR: Database connection failed {context}
+    "laravel": LogLineParser(
+        re.compile(r"\[[^\]]+\] (?P<context>[\w-]+)\.(?P<level>[A-Za-z]+): (?P<message>.*)"),
+        re.compile(r" at (?P<file_path>/[^\s:]+):(?P<line_number>\d+)\)"),
+        " at /",
+        prefix="[",
+    ),
+    # 2023-12-01 10:30:45 - ERROR - Database connection failed
+    "python": LogLineParser(
+        re.compile(rf"{_TIME} - (?P<level>[A-Za-z]+) - (?P<message>.*)"),
+        prefix=_DIGITS,
+    ),
+    # 2023-12-01 10:30:45 ERROR Database connection failed [views.py:45]
+    "django": LogLineParser(
+        re.compile(rf"{_TIME} (?P<level>[A-Za-z]+) (?P<message>.*)"),
+        _FILE_LINE,
+        " [",
+        prefix=_DIGITS,
+        suffix="]",
+    ),
+    # 2023-12-01 10:30:45 ERROR Database connection failed [app.py:123]
+    "flask": LogLineParser(
+        re.compile(rf"{_TIME} (?P<level>[A-Za-z]+) (?P<message>.*)"),
+        _FILE_LINE,
+        " [",
+        prefix=_DIGITS,
+        suffix="]",
+    ),
+    # 2023-12-01 10:30:45 error: Database connection failed at UserController (controllers/user.js:45:12)
+    "express": LogLineParser(
+        re.compile(rf"{_TIME} (?P<level>[A-Za-z]+): (?P<message>.*)"),
+        re.compile(r" at (?P<controller>[\w.$<>]+) \((?P<file_path>[^()\s:]+):(?P<line_number>\d+)(?::\d+)?\)$"),
+        " at ",
+        prefix=_DIGITS,
+        suffix=")",
+    ),
+    # 2023-12-01 10:30:45 ERROR c.e.service.UserService - Database connection failed
+    "spring": LogLineParser(
+        re.compile(rf"{_TIME}\s+(?P<level>[A-Za-z]+)\s+(?:\d+ --- \[[^\]]*\]\s+)?(?P<controller>[\w.$]+)\s+[-:] (?P<message>.*)"),
+        prefix=_DIGITS,
+    ),
+    # 2023-12-01 10:30:45 - app.main - ERROR - main.py:67 - Database connection failed
+    "fastapi": LogLineParser(
+        re.compile(rf"{_TIME} - (?P<context>[\w.]+) - (?P<level>[A-Za-z]+) - (?P<file_path>[^\s:]+):(?P<line_number>\d+) - (?P<message>.*)"),
+        prefix=_DIGITS,
+    ),
+}
+
+
+def get_log_parser(framework: Optional[str]) -> Optional[LogLineParser]:
+    return LOG_PARSERS.get((framework or "").lower())
+
+
+def parse_log_entries(entries: List[ProjectLogCreate], frameworks: Dict[int, str]) -> List[ProjectLogCreate]:
+    """
+    Normalize levels and fill structured fields of prepared rows in place.
+
+    Fields sent by the agent win over parsed ones; the parsed level is used
+    when the agent level is unknown. Only the first line of a
+    multi-line event is parsed; when it is a complete raw line the message
+    keeps just the text after the line prefix.
+    """
+    for entry in entries:
+        parser = get_log_parser(frameworks.get(entry.project_id))
+        level = entry.log_level
+        if parser is not None and entry.message:
+            head, newline, rest = entry.message.partition("\n")
+            fields = parser.parse(head)
+            if fields:
+                if fields.get("message") is not None:
+                    entry.message = fields["message"] + newline + rest
+                if fields.get("level") and normalize_log_level(level, None) is None:
+                    level = fields["level"]
+                if entry.context is None:
+                    entry.context = fields.get("context")
+                if entry.controller is None:
+                    entry.controller = fields.get("controller")
+                if entry.file_path is None:
+                    entry.file_path = fields.get("file_path")
+                if entry.line_number is None and fields.get("line_number"):
+                    entry.line_number = int(fields["line_number"])
+        entry.log_level = normalize_log_level(level)
+    return entries
+
+
+def benchmark(lines: int = 200000, report: Callable[[str], None] = print) -> Dict[str, float]:
+    """
+    Measure parser throughput in lines/sec per framework on one core, for
+    raw lines and for messages the agent already split. Run it with
+    ``python -m app.services.log_parser``.
+    """
+    samples = {
+        "laravel": ("[2023-12-01 10:30:45] production.ERROR: Database connection failed {\"user\":1}",
+                    "Undefined variable $user (View: /var/www/a.blade.php) at /var/www/app/Http/Kernel.php:120)"),
+        "python": ("2023-12-01 10:30:45 - ERROR - Database connection failed", "Database connection failed"),
+        "django": ("2023-12-01 10:30:45 ERROR Database connection failed [views.py:45]", "Database connection failed [views.py:45]"),
+        "flask": ("2023-12-01 10:30:45 ERROR Database connection failed [app.py:123]", "Database connection failed [app.py:123]"),
+        "express": ("2023-12-01 10:30:45 error: Database connection failed at UserController (controllers/user.js:45:12)",
+                    "Database connection failed at UserController (controllers/user.js:45:12)"),
+        "spring": ("2023-12-01 10:30:45 ERROR c.e.service.UserService - Database connection failed", "Database connection failed"),
+        "fastapi": ("2023-12-01 10:30:45 - app.main - ERROR - main.py:67 - Database connection failed", "Database connection failed"),
+    }
+    results = {}
+    for framework, (raw, message) in samples.items():
+        parser = LOG_PARSERS[framework]
+        for kind, text, level in (("raw", raw, "ERROR"), ("message", message, "error")):
+            started = time.perf_counter()
+            for _ in range(lines):
+                parser.parse(text)
+                normalize_log_level(level)
+            rate = lines / (time.perf_counter() - started)
+            results[f"{framework}:{kind}"] = rate
+            report(f"{framework:<8} {kind:<8} {rate:>12,.0f} lines/sec")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,289 @@
+import os
+import re
+import asyncio
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from ..models.project_log import ProjectLog
+from ..utils.db_context import db_context
+from ..core.config import path_next_to_db
+from ..core.logging_config import get_logger
+
+logger = get_logger("app.log_partitions")
+
+_PARTITION_FILE = re.compile(r"^logs_(?:(\d{8})|(\d{4})w(\d{2}))\.db$")
+
+
+class LogPartition:
+    """One per-day or per-week SQLite file holding a project_logs table"""
+
+    __slots__ = ("name", "start", "end", "path", "min_id", "max_id", "created")
+
+    def __init__(self, name: str, start: datetime, end: datetime, path: str):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.path = path
+        self.min_id: Optional[int] = None
+        self.max_id: Optional[int] = None
+        # Table checked / created in the file by this process
+        self.created = False
+
+    def add_ids(self, first: int, last: int):
+        self.min_id = first if self.min_id is None else min(self.min_id, first)
+        self.max_id = last if self.max_id is None else max(self.max_id, last)
+
+
+class LogPartitionStore:
+    """
+    Partitioned storage for project logs (``LOG_STORAGE_MODE=partitioned``).
+
+    Rows go to ``<directory>/logs_YYYYMMDD.db`` (or ``logs_YYYYwWW.db`` per
+    ISO week) by log time. Each file has its own ``project_logs`` table and
+    is ATTACHed to a pooled connection the first time a query needs it
+    (at most ``max_attached`` per connection, least recently used ones are
+    detached). ``bind`` returns the execution options that point an
+    ordinary ProjectLog query at one partition, so the service layer runs
+    its usual queries per partition, newest first, and stops once it has
+    enough rows. Rows already in the main ``project_logs`` table stay
+    readable as the oldest source.
+
+    Ids are allocated here, continuing after the main table, so they stay
+    unique across files. Retention deletes whole files.
+    """
+
+    def __init__(self, enabled: bool = False, directory: str = "data/log_partitions", period: str = "day",
+                 retention_days: int = 0, max_attached: int = 8, interval: float = 3600):
+        self.enabled = enabled
+        self.directory = directory
+        self.period = period if period in ("day", "week") else "day"
+        self.retention_days = retention_days
+        self.max_attached = max_attached
+        self.interval = interval
+        self._partitions: Dict[str, LogPartition] = {}
+        self._next_id: Optional[int] = None
+        self._lock = threading.RLock()
+        self._task: Optional[asyncio.Task] = None
+
+    # Background retention job
+
+    def start(self):
+        if self.enabled and self.retention_days and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.drop_expired)
+            except Exception as e:
+                logger.error(f"Dropping expired log partitions failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    # Partition registry
+
+    def _period_start(self, log_time: datetime) -> datetime:
+        if log_time.tzinfo is not None:
+            log_time = log_time.astimezone(timezone.utc).replace(tzinfo=None)
+        day = log_time.date()
+        if self.period == "week":
+            day -= timedelta(days=day.weekday())
+        return datetime.combine(day, time())
+
+    def _partition_for(self, log_time: datetime) -> LogPartition:
+        start = self._period_start(log_time)
+        if self.period == "week":
+            year, week, _ = start.isocalendar()
+            name, end = f"logs_{year}w{week:02d}", start + timedelta(days=7)
+        else:
+            name, end = f"logs_{start:%Y%m%d}", start + timedelta(days=1)
+        partition = self._partitions.get(name)
+        if partition is None:
+            partition = self._partitions[name] = LogPartition(name, start, end, os.path.join(self.directory, f"{name}.db"))
+        return partition
+
+    def load(self):
+        """Find partition files and their id ranges; ids continue after all of them"""
+        if not self.enabled:
+            return
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            self._partitions = {}
+            for name in sorted(os.listdir(self.directory)):
+                match = _PARTITION_FILE.match(name)
+                if not match:
+                    continue
+                day, year, week = match.groups()
+                if day:
+                    start = datetime.strptime(day, "%Y%m%d")
+                    end = start + timedelta(days=1)
+                else:
+                    start = datetime.combine(date.fromisocalendar(int(year), int(week), 1), time())
+                    end = start + timedelta(days=7)
+                alias = name[:-3]
+                self._partitions[alias] = LogPartition(alias, start, end, os.path.join(self.directory, name))
+
+            with db_context() as db:
+                next_id = (db.query(func.max(ProjectLog.id)).scalar() or 0) + 1
+                for partition in self._partitions.values():
+                    first, last = db.query(func.min(ProjectLog.id), func.max(ProjectLog.id)).execution_options(
+                        **self.bind(db, partition)
+                    ).one()
+                    if last is not None:
+                        partition.add_ids(first, last)
+                        next_id = max(next_id, last + 1)
+            self._next_id = next_id
+            logger.info(f"Loaded {len(self._partitions)} log partitions, next log id {next_id}")
+
+    def partitions(self, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> List[LogPartition]:
+        """Partitions overlapping the log_time range, newest first"""
+        if self._next_id is None:
+            self.load()
+        with self._lock:
+            return sorted(
+                (
+                    partition for partition in self._partitions.values()
+                    if (date_from is None or partition.end > date_from) and (date_to is None or partition.start <= date_to)
+                ),
+                key=lambda partition: partition.start,
+                reverse=True,
+            )
+
+    def partitions_after_id(self, log_id: int) -> List[LogPartition]:
+        """Partitions that may hold rows with an id above ``log_id``"""
+        return [partition for partition in self.partitions() if partition.max_id is not None and partition.max_id > log_id]
+
+    def partitions_with_id(self, log_id: int) -> List[LogPartition]:
+        return [
+            partition for partition in self.partitions()
+            if partition.min_id is not None and partition.min_id <= log_id <= partition.max_id
+        ]
+
+    # Attaching
+
+    def bind(self, db: Session, partition: Optional[LogPartition]) -> dict:
+        """
+        Execution options running a ProjectLog query against ``partition``
+        (the main table for None), attaching its file to the session connection.
+        """
+        if partition is None:
+            return {}
+        connection = db.connection()
+        # alias -> partition attached under it on this DBAPI connection
+        attached: "OrderedDict[str, LogPartition]" = connection.info.setdefault("log_partitions", OrderedDict())
+        if attached.get(partition.name) is partition:
+            attached.move_to_end(partition.name)
+        else:
+            # Dropped (or reloaded) partitions first, then the least recently used
+            for name in [name for name, known in attached.items() if self._partitions.get(name) is not known]:
+                self._detach(connection, attached, name)
+            while len(attached) >= self.max_attached:
+                if not self._detach(connection, attached, next(iter(attached))):
+                    break
+            connection.exec_driver_sql(f"ATTACH DATABASE ? AS {partition.name}", (partition.path,))
+            attached[partition.name] = partition
+        options = {"schema_translate_map": {None: partition.name}}
+        if not partition.created:
+            with self._lock:
+                if not partition.created:
+                    ProjectLog.__table__.create(connection.execution_options(**options), checkfirst=True)
+                    partition.created = True
+        return options
+
+    @staticmethod
+    def _detach(connection, attached: "OrderedDict[str, LogPartition]", name: str) -> bool:
+        try:
+            connection.exec_driver_sql(f"DETACH DATABASE {name}")
+        except Exception as e:
+            # Busy inside the current transaction, try again on a later query
+            logger.debug(f"Could not detach log partition {name}: {e}")
+            return False
+        attached.pop(name, None)
+        return True
+
+    # Writing
+
+    def insert(self, db: Session, rows: List[dict]) -> List[dict]:
+        """
+        Insert project_logs rows into their partitions; the caller commits.
+        Rows get their id, created_at and updated_at filled in; rows without a
+        log time are stamped with the insert time, which picks their file.
+        """
+        if self._next_id is None:
+            self.load()
+        now = datetime.now(timezone.utc)
+        by_partition: Dict[str, List[dict]] = {}
+        with self._lock:
+            first_id = self._next_id
+            self._next_id += len(rows)
+            for offset, row in enumerate(rows):
+                row["id"] = first_id + offset
+                row.setdefault("created_at", now)
+                row.setdefault("updated_at", now)
+                if row.get("log_time") is None:
+                    row["log_time"] = now
+                partition = self._partition_for(row["log_time"])
+                partition.add_ids(row["id"], row["id"])
+                by_partition.setdefault(partition.name, []).append(row)
+        for name, partition_rows in by_partition.items():
+            db.execute(
+                insert(ProjectLog).execution_options(**self.bind(db, self._partitions[name])),
+                partition_rows,
+            )
+        return rows
+
+    # Retention
+
+    def drop_expired(self) -> List[str]:
+        """Delete partitions whose whole period is older than the retention"""
+        if not self.enabled or not self.retention_days:
+            return []
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=self.retention_days)
+        dropped = []
+        with self._lock:
+            for partition in self.partitions():
+                if partition.end > cutoff:
+                    continue
+                self._partitions.pop(partition.name, None)
+                try:
+                    os.remove(partition.path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"Could not delete log partition {partition.path}: {e}")
+                dropped.append(partition.name)
+        if dropped:
+            logger.info(f"Dropped {len(dropped)} expired log partitions: {', '.join(dropped)}")
+        return dropped
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "period": self.period,
+            "retention_days": self.retention_days,
+            "partitions": [
+                {
+                    "name": partition.name,
+                    "start": partition.start.isoformat(),
+                    "end": partition.end.isoformat(),
+                    "size": os.path.getsize(partition.path) if os.path.exists(partition.path) else 0,
+                }
+                for partition in self.partitions()
+            ] if self.enabled else [],
+        }
+
+
+log_partitions = LogPartitionStore(
+    enabled=os.getenv('LOG_STORAGE_MODE', 'table').lower() == 'partitioned',
+    directory=os.getenv('LOG_PARTITION_DIR') or path_next_to_db('log_partitions'),
+    period=os.getenv('LOG_PARTITION_PERIOD', 'day').lower(),
+    retention_days=int(os.getenv('LOG_PARTITION_RETENTION_DAYS', '0')),
+    max_attached=int(os.getenv('LOG_PARTITION_MAX_ATTACHED', '8')),
+)
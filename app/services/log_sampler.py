@@ -0,0 +1,146 @@
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from ..models.project_log_sample import ProjectLogSample
+from ..schemas.project_log_schema import ProjectLogCreate
+from ..core.logging_config import get_logger
+
+logger = get_logger("app.log_sampler")
+
+# Only the head of a message decides its template, stack traces can be huge
+TEMPLATE_SOURCE_SIZE = 1000
+
+_VARIABLE_PATTERNS = [
+    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "<uuid>"),
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<time>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b|\b[0-9a-fA-F]{12,}\b"), "<hex>"),
+    (re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?\b"), "<ip>"),
+    (re.compile(r"\"[^\"]*\"|'[^']*'"), "<str>"),
+    (re.compile(r"-?\b\d+(?:\.\d+)?\b"), "<num>"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize_log_message(message: str) -> str:
+    """Reduce a log message to its template by masking ids, numbers, quoted values and times"""
+    template = message[:TEMPLATE_SOURCE_SIZE]
+    for pattern, replacement in _VARIABLE_PATTERNS:
+        template = pattern.sub(replacement, template)
+    return template.strip()
+
+
+def log_fingerprint(level: str, template: str) -> str:
+    return hashlib.blake2b(f"{level}\0{template}".encode(), digest_size=8).hexdigest()
+
+
+class LogSampler:
+    """
+    Per-project sampler for log storms.
+
+    Messages are grouped by level and normalized template into fixed windows
+    of ``window`` seconds (by log time). The first ``keep`` occurrences of a
+    template per window are stored as regular rows; later ones only bump a
+    ``project_log_samples`` counter row with count, first_seen and last_seen.
+    Levels in ``bypass_levels`` are never sampled. ``keep`` 0 disables
+    sampling.
+    """
+
+    def __init__(self, window: int = 60, keep: int = 20, bypass_levels=("ERROR", "CRITICAL"),
+                 max_keys: int = 50000):
+        self.window = window
+        self.keep = keep
+        self.bypass_levels = {level.strip().upper() for level in bypass_levels if level.strip()}
+        self.max_keys = max_keys
+        # (project_id, fingerprint, window start) -> rows stored in that window
+        self._stored: "OrderedDict[Tuple[int, str, datetime], int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _window_start(self, log_time: datetime) -> datetime:
+        if log_time is None:
+            log_time = datetime.now(timezone.utc)
+        if log_time.tzinfo is None:
+            log_time = log_time.replace(tzinfo=timezone.utc)
+        seconds = int(log_time.timestamp())
+        return datetime.fromtimestamp(seconds - seconds % self.window, timezone.utc).replace(tzinfo=None)
+
+    def sample(self, entries: List[ProjectLogCreate]) -> Tuple[List[ProjectLogCreate], List[dict]]:
+        """Split entries into rows to store and counter rows for the rest"""
+        if not self.keep:
+            return entries, []
+
+        kept = []
+        suppressed: Dict[Tuple[int, str, datetime], dict] = {}
+        with self._lock:
+            for entry in entries:
+                level = (entry.log_level or "").upper()
+                if level in self.bypass_levels:
+                    kept.append(entry)
+                    continue
+
+                template = normalize_log_message(entry.message)
+                key = (entry.project_id, log_fingerprint(level, template), self._window_start(entry.log_time))
+                stored = self._stored.get(key, 0)
+                if stored < self.keep:
+                    self._stored[key] = stored + 1
+                    if not stored:
+                        while len(self._stored) > self.max_keys:
+                            self._stored.popitem(last=False)
+                    kept.append(entry)
+                    continue
+
+                row = suppressed.get(key)
+                if row is None:
+                    row = suppressed[key] = {
+                        "project_id": entry.project_id,
+                        "fingerprint": key[1],
+                        "window_start": key[2],
+                        "log_level": entry.log_level,
+                        "template": template,
+                        "message": entry.message,
+                        "count": 0,
+                        "first_seen": entry.log_time,
+                        "last_seen": entry.log_time,
+                    }
+                row["count"] += 1
+                row["message"] = entry.message
+                if entry.log_time is not None:
+                    if row["first_seen"] is None or entry.log_time < row["first_seen"]:
+                        row["first_seen"] = entry.log_time
+                    if row["last_seen"] is None or entry.log_time > row["last_seen"]:
+                        row["last_seen"] = entry.log_time
+
+        if suppressed:
+            logger.debug(f"Sampled out {len(entries) - len(kept)} of {len(entries)} log rows")
+        return kept, list(suppressed.values())
+
+    def store_suppressed(self, db: Session, rows: List[dict]):
+        """Add suppressed occurrences to their counter rows; the caller commits"""
+        # Keep each statement well below SQLite's bound parameter limit
+        for start in range(0, len(rows), 100):
+            stmt = insert(ProjectLogSample).values(rows[start:start + 100])
+            first_seen = (ProjectLogSample.first_seen, stmt.excluded.first_seen)
+            last_seen = (ProjectLogSample.last_seen, stmt.excluded.last_seen)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["project_id", "fingerprint", "window_start"],
+                set_={
+                    "count": ProjectLogSample.count + stmt.excluded.count,
+                    "message": stmt.excluded.message,
+                    "first_seen": func.min(func.coalesce(*first_seen), func.coalesce(*reversed(first_seen))),
+                    "last_seen": func.max(func.coalesce(*last_seen), func.coalesce(*reversed(last_seen))),
+                },
+            )
+            db.execute(stmt)
+
+
+log_sampler = LogSampler(
+    window=int(os.getenv('LOG_SAMPLE_WINDOW', '60')),
+    keep=int(os.getenv('LOG_SAMPLE_KEEP', '20')),
+    bypass_levels=os.getenv('LOG_SAMPLE_BYPASS_LEVELS', 'ERROR,CRITICAL').split(','),
+)
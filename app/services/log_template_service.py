@@ -0,0 +1,268 @@
+import os
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import func, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from ..models.project_log import ProjectLog
+from ..models.log_template import LogTemplate
+from ..models.log_template_count import LogTemplateCount
+from ..schemas.log_template_schema import LogTemplatePattern
+from .log_sampler import normalize_log_message
+from .log_partition_service import log_partitions
+from ..utils.db_context import db_context
+from ..core.logging_config import get_logger
+
+logger = get_logger("app.log_templates")
+
+WILDCARD = "<*>"
+
+# Levels shown as error patterns (Monolog levels above ERROR included)
+ERROR_LEVELS = ("ERROR", "CRITICAL", "ALERT", "EMERGENCY")
+
+
+class LogCluster:
+    __slots__ = ("template_id", "tokens")
+
+    def __init__(self, template_id: int, tokens: List[str]):
+        self.template_id = template_id
+        self.tokens = tokens
+
+
+class DrainTree:
+    """
+    Drain-style template miner.
+
+    Messages are masked (see normalize_log_message) and split into tokens,
+    then routed by project, level, token count and their first ``depth``
+    tokens to a short list of clusters. A message joins the most similar
+    cluster when at least ``similarity`` of its tokens match; tokens that
+    differ become ``<*>`` in the cluster template. Tokens with digits never
+    route, and a node with ``max_children`` prefixes sends new ones to a
+    shared wildcard branch.
+    """
+
+    def __init__(self, depth: int = 2, similarity: float = 0.5, max_children: int = 100):
+        self.depth = depth
+        self.similarity = similarity
+        self.max_children = max_children
+        self._clusters: Dict[tuple, List[LogCluster]] = {}
+        self._prefixes: Dict[tuple, set] = {}
+
+    @staticmethod
+    def tokenize(message: str) -> List[str]:
+        return normalize_log_message(message or "").split(" ")
+
+    def route(self, project_id: int, level: str, tokens: List[str]) -> tuple:
+        node = (project_id, level, len(tokens))
+        prefix = tuple(
+            WILDCARD if any(char.isdigit() for char in token) else token
+            for token in tokens[:self.depth]
+        )
+        known = self._prefixes.setdefault(node, set())
+        if prefix not in known:
+            if len(known) >= self.max_children:
+                prefix = (WILDCARD,) * len(prefix)
+            known.add(prefix)
+        return node + prefix
+
+    def match(self, route: tuple, tokens: List[str]) -> Tuple[Optional[LogCluster], bool]:
+        """Return the best cluster for the tokens (or None) and whether its template changed"""
+        best, best_similarity, best_params = None, -1.0, -1
+        for cluster in self._clusters.get(route, ()):
+            same = params = 0
+            for template_token, token in zip(cluster.tokens, tokens):
+                if template_token == WILDCARD:
+                    params += 1
+                    same += 1
+                elif template_token == token:
+                    same += 1
+            similarity = same / len(tokens)
+            if similarity > best_similarity or (similarity == best_similarity and params > best_params):
+                best, best_similarity, best_params = cluster, similarity, params
+
+        if best is None or best_similarity < self.similarity:
+            return None, False
+
+        changed = False
+        for i, token in enumerate(tokens):
+            if best.tokens[i] != token and best.tokens[i] != WILDCARD:
+                best.tokens[i] = WILDCARD
+                changed = True
+        return best, changed
+
+    def add(self, route: tuple, cluster: LogCluster):
+        self._clusters.setdefault(route, []).append(cluster)
+
+
+class LogTemplateMiner:
+    """
+    Background job assigning a template to every new project_logs row.
+
+    Rows are read in id order from a cursor, matched against a DrainTree
+    rebuilt from ``log_templates`` at startup, and the results (row
+    template_id, template text and totals, per-hour counts in
+    ``log_template_counts``) are written in one transaction per batch.
+    With partitioned log storage, ids are unique across partitions, so the
+    cursor also covers rows in partition files.
+    """
+
+    def __init__(self, batch_size: int = 2000, interval: float = 10.0,
+                 depth: int = 2, similarity: float = 0.5):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.depth = depth
+        self.similarity = similarity
+        self.tree: Optional[DrainTree] = None
+        self._cursor = 0
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                processed = await asyncio.to_thread(self.mine_batch)
+            except Exception as e:
+                logger.error(f"Log template mining failed: {e}")
+                processed = 0
+            # Keep going while there is a backlog
+            if processed < self.batch_size:
+                await asyncio.sleep(self.interval)
+
+    def _load(self, db: Session):
+        tree = DrainTree(depth=self.depth, similarity=self.similarity)
+        templates = db.query(LogTemplate.id, LogTemplate.project_id, LogTemplate.log_level, LogTemplate.template).order_by(LogTemplate.id)
+        for template_id, project_id, level, template in templates:
+            tokens = template.split(" ")
+            tree.add(tree.route(project_id, level, tokens), LogCluster(template_id, tokens))
+        mined = db.query(func.max(ProjectLog.id)).filter(ProjectLog.template_id.isnot(None))
+        sources = [None, *log_partitions.partitions()] if log_partitions.enabled else [None]
+        self._cursor = max(
+            mined.execution_options(**log_partitions.bind(db, source)).scalar() or 0 for source in sources
+        )
+        self.tree = tree
+        logger.info(f"Loaded log templates, mining project logs after id {self._cursor}")
+
+    def mine_batch(self) -> int:
+        """Assign templates to the next batch of rows, returns the number processed"""
+        with self._lock:
+            try:
+                with db_context() as db:
+                    if self.tree is None:
+                        self._load(db)
+                    processed = self._mine(db)
+                    db.commit()
+                    return processed
+            except Exception:
+                # The tree may hold clusters that were rolled back, rebuild it
+                self.tree = None
+                raise
+
+    def _mine(self, db: Session) -> int:
+        query = db.query(
+            ProjectLog.id, ProjectLog.project_id, ProjectLog.log_level, ProjectLog.message, ProjectLog.log_time
+        ).filter(ProjectLog.id > self._cursor).order_by(ProjectLog.id).limit(self.batch_size)
+        sources = [None, *log_partitions.partitions_after_id(self._cursor)] if log_partitions.enabled else [None]
+        # row id -> partition it was read from (None for the main table)
+        row_sources = {}
+        rows = []
+        for source in sources:
+            for row in query.execution_options(**log_partitions.bind(db, source)).all():
+                row_sources[row[0]] = source
+                rows.append(row)
+        if not rows:
+            return 0
+        if len(sources) > 1:
+            rows = sorted(rows, key=lambda row: row[0])[:self.batch_size]
+
+        assignments = []
+        hourly: Dict[Tuple[int, datetime], int] = {}
+        # template id -> [rows, first_seen, last_seen, template text or None]
+        touched: Dict[int, list] = {}
+        for row_id, project_id, log_level, message, log_time in rows:
+            level = (log_level or "").upper()
+            tokens = self.tree.tokenize(message)
+            route = self.tree.route(project_id, level, tokens)
+            cluster, changed = self.tree.match(route, tokens)
+            if cluster is None:
+                template = LogTemplate(project_id=project_id, log_level=level, template=" ".join(tokens), count=0)
+                db.add(template)
+                db.flush()
+                cluster = LogCluster(template.id, list(tokens))
+                self.tree.add(route, cluster)
+
+            stats = touched.setdefault(cluster.template_id, [0, log_time, log_time, None])
+            stats[0] += 1
+            if log_time is not None:
+                stats[1] = min(stats[1] or log_time, log_time)
+                stats[2] = max(stats[2] or log_time, log_time)
+                hour = log_time.replace(minute=0, second=0, microsecond=0)
+                hourly[(cluster.template_id, hour)] = hourly.get((cluster.template_id, hour), 0) + 1
+            if changed:
+                stats[3] = " ".join(cluster.tokens)
+            assignments.append({"id": row_id, "template_id": cluster.template_id})
+
+        if len(sources) == 1:
+            db.bulk_update_mappings(ProjectLog, assignments)
+        else:
+            by_source: Dict[object, list] = {}
+            for assignment in assignments:
+                by_source.setdefault(row_sources[assignment["id"]], []).append(assignment)
+            for source, source_assignments in by_source.items():
+                db.execute(update(ProjectLog).execution_options(**log_partitions.bind(db, source)), source_assignments)
+        for template_id, (count, first_seen, last_seen, text) in touched.items():
+            values = {LogTemplate.count: LogTemplate.count + count}
+            if first_seen is not None:
+                values[LogTemplate.first_seen] = func.min(func.coalesce(LogTemplate.first_seen, first_seen), first_seen)
+                values[LogTemplate.last_seen] = func.max(func.coalesce(LogTemplate.last_seen, last_seen), last_seen)
+            if text is not None:
+                values[LogTemplate.template] = text
+            db.query(LogTemplate).filter(LogTemplate.id == template_id).update(values, synchronize_session=False)
+
+        counts = [{"template_id": template_id, "hour": hour, "count": count} for (template_id, hour), count in hourly.items()]
+        for start in range(0, len(counts), 300):
+            stmt = insert(LogTemplateCount).values(counts[start:start + 300])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["template_id", "hour"],
+                set_={"count": LogTemplateCount.count + stmt.excluded.count},
+            )
+            db.execute(stmt)
+
+        self._cursor = rows[-1][0]
+        logger.debug(f"Mined templates for {len(rows)} project logs ({len(touched)} templates)")
+        return len(rows)
+
+
+def get_top_error_patterns(db: Session, project_id: int, hours: int = 24, limit: int = 10,
+                           levels: Sequence[str] = ERROR_LEVELS) -> List[LogTemplatePattern]:
+    """Most frequent error templates of a project over the last ``hours`` hours of log time"""
+    since = (datetime.now(timezone.utc) - timedelta(hours=hours)).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+    total = func.sum(LogTemplateCount.count).label("count")
+    rows = db.query(
+        LogTemplate.id, LogTemplate.template, LogTemplate.log_level, LogTemplate.last_seen, total
+    ).join(
+        LogTemplateCount, LogTemplateCount.template_id == LogTemplate.id
+    ).filter(
+        LogTemplate.project_id == project_id,
+        LogTemplate.log_level.in_(levels),
+        LogTemplateCount.hour >= since,
+    ).group_by(LogTemplate.id).order_by(total.desc()).limit(limit).all()
+    return [LogTemplatePattern(**row._mapping) for row in rows]
+
+
+log_template_miner = LogTemplateMiner(
+    batch_size=int(os.getenv('LOG_TEMPLATE_BATCH_SIZE', '2000')),
+    interval=float(os.getenv('LOG_TEMPLATE_INTERVAL', '10')),
+    similarity=float(os.getenv('LOG_TEMPLATE_SIMILARITY', '0.5')),
+)
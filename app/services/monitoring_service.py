@@ -0,0 +1,270 @@
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from datetime import datetime
+from ..schemas.monitoring_schema import MonitoringData, LogEntry, ServiceStatus, StreamLogEntry, SystemMetrics
+from ..schemas.project_log_schema import ProjectLogCreate, LogResponse
+from ..schemas.system_metric_schema import SystemMetricCreate
+from ..schemas.service_worker_schema import ServiceWorkerUpdateAgent
+from .project_log_service import create_project_logs_batch
+from .system_metric_service import create_system_metric
+from .service_worker_service import update_worker_from_agent
+from .project_service import get_project_frameworks
+from .threshold_monitor import run_threshold_monitoring
+from .ingest_batch_service import recent_batches
+from .log_sampler import log_sampler
+from .log_assembler import assemble_log_events
+from .log_parser import parse_log_entries
+from .project_log_stats_service import record_log_stats
+from .log_error_rate import log_error_rates
+from ..utils.db_context import db_context
+from ..core.logging_config import get_logger
+
+logger = get_logger("app.monitoring")
+
+
+def parse_log_type(log_type: str) -> Optional[int]:
+    """Get the project id from a 'framework_projectid' log group key"""
+    # Split dengan limit untuk handle project_id yang mungkin ada underscore
+    parts = log_type.split("_", 1)
+    if len(parts) != 2:
+        logger.warning(f"Invalid log_type format: {log_type}, expected 'framework_projectid'")
+        return None
+    try:
+        return int(parts[1])
+    except ValueError:
+        logger.warning(f"Invalid project id in log_type '{log_type}'")
+        return None
+
+
+def to_project_log(project_id: int, log: LogEntry) -> ProjectLogCreate:
+    return ProjectLogCreate(
+        log_level=log.level,
+        log_time=log.timestamp,
+        project_id=project_id,
+        message=log.message,
+        context=log.context,
+        controller=log.controller,
+        line_number=log.line_number,
+        file_path=log.file_path,
+    )
+
+
+def prepare_project_logs(logs: Dict[str, List[LogEntry]]) -> List[ProjectLogCreate]:
+    """Turn agent log groups keyed by 'framework_projectid' into log rows"""
+    all_log_entries = []
+    for log_type, entries in logs.items():
+        project_id = parse_log_type(log_type)
+        if project_id is None:
+            continue
+        all_log_entries.extend(to_project_log(project_id, log) for log in entries)
+        logger.debug(f"Prepared {len(entries)} logs for {log_type} (project_id: {project_id})")
+    return all_log_entries
+
+
+def parse_stream_log_record(line: bytes) -> StreamLogEntry:
+    """Parse one NDJSON log record, raises ValueError when it is unusable"""
+    record = StreamLogEntry.model_validate_json(line)
+    if record.project_id is None and record.log_type:
+        record.project_id = parse_log_type(record.log_type)
+    if record.project_id is None:
+        raise ValueError("record needs a project_id or a 'framework_projectid' log_type")
+    return record
+
+
+class LogChunk:
+    """
+    Streamed log rows waiting to be committed together.
+
+    Records carrying a batch id and ``seq`` are dropped when the sequence is
+    not above the highest one already stored (or buffered) for that batch,
+    so an agent can resend a batch from the start after a failed upload.
+    Whole groups sent with a batch id are dropped once that id is stored.
+    """
+
+    def __init__(self):
+        self.entries: List[ProjectLogCreate] = []
+        # batch id -> highest buffered seq, None for whole batches
+        self.marks: Dict[str, Optional[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add_record(self, record: StreamLogEntry, batch_id: Optional[str] = None) -> bool:
+        """Buffer one record, returns False when it was already stored"""
+        batch_id = record.batch_id or batch_id
+        if batch_id and record.seq is not None:
+            stored = self.marks.get(batch_id)
+            if stored is None:
+                stored = recent_batches.stored_seq(batch_id)
+            if stored is not None and record.seq <= stored:
+                return False
+            self.marks[batch_id] = record.seq
+        self.entries.append(to_project_log(record.project_id, record))
+        return True
+
+    def add_group(self, entries: List[ProjectLogCreate], batch_id: Optional[str] = None) -> bool:
+        """Buffer a whole group of rows, returns False when it was already stored"""
+        if batch_id:
+            if batch_id in self.marks or recent_batches.is_stored(batch_id):
+                return False
+            self.marks[batch_id] = None
+        self.entries.extend(entries)
+        return True
+
+    def take(self) -> "LogChunk":
+        """Hand the buffered rows over for storing and start an empty chunk"""
+        chunk = LogChunk()
+        chunk.entries, chunk.marks = self.entries, self.marks
+        self.entries, self.marks = [], {}
+        return chunk
+
+
+def store_project_logs(db: Session, entries: List[ProjectLogCreate]) -> List[LogResponse]:
+    """
+    Insert prepared log rows; the caller commits.
+
+    Stack trace lines are first joined into their event, which is then
+    parsed with the project framework parser (level, structured fields).
+    Every event is added to the hourly level counters and the error rate
+    counters; repeats of log storms are then counted instead of stored.
+    """
+    if not entries:
+        return []
+    frameworks = get_project_frameworks(db)
+    entries = parse_log_entries(assemble_log_events(entries, frameworks), frameworks)
+    record_log_stats(db, entries)
+    log_error_rates.record(entries)
+    entries, suppressed = log_sampler.sample(entries)
+    log_sampler.store_suppressed(db, suppressed)
+    return create_project_logs_batch(db, entries)
+
+
+def store_project_log_chunk(chunk: LogChunk) -> int:
+    """Insert and commit one chunk of streamed logs and its batch marks in its own session"""
+    with db_context() as db:
+        inserted = store_project_logs(db, chunk.entries)
+        for batch_id, last_seq in chunk.marks.items():
+            recent_batches.mark(db, batch_id, last_seq)
+        db.commit()
+    for batch_id, last_seq in chunk.marks.items():
+        recent_batches.remember(batch_id, last_seq)
+    return len(inserted)
+
+
+def store_system_metric(db: Session, metrics: SystemMetrics):
+    """Insert one system metric sample (commits pending work in the session)"""
+    system_metrics_dict = metrics.model_dump()
+    if isinstance(system_metrics_dict["timestamp"], str):
+        # convert to datetime jika masih string dan belum ISO
+        system_metrics_dict["timestamp"] = datetime.fromisoformat(system_metrics_dict["timestamp"])
+    system_metric = create_system_metric(db, SystemMetricCreate.model_validate(system_metrics_dict))
+    logger.info(f"Created system metric: {system_metric.id}")
+    return system_metric
+
+
+def ingest_system_metric(metrics: SystemMetrics) -> dict:
+    """Store a metric sample sent on its own and run threshold monitoring"""
+    with db_context() as db:
+        system_metric = store_system_metric(db, metrics)
+    created_alarms = run_threshold_monitoring()
+    return {"system_metric_id": system_metric.id, "created_alarms": created_alarms}
+
+
+def ingest_services(services: List[ServiceStatus]) -> int:
+    """Apply service states sent on their own"""
+    with db_context() as db:
+        return update_workers_from_services(db, services)
+
+
+def update_workers_from_services(db: Session, services: List[ServiceStatus]) -> int:
+    """Apply service states reported by the agent, returns the number of known workers"""
+    updated = 0
+    for sw in services:
+        worker = update_worker_from_agent(
+            db,
+            sw.name,
+            ServiceWorkerUpdateAgent(
+                name=sw.name,
+                description=sw.name,
+                is_monitoring=True,
+                is_enabled=sw.enabled,
+                status=sw.status)
+        )
+        if worker is not None:
+            updated += 1
+    return updated
+
+
+def ingest_monitoring_data(db: Session, data: MonitoringData) -> dict:
+    """
+    Store one agent report: project logs, the system metric and service states,
+    then run threshold monitoring.
+
+    Returns ids and counts of what was stored; raises when the system metric
+    cannot be stored. A report whose ``batch_id`` was already stored, or is
+    being stored by a concurrent request, is skipped entirely and answered
+    with the original result, marked as a duplicate. Raises BatchInFlight
+    when the concurrent request is still storing it after INGEST_MAX_WAIT.
+    """
+    if data.batch_id and not recent_batches.claim(data.batch_id):
+        logger.info(f"Skipping duplicate report batch {data.batch_id}")
+        stored = recent_batches.result(data.batch_id) or {
+            "system_metric_id": None,
+            "log_ids": [],
+            "logs_received": sum(len(entries) for entries in data.logs.values()),
+            "logs_inserted": 0,
+            "workers_updated": 0,
+        }
+        # Alarms belong to the original request
+        return {**stored, "created_alarms": [], "duplicate": True}
+
+    result = None
+    try:
+        result = _ingest_report(db, data)
+        return result
+    finally:
+        if data.batch_id:
+            recent_batches.release(
+                data.batch_id,
+                {key: value for key, value in result.items() if key not in ("created_alarms", "duplicate")} if result else None,
+            )
+
+
+def _ingest_report(db: Session, data: MonitoringData) -> dict:
+    logs_received = sum(len(entries) for entries in data.logs.values())
+
+    # 1. Insert logs
+    log_entries = prepare_project_logs(data.logs)
+    inserted_logs = []
+    if log_entries:
+        try:
+            inserted_logs = store_project_logs(db, log_entries)
+        except Exception as e:
+            logger.error(f"Failed to batch insert logs: {e}")
+            # Don't fail the entire request, continue with other operations
+    else:
+        logger.info("No valid log entries to insert")
+
+    # 2. Insert system metric (commits the logs and the batch id as well)
+    if data.batch_id:
+        recent_batches.mark(db, data.batch_id)
+    system_metric = store_system_metric(db, data.system_metrics)
+    if data.batch_id:
+        recent_batches.remember(data.batch_id)
+
+    # 3. Update service workers
+    workers_updated = update_workers_from_services(db, data.services)
+
+    # 4. Threshold monitoring - check thresholds and create alarms
+    logger.info("Running threshold monitoring...")
+    created_alarms = run_threshold_monitoring()
+
+    return {
+        "system_metric_id": system_metric.id,
+        "log_ids": [log.id for log in inserted_logs],
+        "logs_received": logs_received,
+        "logs_inserted": len(inserted_logs),
+        "workers_updated": workers_updated,
+        "created_alarms": created_alarms,
+        "duplicate": False,
+    }
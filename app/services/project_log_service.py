@@ -1,24 +1,36 @@
+import base64
+import heapq
+import json
+from collections import Counter
+from itertools import islice
+from datetime import datetime
 from typing import Optional,Dict
 from app.models.project_log import ProjectLog as ProjectLogModel
-from app.models.user import User
 from sqlalchemy.orm import Session
 from app.schemas import AdapterListResponse
 from fastapi import Request
-from app.schemas.project_log_schema import LogResponse,ProjectLogCreate
+from app.schemas.project_log_schema import LogResponse,ProjectLogCreate,LogBlockResponse
 from app.utils.query_adapter import QueryAdapter
-from app.utils.timezone_utils import convert_utc_to_user_timezone, get_user_timezone_from_session, format_datetime_for_user
+from app.utils.timezone_utils import convert_utc_to_user_timezone, convert_fields_to_user_timezone, get_user_timezone_from_session, format_datetime_for_user
+from app.services.user_service import resolve_user_timezone
+from app.services.log_archive_service import ArchiveFilter, log_archive
+from app.services.log_partition_service import log_partitions
 from sqlalchemy.exc import IntegrityError
-from typing import List
+from sqlalchemy import and_, or_, func
+from typing import Iterator, List, Tuple
+
+LOG_TIME_FIELDS = ("log_time", "created_at", "updated_at")
+
+# Exported log fields and their types (see encode_export)
+LOG_EXPORT_COLUMNS = {
+    "id": int, "project_id": int, "log_level": str, "message": str, "log_time": datetime,
+    "context": str, "controller": str, "line_number": int, "file_path": str,
+    "created_at": datetime, "updated_at": datetime,
+}
 
 def get_user_timezone(db: Session, user_id: Optional[int]) -> str:
-    """Get user timezone from database, fallback to UTC"""
-    if not user_id:
-        return 'UTC'
-    
-    user = db.query(User).filter(User.id == user_id).first()
-    if user and hasattr(user, 'user_timezone'):
-        return str(user.user_timezone)
-    return 'UTC'
+    """Get user timezone (cached per user), fallback to UTC"""
+    return resolve_user_timezone(db, user_id)
 
 def get_pagination_log_project(
     request: Optional[Request], db: Session, user_id: Optional[int] = None, query_params: Optional[Dict[str, str]] = None
@@ -31,32 +43,266 @@ def get_pagination_log_project(
         allowed_search_fields=allowed_searchs,
         query_params=query_params,  # Bisa None
     )
-    query, page, limit, count = adapter.adapt(base_query)
-    items = query.all()
+    if log_partitions.enabled:
+        query = adapter.simple_adapt(base_query)
+        sources = _log_sources(adapter.query_params)
+        count = sum(_on_source(db, query, source).count() for source in sources)
+        try:
+            limit = min(int(adapter.query_params.get("limit", adapter.max_limit)), adapter.max_limit)
+            page = int(adapter.query_params.get("page", 1))
+        except (ValueError, TypeError):
+            page = limit = None
+        if page and page > 0 and limit and limit > 0:
+            items, _ = _log_rows_at_offset(db, query, sources, (page - 1) * limit, limit)
+        else:
+            page = limit = None
+            items = [item for source in sources for item in _on_source(db, query, source).all()]
+    else:
+        query, page, limit, count = adapter.adapt(base_query)
+        items = query.all()
     
     # Get user timezone
     user_timezone = get_user_timezone(db, user_id)
     
     # Convert times to user timezone
-    data = []
-    for item in items:
-        log_response = LogResponse.model_validate(item)
-        # Convert UTC times to user timezone
-        if log_response.log_time:
-            log_response.log_time = convert_utc_to_user_timezone(log_response.log_time, user_timezone)
-        if log_response.created_at:
-            log_response.created_at = convert_utc_to_user_timezone(log_response.created_at, user_timezone)
-        if log_response.updated_at:
-            log_response.updated_at = convert_utc_to_user_timezone(log_response.updated_at, user_timezone)
-        data.append(log_response)
+    data = convert_fields_to_user_timezone(
+        (LogResponse.model_validate(item) for item in items), LOG_TIME_FIELDS, user_timezone
+    )
     
     return AdapterListResponse[LogResponse](
         page=page, limit=limit, total=count, data=data
     )
 
+def encode_log_cursor(log_time: Optional[datetime], log_id: int) -> str:
+    """Encode the position after a log row as an opaque keyset cursor"""
+    raw = json.dumps([log_time.isoformat() if log_time else None, log_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_log_cursor(cursor: str) -> Optional[tuple]:
+    """Decode a keyset cursor, returning None when it is malformed"""
+    try:
+        log_time, log_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (datetime.fromisoformat(log_time) if log_time else None, int(log_id))
+    except (ValueError, TypeError):
+        return None
+
+def _filtered_log_project_query(db: Session, project_id: int, query_params: Optional[Dict[str, str]]):
+    allowed_searchs = ["log_level", "message"]
+    params = {
+        key: value for key, value in (query_params or {}).items()
+        if key not in ("page", "limit")
+    }
+    base_query = db.query(ProjectLogModel).filter(ProjectLogModel.project_id == project_id)
+    adapter = QueryAdapter(
+        model=ProjectLogModel,
+        allowed_search_fields=allowed_searchs,
+        query_params=params,
+    )
+    return adapter.simple_adapt(base_query)
+
+def _log_sources(query_params: Optional[Dict[str, str]] = None, before_time: Optional[datetime] = None) -> list:
+    """
+    Where logs in the filtered log_time range live, newest first: the
+    partitions overlapping it (partitioned storage only), then the main
+    table as None. ``before_time`` caps the range at a keyset cursor.
+    """
+    if not log_partitions.enabled:
+        return [None]
+    bounds = ArchiveFilter(query_params)
+    date_to = bounds.date_to
+    if before_time is not None:
+        date_to = min(date_to, before_time) if date_to else before_time
+    return [*log_partitions.partitions(bounds.date_from, date_to), None]
+
+def _on_source(db: Session, query, source):
+    """Run a ProjectLog query against a partition, or the main table for None"""
+    return query.execution_options(**log_partitions.bind(db, source))
+
+def _log_rows_at_offset(db: Session, query, sources: list, offset: int, limit: int) -> Tuple[list, int]:
+    """
+    Rows ``offset`` to ``offset + limit`` of an ordered query read across
+    sources in turn, plus the part of the offset left past the last one.
+    """
+    items = []
+    for source in sources:
+        if len(items) >= limit:
+            break
+        source_query = _on_source(db, query, source)
+        if offset:
+            count = source_query.order_by(None).count()
+            if offset >= count:
+                offset -= count
+                continue
+        items.extend(source_query.offset(offset).limit(limit - len(items)).all())
+        offset = 0
+    return items, offset
+
+def count_log_project(db: Session, project_id: int, query_params: Optional[Dict[str, str]] = None) -> int:
+    """Count a project's logs matching the given filters, archived ones included"""
+    query = _filtered_log_project_query(db, project_id, query_params)
+    count = sum(_on_source(db, query, source).count() for source in _log_sources(query_params))
+    if log_archive.newest_time(project_id) is not None:
+        count += log_archive.count(project_id, ArchiveFilter(query_params))
+    return count
+
+# Structured fields offered as facets, each backed by a (project_id, field, log_time) index
+LOG_FACET_FIELDS = ("controller", "file_path")
+
+def get_log_facets(
+    db: Session,
+    project_id: int,
+    field: str,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: int = 50,
+) -> List[Tuple[str, int]]:
+    """
+    Most common values of a structured field with their row counts.
+
+    Only the project and the log_time range narrow the counts, so the
+    GROUP BY is answered from the covering index without reading rows.
+    """
+    if field not in LOG_FACET_FIELDS:
+        raise ValueError(f"Unknown log facet: {field}")
+    column = getattr(ProjectLogModel, field)
+    total = func.count()
+    query = db.query(column, total).filter(
+        ProjectLogModel.project_id == project_id,
+        column.isnot(None),
+    )
+    if date_from:
+        query = query.filter(ProjectLogModel.log_time >= date_from)
+    if date_to:
+        query = query.filter(ProjectLogModel.log_time <= date_to)
+    query = query.group_by(column).order_by(total.desc())
+    sources = _log_sources({"log_time__gte": date_from, "log_time__lte": date_to})
+    if len(sources) == 1:
+        return [tuple(row) for row in _on_source(db, query, sources[0]).limit(limit).all()]
+    # Values are summed across partitions, so each one needs its full list
+    counts = Counter()
+    for source in sources:
+        counts.update(dict(_on_source(db, query, source).all()))
+    return counts.most_common(limit)
+
+def get_log_project_block(
+    db: Session,
+    project_id: int,
+    query_params: Optional[Dict[str, str]] = None,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 100,
+    user_timezone: Optional[str] = 'UTC',
+) -> LogBlockResponse:
+    """
+    Fetch one block of a project's logs, newest first, for lazy-loading grids.
+
+    Blocks are located with a keyset cursor on (log_time, id) so deep pages
+    cost the same as the first one; ``offset`` is only used when the client
+    jumps to a block whose predecessor it has not loaded. Pass
+    ``user_timezone=None`` to keep times in UTC for browser-side formatting.
+
+    Archived rows (see LogArchive) are merged in once the block reaches
+    the archived time range, so callers see one continuous history.
+    """
+    query = _filtered_log_project_query(db, project_id, query_params)
+    newest_archived = log_archive.newest_time(project_id)
+
+    position = decode_log_cursor(cursor) if cursor else None
+    sources = _log_sources(query_params, position[0] if position else None)
+    if position:
+        cursor_time, cursor_id = position
+        if cursor_time is None:
+            # NULL log_time rows sort last in descending order
+            query = query.filter(ProjectLogModel.log_time.is_(None), ProjectLogModel.id < cursor_id)
+        else:
+            query = query.filter(or_(
+                ProjectLogModel.log_time < cursor_time,
+                and_(ProjectLogModel.log_time == cursor_time, ProjectLogModel.id < cursor_id),
+                ProjectLogModel.log_time.is_(None),
+            ))
+    query = query.order_by(ProjectLogModel.log_time.desc(), ProjectLogModel.id.desc())
+    if not position and offset > 0:
+        if newest_archived is not None or len(sources) > 1:
+            return _get_log_block_by_offset(db, project_id, query_params, query, sources, offset, limit, user_timezone)
+        query = query.offset(offset)
+
+    # Sources hold consecutive log_time ranges, newest first
+    items = []
+    for source in sources:
+        items.extend(_on_source(db, query, source).limit(limit - len(items)).all())
+        if len(items) >= limit:
+            break
+
+    # Archived rows are all older than newest_archived, they only matter
+    # once the block is short or reaches back to that time
+    if newest_archived is not None and not (position and position[0] is None) and (
+        len(items) < limit or items[-1].log_time is None or items[-1].log_time <= newest_archived
+    ):
+        archived = islice(log_archive.iter_rows(project_id, ArchiveFilter(query_params), before=position), limit)
+        items = heapq.nlargest(
+            limit, [*items, *archived],
+            key=lambda item: (_log_value(item, "log_time") or datetime.min, _log_value(item, "id")),
+        )
+
+    return _log_block_response(items, limit, user_timezone)
+
+def iter_log_project_export(
+    db: Session, project_id: int, query_params: Optional[Dict[str, str]] = None, batch_size: int = 1000
+) -> Iterator[dict]:
+    """
+    Every log of a project matching the filters, newest first and archived
+    ones included, for streaming exports. Rows are read in keyset blocks
+    and the read transaction ends after each block, so a slow download
+    never keeps SQLite locked for writers; times stay in UTC.
+    """
+    cursor = None
+    while True:
+        block = get_log_project_block(
+            db, project_id, query_params, cursor=cursor, limit=batch_size, user_timezone=None
+        )
+        db.rollback()
+        for log in block.data:
+            yield log.model_dump()
+        cursor = block.next_cursor
+        if not cursor:
+            return
+
+def _log_value(item, field: str):
+    """Field of a project_logs row or of an archived record"""
+    return item[field] if isinstance(item, dict) else getattr(item, field)
+
+def _log_block_response(items: list, limit: int, user_timezone: Optional[str]) -> LogBlockResponse:
+    data = [LogResponse.model_validate(item) for item in items]
+    if user_timezone:
+        convert_fields_to_user_timezone(data, ("log_time",), user_timezone)
+
+    next_cursor = None
+    if len(items) == limit:
+        next_cursor = encode_log_cursor(_log_value(items[-1], "log_time"), _log_value(items[-1], "id"))
+
+    return LogBlockResponse(data=data, next_cursor=next_cursor)
+
+def _get_log_block_by_offset(db: Session, project_id: int, query_params: Optional[Dict[str, str]], query,
+                             sources: list, offset: int, limit: int, user_timezone: Optional[str]) -> LogBlockResponse:
+    """
+    Offset block across database and archive rows; archived rows are taken
+    to follow the database ones, which holds after every archive run.
+    """
+    items, skip = _log_rows_at_offset(db, query, sources, offset, limit)
+    if len(items) < limit and log_archive.newest_time(project_id) is not None:
+        archived = log_archive.iter_rows(project_id, ArchiveFilter(query_params))
+        items.extend(islice(archived, skip, skip + limit - len(items)))
+    return _log_block_response(items, limit, user_timezone)
+
 def get_project_log_by_id(db: Session, log_id: int, user_id: Optional[int] = None) -> Optional[LogResponse]:
     """Get single project log by ID with timezone conversion"""
-    log_item = db.query(ProjectLogModel).filter(ProjectLogModel.id == log_id).first()
+    query = db.query(ProjectLogModel).filter(ProjectLogModel.id == log_id)
+    log_item = query.first()
+    if not log_item and log_partitions.enabled:
+        for partition in log_partitions.partitions_with_id(log_id):
+            log_item = _on_source(db, query, partition).first()
+            if log_item:
+                break
     if not log_item:
         return None
     
@@ -77,6 +323,10 @@ def get_project_log_by_id(db: Session, log_id: int, user_id: Optional[int] = Non
     return log_response
     
 def create_project_log(db: Session, payload: ProjectLogCreate) -> LogResponse:
+    if log_partitions.enabled:
+        log = create_project_logs_batch(db, [payload])[0]
+        db.commit()
+        return log
     project = ProjectLogModel(
         log_level=payload.log_level,
         message=payload.message,
@@ -100,6 +350,22 @@ def create_project_logs_batch(db: Session, payloads: List[ProjectLogCreate]) ->
         return []
     
     try:
+        if log_partitions.enabled:
+            rows = log_partitions.insert(db, [
+                {
+                    "log_level": payload.log_level,
+                    "message": payload.message,
+                    "project_id": payload.project_id,
+                    "log_time": payload.log_time,
+                    "context": payload.context,
+                    "controller": payload.controller,
+                    "line_number": payload.line_number,
+                    "file_path": payload.file_path,
+                }
+                for payload in payloads
+            ])
+            return [LogResponse.model_validate(row) for row in rows]
+
         # Create all instances first
         log_instances = []
         for payload in payloads:
@@ -107,7 +373,11 @@ def create_project_logs_batch(db: Session, payloads: List[ProjectLogCreate]) ->
                 log_level=payload.log_level,
                 message=payload.message,
                 project_id=payload.project_id,
-                log_time=payload.log_time
+                log_time=payload.log_time,
+                context=payload.context,
+                controller=payload.controller,
+                line_number=payload.line_number,
+                file_path=payload.file_path,
             )
             log_instances.append(log_instance)
         
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from ..models.project_log_stat import ProjectLogStat
+from ..schemas.project_log_schema import LogLevelEnum, ProjectLogCreate
+
+ERROR_LEVELS = (LogLevelEnum.ERROR.value, LogLevelEnum.CRITICAL.value)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def floor_to_hour(value: datetime) -> datetime:
+    """Start of the (naive UTC) hour a log time falls in"""
+    return _naive_utc(value).replace(minute=0, second=0, microsecond=0)
+
+
+def _hours_since(hours: int) -> datetime:
+    return floor_to_hour(datetime.now(timezone.utc)) - timedelta(hours=hours - 1)
+
+
+def record_log_stats(db: Session, entries: Iterable[ProjectLogCreate]):
+    """
+    Add log rows to the per-hour level counters.
+
+    Called with the rows of an ingest batch before they are stored, in the
+    same transaction, so counters and logs commit together; the caller
+    commits. Rows without a log time count in the current hour.
+    """
+    now = _naive_utc(datetime.now(timezone.utc))
+    buckets: Dict[Tuple[int, datetime, str], list] = {}
+    for entry in entries:
+        log_time = _naive_utc(entry.log_time) if entry.log_time else now
+        key = (entry.project_id, log_time.replace(minute=0, second=0, microsecond=0), entry.log_level)
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [1, log_time]
+        else:
+            bucket[0] += 1
+            if log_time > bucket[1]:
+                bucket[1] = log_time
+
+    rows = [
+        {"project_id": project_id, "hour": hour, "level": level, "count": count, "last_log_time": last_log_time}
+        for (project_id, hour, level), (count, last_log_time) in buckets.items()
+    ]
+    # Keep each statement well below SQLite's bound parameter limit
+    for start in range(0, len(rows), 150):
+        stmt = insert(ProjectLogStat).values(rows[start:start + 150])
+        last_log_time = (ProjectLogStat.last_log_time, stmt.excluded.last_log_time)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["project_id", "hour", "level"],
+            set_={
+                "count": ProjectLogStat.count + stmt.excluded.count,
+                "last_log_time": func.max(func.coalesce(*last_log_time), func.coalesce(*reversed(last_log_time))),
+            },
+        )
+        db.execute(stmt)
+
+
+def get_hourly_log_counts(db: Session, project_id: int, hours: int = 168) -> Tuple[List[datetime], Dict[str, List[int]]]:
+    """
+    Log counts of a project per level for each of the last ``hours`` hours.
+
+    Returns the hour starts and, per level, one count per hour (zeros
+    included) ready to plot.
+    """
+    since = _hours_since(hours)
+    slots = [since + timedelta(hours=i) for i in range(hours)]
+    series = {level.value: [0] * hours for level in LogLevelEnum}
+    rows = db.query(ProjectLogStat.hour, ProjectLogStat.level, ProjectLogStat.count).filter(
+        ProjectLogStat.project_id == project_id,
+        ProjectLogStat.hour >= since,
+    ).all()
+    for hour, level, count in rows:
+        index = int((hour - since).total_seconds() // 3600)
+        if 0 <= index < hours:
+            series.setdefault(level, [0] * hours)[index] += count
+    return slots, series
+
+
+def get_error_sparklines(db: Session, hours: int = 24, levels: Sequence[str] = ERROR_LEVELS) -> Dict[int, List[int]]:
+    """Hourly error counts over the last ``hours`` hours for every project with errors"""
+    since = _hours_since(hours)
+    sparklines: Dict[int, List[int]] = {}
+    rows = db.query(
+        ProjectLogStat.project_id, ProjectLogStat.hour, func.sum(ProjectLogStat.count)
+    ).filter(
+        ProjectLogStat.level.in_(levels),
+        ProjectLogStat.hour >= since,
+    ).group_by(ProjectLogStat.project_id, ProjectLogStat.hour).all()
+    for project_id, hour, count in rows:
+        index = int((hour - since).total_seconds() // 3600)
+        if 0 <= index < hours:
+            sparklines.setdefault(project_id, [0] * hours)[index] = count
+    return sparklines
+
+
+def get_last_error_times(db: Session, project_id: Optional[int] = None,
+                         levels: Sequence[str] = ERROR_LEVELS) -> Dict[int, datetime]:
+    """Time of the latest error log per project (one project when ``project_id`` is given)"""
+    query = db.query(ProjectLogStat.project_id, func.max(ProjectLogStat.last_log_time)).filter(
+        ProjectLogStat.level.in_(levels)
+    )
+    if project_id is not None:
+        query = query.filter(ProjectLogStat.project_id == project_id)
+    return {row_project_id: last for row_project_id, last in query.group_by(ProjectLogStat.project_id) if last is not None}
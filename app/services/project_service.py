@@ -4,8 +4,9 @@ from ..schemas import AdapterListResponse
 from ..schemas.project_schema import ProjectCreate, ProjectResponse
 from ..models.project import Project as ProjectModel
 from ..utils.query_adapter import QueryAdapter
+from ..utils.entity_cache import entity_cache, PROJECTS
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, Optional
 from fastapi import Request
 
 
@@ -42,6 +43,7 @@ def create_project(db: Session, payload: ProjectCreate) -> ProjectResponse:
     try:
         db.commit()
         db.refresh(project)
+        entity_cache.bump(PROJECTS, changed=[project.id])
         return project
     except IntegrityError:
         db.rollback()
@@ -86,6 +88,7 @@ def update_project(
         )
 
         db.commit()
+        entity_cache.bump(PROJECTS, changed=[project_id])
 
         # Refresh and return the updated project
         db.refresh(project)
@@ -104,8 +107,20 @@ def get_project_by_id(db: Session, id: int) -> ProjectResponse | None:
 
 
 def get_all_projects(db: Session) -> list[ProjectResponse]:
-    projects = db.query(ProjectModel).all()
-    return [ProjectResponse.model_validate(project) for project in projects]
+    def load():
+        projects = db.query(ProjectModel).all()
+        return [ProjectResponse.model_validate(project) for project in projects]
+
+    return list(entity_cache.get_or_load(PROJECTS, "all", load))
+
+
+def get_project_frameworks(db: Session) -> Dict[int, str]:
+    """Framework type of every project, keyed by project id"""
+    def load():
+        rows = db.query(ProjectModel.id, ProjectModel.framework_type).all()
+        return {project_id: (framework or "").lower() for project_id, framework in rows}
+
+    return entity_cache.get_or_load(PROJECTS, "frameworks", load)
 
 
 def delete_project(db: Session, id: int) -> bool:
@@ -130,6 +145,7 @@ def delete_project(db: Session, id: int) -> bool:
     try:
         db.delete(project)
         db.commit()
+        entity_cache.bump(PROJECTS, deleted=[id])
         return True
     except IntegrityError as e:
         db.rollback()
@@ -4,6 +4,7 @@ from ..schemas import AdapterListResponse
 from ..schemas.service_worker_schema import ServiceWorkerCreate,ServiceWorkerResponse,ServiceWorkerUpdateAgent
 from ..models.service_worker import ServiceWorker as ServiceWorkerModel
 from ..utils.query_adapter import QueryAdapter
+from ..utils.entity_cache import entity_cache, WORKERS
 from datetime import datetime, timezone
 from typing import Optional,Dict
 from fastapi import Request
@@ -41,6 +42,7 @@ def create_worker(db: Session, payload: ServiceWorkerCreate) -> ServiceWorkerRes
     try:
         db.commit()
         db.refresh(project)
+        entity_cache.bump(WORKERS, changed=[project.id])
         return project
     except IntegrityError:
         db.rollback()
@@ -85,6 +87,7 @@ def update_worker(
         )
 
         db.commit()
+        entity_cache.bump(WORKERS, changed=[worker_id])
 
         # Refresh and return the updated project
         db.refresh(project)
@@ -124,6 +127,9 @@ def update_worker_from_agent(
         if hasattr(ServiceWorkerModel, key)
     }
 
+    # Agents report every cycle; only a real change invalidates cached lists
+    changed = any(getattr(project, column.key) != value for column, value in update_data.items())
+
     # Add updated_at with proper column reference
     update_data[ServiceWorkerModel.updated_at] = datetime.now(tz=timezone.utc)
     try:
@@ -133,6 +139,8 @@ def update_worker_from_agent(
         )
 
         db.commit()
+        if changed:
+            entity_cache.bump(WORKERS, changed=[project.id])
 
         # Refresh and return the updated project
         db.refresh(project)
@@ -150,8 +158,11 @@ def get_worker_by_id(db: Session, id: int) -> ServiceWorkerResponse | None:
 
 
 def get_all_workers(db: Session) -> list[ServiceWorkerResponse]:
-    workers = db.query(ServiceWorkerModel).all()
-    return [ServiceWorkerResponse.model_validate(project) for project in workers]
+    def load():
+        workers = db.query(ServiceWorkerModel).all()
+        return [ServiceWorkerResponse.model_validate(project) for project in workers]
+
+    return list(entity_cache.get_or_load(WORKERS, "all", load))
 
 
 def delete_worker(db: Session, id: int) -> bool:
@@ -176,6 +187,7 @@ def delete_worker(db: Session, id: int) -> bool:
     try:
         db.delete(project)
         db.commit()
+        entity_cache.bump(WORKERS, deleted=[id])
         return True
     except IntegrityError as e:
         db.rollback()
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import Optional
+from typing import Iterator, Optional
 from fastapi import Request
 from sqlalchemy import extract
 from ..models.system_metric import SystemMetric as SystemMetricModel
@@ -28,6 +28,38 @@ def get_pagination_system_metrics(
     )
 
 
+# Exported metric fields and their types (see encode_export)
+METRIC_EXPORT_COLUMNS = {
+    "id": int, "cpu_percent": float, "memory_percent": float, "memory_available": int,
+    "disk_usage": str, "timestamp_log": datetime, "created_at": datetime,
+}
+
+def iter_system_metric_export(
+    db: Session, query_params: Optional[dict] = None, batch_size: int = 1000
+) -> Iterator[dict]:
+    """
+    System metrics matching QueryAdapter filters, newest first, for
+    streaming exports; read in id keyset batches with the read
+    transaction ended after each batch.
+    """
+    adapter = QueryAdapter(
+        model=SystemMetricModel,
+        allowed_search_fields=["timestamp", "cpu_percent", "memory_percent"],
+        query_params={key: value for key, value in (query_params or {}).items() if key not in ("page", "limit")},
+    )
+    query = adapter.simple_adapt(db.query(SystemMetricModel)).with_entities(
+        *(getattr(SystemMetricModel, column) for column in METRIC_EXPORT_COLUMNS)
+    ).order_by(SystemMetricModel.id.desc())
+    last_id = None
+    while True:
+        batch = query if last_id is None else query.filter(SystemMetricModel.id < last_id)
+        rows = [row._asdict() for row in batch.limit(batch_size).all()]
+        db.rollback()
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1]["id"]
+
 def create_system_metric(db: Session, payload: SystemMetricCreate) -> SystemMetricResponse:
     try:
         metric = SystemMetricModel(
@@ -5,8 +5,10 @@ from ..models.threshold import Threshold as ThresholdModel, ThresholdType, Thres
 from ..models.system_metric import SystemMetric as SystemMetricModel
 from ..models.alarm import Alarm as AlarmModel
 from ..models.service_worker import ServiceWorker as ServiceWorkerModel
+from ..models.project import Project as ProjectModel
 from ..services.threshold_service import get_enabled_thresholds
 from ..services.alarm_service import create_alarm
+from ..services.log_error_rate import log_error_rates
 from ..schemas.alarm_schema import AlarmCreate
 from ..utils.db_context import db_context
 import json
@@ -62,6 +64,10 @@ class ThresholdMonitor:
         if threshold.metric_type.value.lower() == ThresholdType.SERVICE_WORKER_INACTIVE.value:
             return self._check_service_worker_threshold(db, threshold)
         
+        # Handle log error rate threshold (in-memory counters, no log queries)
+        if threshold.metric_type.value.lower() == ThresholdType.LOG_ERROR_RATE.value:
+            return self._check_log_error_rate_threshold(db, threshold)
+        
         # Handle system metrics thresholds (CPU, memory, disk)
         return self._check_system_metric_threshold(db, threshold)
     
@@ -138,6 +144,32 @@ class ThresholdMonitor:
         
         return alarm
     
+    def _check_log_error_rate_threshold(self, db: Session, threshold) -> Optional[AlarmModel]:
+        """Check errors per minute of one project (source_filter) or of every project"""
+        
+        if threshold.source_filter:
+            project_ids = [int(threshold.source_filter)]
+        else:
+            project_ids = log_error_rates.projects()
+        
+        for project_id in project_ids:
+            # One count per complete minute of the duration window
+            rates = log_error_rates.per_minute(project_id, threshold.duration_minutes)
+            if not rates:
+                logger.info(f"Not enough error rate history of project {project_id} for threshold {threshold.name}")
+                continue
+            
+            # Same rule as system metrics: at least 80% of the minutes must violate
+            violations = sum(1 for rate in rates if self._value_violates_threshold(threshold, rate))
+            if violations / len(rates) >= 0.8:
+                alarm = self._create_log_error_rate_alarm(db, threshold, project_id, rates)
+                if alarm:
+                    # Update last alarm time
+                    self.last_alarm_times[threshold.id] = datetime.now(timezone.utc)
+                    return alarm
+        
+        return None
+    
     def _is_cooldown_expired(self, threshold) -> bool:
         """Check if cooldown period has expired for this threshold"""
         if threshold.id not in self.last_alarm_times:
@@ -206,7 +238,10 @@ class ThresholdMonitor:
         else:
             return False
         
-        # Evaluate condition
+        return self._value_violates_threshold(threshold, metric_value)
+    
+    def _value_violates_threshold(self, threshold, metric_value: float) -> bool:
+        """Evaluate the threshold condition for a single value"""
         threshold_value = threshold.threshold_value
         
         if threshold.condition.value.lower() == ThresholdCondition.GREATER_THAN.value:
@@ -342,6 +377,48 @@ class ThresholdMonitor:
             logger.error(f"Error creating service worker alarm for worker {worker.name}: {str(e)}")
             return None
 
+    def _create_log_error_rate_alarm(self, db: Session, threshold, project_id: int, rates: List[int]) -> Optional[AlarmModel]:
+        """Create an alarm for a project error rate violation"""
+        
+        try:
+            project = db.query(ProjectModel).filter(ProjectModel.id == project_id).first()
+            project_name = project.name if project else f"#{project_id}"
+            
+            condition_text = {
+                'greater_than': 'exceeded',
+                'less_than': 'below',
+                'equals': 'equals'
+            }.get(threshold.condition.value.lower(), 'violated')
+            
+            description = (
+                f"Project '{project_name}' error rate {condition_text} threshold of {threshold.threshold_value:g} errors/min "
+                f"for {threshold.duration_minutes} minutes. "
+                f"Last minute: {rates[-1]} errors, average: {sum(rates) / len(rates):.1f} errors/min"
+            )
+            
+            from ..schemas.alarm_schema import AlarmSeverityEnum
+            alarm_payload = AlarmCreate(
+                title=f"Error Rate Alert: {threshold.name}",
+                description=description,
+                severity=AlarmSeverityEnum(threshold.severity.value.lower()),
+                source="threshold_monitor",
+                source_id=str(threshold.id),
+                triggered_at=datetime.now(timezone.utc)
+            )
+            
+            # Create the alarm using the alarm service
+            alarm_response = create_alarm(db, alarm_payload)
+            
+            # Return the created alarm model (we need to fetch it again)
+            if alarm_response:
+                return db.query(AlarmModel).filter(AlarmModel.id == alarm_response.id).first()
+            
+            return None
+            
+        except Exception as e:
+            logger.error(f"Error creating error rate alarm for project {project_id}: {str(e)}")
+            return None
+
 # Global monitor instance
 threshold_monitor = ThresholdMonitor()
 
@@ -1,3 +1,5 @@
+import os
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from typing import Optional, List
@@ -6,6 +8,16 @@ from ..models.threshold import Threshold as ThresholdModel, ThresholdType, Thres
 from ..schemas.threshold_schema import ThresholdResponse, ThresholdCreate, ThresholdUpdate, ThresholdToggle
 from ..schemas import AdapterListResponse
 from ..utils.query_adapter import QueryAdapter
+from ..utils.ttl_cache import TTLCache
+from ..utils.entity_cache import entity_cache, THRESHOLDS
+
+# Shared by every viewer of the threshold page, dropped on threshold writes
+threshold_summary_cache = TTLCache(ttl=float(os.getenv('SUMMARY_CACHE_TTL', '5')))
+
+def _thresholds_changed():
+    """Drop cached threshold data after a committed write"""
+    entity_cache.bump(THRESHOLDS)
+    threshold_summary_cache.invalidate()
 
 def get_pagination_thresholds(
     request: Optional[Request], db: Session
@@ -32,10 +44,13 @@ def get_all_thresholds(db: Session) -> List[ThresholdResponse]:
 
 def get_enabled_thresholds(db: Session) -> List[ThresholdResponse]:
     """Get only enabled thresholds for monitoring"""
-    thresholds = db.query(ThresholdModel).filter(
-        ThresholdModel.is_enabled
-    ).order_by(ThresholdModel.severity.desc()).all()
-    return [ThresholdResponse.model_validate(threshold) for threshold in thresholds]
+    def load():
+        thresholds = db.query(ThresholdModel).filter(
+            ThresholdModel.is_enabled
+        ).order_by(ThresholdModel.severity.desc()).all()
+        return [ThresholdResponse.model_validate(threshold) for threshold in thresholds]
+
+    return list(entity_cache.get_or_load(THRESHOLDS, "enabled", load))
 
 def create_threshold(db: Session, payload: ThresholdCreate) -> ThresholdResponse:
     """Create a new threshold"""
@@ -54,6 +69,7 @@ def create_threshold(db: Session, payload: ThresholdCreate) -> ThresholdResponse
         )
         db.add(threshold)
         db.commit()
+        _thresholds_changed()
         db.refresh(threshold)
         return ThresholdResponse.model_validate(threshold)
     except IntegrityError as e:
@@ -79,6 +95,7 @@ def update_threshold(db: Session, id: int, payload: ThresholdUpdate) -> Optional
             setattr(threshold, field, value.upper() if field in ['metric_type','condition','severity'] else value)
         
         db.commit()
+        _thresholds_changed()
         db.refresh(threshold)
         return ThresholdResponse.model_validate(threshold)
     except IntegrityError as e:
@@ -94,6 +111,7 @@ def toggle_threshold(db: Session, id: int, payload: ThresholdToggle) -> Optional
     try:
         setattr(threshold, 'is_enabled', payload.is_enabled)
         db.commit()
+        _thresholds_changed()
         db.refresh(threshold)
         return ThresholdResponse.model_validate(threshold)
     except IntegrityError as e:
@@ -108,6 +126,7 @@ def delete_threshold(db: Session, id: int) -> bool:
     try:
         db.delete(threshold)
         db.commit()
+        _thresholds_changed()
         return True
     except IntegrityError as e:
         db.rollback()
@@ -131,40 +150,29 @@ def get_thresholds_by_severity(db: Session, severity: ThresholdSeverity) -> List
 
 def get_threshold_summary(db: Session) -> dict:
     """Get threshold summary statistics"""
-    total_thresholds = db.query(ThresholdModel).count()
-    enabled_thresholds = db.query(ThresholdModel).filter(
-        ThresholdModel.is_enabled
-    ).count()
-    
-    cpu_thresholds = db.query(ThresholdModel).filter(
-        ThresholdModel.metric_type == ThresholdType.CPU,
-        ThresholdModel.is_enabled
-    ).count()
-    
-    memory_thresholds = db.query(ThresholdModel).filter(
-        ThresholdModel.metric_type == ThresholdType.MEMORY,
-        ThresholdModel.is_enabled
-    ).count()
-    
-    disk_thresholds = db.query(ThresholdModel).filter(
-        ThresholdModel.metric_type == ThresholdType.DISK,
-        ThresholdModel.is_enabled
-    ).count()
-    
-    critical_thresholds = db.query(ThresholdModel).filter(
-        ThresholdModel.severity == ThresholdSeverity.CRITICAL,
-        ThresholdModel.is_enabled
-    ).count()
+    return threshold_summary_cache.get_or_compute("summary", lambda: _compute_threshold_summary(db))
+
+def _compute_threshold_summary(db: Session) -> dict:
+    rows = db.query(
+        ThresholdModel.metric_type,
+        ThresholdModel.severity,
+        ThresholdModel.is_enabled,
+        func.count(ThresholdModel.id)
+    ).group_by(ThresholdModel.metric_type, ThresholdModel.severity, ThresholdModel.is_enabled).all()
     
-    return {
-        "total": total_thresholds,
-        "enabled": enabled_thresholds,
-        "disabled": total_thresholds - enabled_thresholds,
-        "cpu": cpu_thresholds,
-        "memory": memory_thresholds,
-        "disk": disk_thresholds,
-        "critical": critical_thresholds
-    }
+    summary = {"total": 0, "enabled": 0, "disabled": 0, "cpu": 0, "memory": 0, "disk": 0, "critical": 0}
+    type_keys = {ThresholdType.CPU: "cpu", ThresholdType.MEMORY: "memory", ThresholdType.DISK: "disk"}
+    for metric_type, severity, is_enabled, count in rows:
+        summary["total"] += count
+        if not is_enabled:
+            summary["disabled"] += count
+            continue
+        summary["enabled"] += count
+        if metric_type in type_keys:
+            summary[type_keys[metric_type]] += count
+        if severity == ThresholdSeverity.CRITICAL:
+            summary["critical"] += count
+    return summary
 
 def duplicate_threshold(db: Session, id: int, new_name: str) -> Optional[ThresholdResponse]:
     """Duplicate an existing threshold with a new name"""
@@ -187,6 +195,7 @@ def duplicate_threshold(db: Session, id: int, new_name: str) -> Optional[Thresho
         )
         db.add(duplicate)
         db.commit()
+        _thresholds_changed()
         db.refresh(duplicate)
         return ThresholdResponse.model_validate(duplicate)
     except IntegrityError as e:
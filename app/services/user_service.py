@@ -3,8 +3,34 @@ from sqlalchemy.exc import IntegrityError
 from ..schemas.user_schema import UserCreate, UserResponse, UserUpdate, UserPasswordUpdate
 from ..models.user import User as UserModel
 from datetime import datetime, timezone
+from typing import Dict, Optional
 from ..utils import hash_password, verify_password
 
+# user id -> timezone name, dropped whenever the user is updated
+_user_timezones: Dict[int, str] = {}
+
+
+def resolve_user_timezone(db: Session, user_id: Optional[int]) -> str:
+    """Get user timezone, cached per user, fallback to UTC"""
+    if not user_id:
+        return 'UTC'
+    
+    cached = _user_timezones.get(user_id)
+    if cached is not None:
+        return cached
+    
+    user_timezone = db.query(UserModel.user_timezone).filter(UserModel.id == user_id).scalar()
+    if user_timezone is None:
+        # Unknown user or unset timezone, don't cache
+        return 'UTC'
+    _user_timezones[user_id] = str(user_timezone)
+    return _user_timezones[user_id]
+
+
+def invalidate_user_timezone(user_id: int):
+    """Forget the cached timezone of a user"""
+    _user_timezones.pop(user_id, None)
+
 
 def create_user(db: Session, user_data: UserCreate) -> UserResponse:
     hashed = hash_password(user_data.password)
@@ -62,6 +88,7 @@ def update_user(db: Session, user_id: int, user_data: UserUpdate) -> UserRespons
     try:
         db.commit()
         db.refresh(user)
+        invalidate_user_timezone(user_id)
         return user
     except IntegrityError:
         db.rollback()
@@ -98,5 +125,6 @@ def delete_user(db: Session, user_id: int) -> bool:
     if user:
         db.delete(user)
         db.commit()
+        invalidate_user_timezone(user_id)
         return True
     return False
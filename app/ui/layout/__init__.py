@@ -1,38 +1,43 @@
 from nicegui import ui, app
 from .sidebar_menu import sidebar_menu
-from ...utils.agent_controller import AgentController
-from ...services.alarm_service import get_active_alarms
+from ...utils.agent_health import agent_health
+from ...services.alarm_counter import active_alarm_counter
 from ...utils.db_context import db_context
-from ...models.user import User
+from ...services.user_service import resolve_user_timezone
 from fastapi.concurrency import run_in_threadpool
 
 def check_agent_status():
-    """Check agent status using AgentController - simple version"""
-    # Try to communicate with agent
-    result = AgentController.test_connection()
-    
-    if result.get("success"):
-        return True, "Online"
-    else:
-        return False, "Offline"
+    """Get cached agent status from the background health probe"""
+    health = agent_health.snapshot()
+    return health.online, health.status
 
-async def get_alarm_count():
-    """Get active alarm count"""
-    try:
-        return await run_in_threadpool(_get_alarm_count_sync)
-    except Exception:
-        return 0
+def get_agent_status_tooltip(health) -> str:
+    """Build tooltip text for the agent status badge"""
+    if health.online and health.latency_ms is not None:
+        return f"Agent latency: {health.latency_ms:.0f} ms"
+    return health.message or health.status
 
-def _get_alarm_count_sync():
-    """Synchronous function to get alarm count"""
-    # Get user session for timezone (though count doesn't need timezone, 
-    # keeping consistent with other functions)
-    user_session = app.storage.user.get("session")
-    user_id = user_session.get('id') if user_session else None
-    
-    with db_context() as db:
-        active_alarms = get_active_alarms(db, user_id)
-        return len(active_alarms)
+def get_alarm_counter_tooltip(counts: dict) -> str:
+    """Build tooltip text with active alarms per severity"""
+    parts = [f"{counts[severity]} {severity}" for severity in ('critical', 'high', 'medium', 'low') if counts.get(severity)]
+    return f"Active alarms: {', '.join(parts)}" if parts else "View Alarms"
+
+class _OnDelete(ui.element):
+    """Hidden element calling ``callbacks`` when it is deleted with its client.
+
+    Unlike disconnect handlers, this keeps subscriptions alive across
+    websocket reconnects of the same page.
+    """
+
+    def __init__(self, *callbacks):
+        super().__init__()
+        self.set_visibility(False)
+        self.callbacks = callbacks
+
+    def _handle_delete(self) -> None:
+        for callback in self.callbacks:
+            callback()
+        super()._handle_delete()
 
 def get_user_timezone_sync():
     """Synchronous function to get user timezone"""
@@ -46,10 +51,7 @@ def get_user_timezone_sync():
     
     try:
         with db_context() as db:
-            user = db.query(User).filter(User.id == user_id).first()
-            if user and hasattr(user, 'user_timezone'):
-                return str(user.user_timezone)
-            return 'UTC'
+            return resolve_user_timezone(db, user_id)
     except Exception:
         return 'UTC'
 
@@ -101,12 +103,13 @@ def layout():
             
             # Alarm Bell Icon with counter
             with ui.element('div').classes('relative'):
-                alarm_button = ui.button(
+                with ui.button(
                     icon="notifications",
                     on_click=lambda: ui.navigate.to("/alarm")
                 ).classes(
                     "text-white hover:bg-white/20 transition-all duration-200 rounded-lg p-2"
-                ).tooltip("View Alarms")
+                ) as alarm_button:
+                    alarm_tooltip = ui.tooltip("View Alarms")
                 
                 # Alarm counter badge
                 alarm_badge = ui.element('div').classes(
@@ -155,14 +158,15 @@ def layout():
                 # Status indicator
                 with ui.row().classes("items-center gap-2"):
                     status_class = "emerald" if agent_running else "red"
-                    ui.html(f'<div class="w-2 h-2 rounded-full bg-{status_class}-400 animate-pulse"></div>')
+                    agent_dot = ui.element('div').classes(f"w-2 h-2 rounded-full bg-{status_class}-400 animate-pulse")
                     ui.label("Devopin Agent:").classes("text-sm font-medium text-slate-200")
-                    with ui.element('div').classes(f"px-2 py-1 rounded-full text-xs font-medium {'bg-emerald-500 text-white' if agent_running else 'bg-red-500 text-white'}"):
-                        ui.label(agent_status)
+                    with ui.element('div').classes(f"px-2 py-1 rounded-full text-xs font-medium {'bg-emerald-500 text-white' if agent_running else 'bg-red-500 text-white'}") as agent_badge:
+                        agent_status_label = ui.label(agent_status)
+                        agent_badge_tooltip = ui.tooltip(get_agent_status_tooltip(agent_health.snapshot()))
                 # Quick refresh button
                 ui.button(
                     icon="refresh", 
-                    on_click=lambda: ui.navigate.reload()
+                    on_click=agent_health.refresh
                 ).classes("text-slate-300 hover:text-slate-100 p-1").props("flat dense size=sm").tooltip("Refresh Agent Status")
                     
         
@@ -186,21 +190,17 @@ def layout():
                         f"{'text-white' if is_active else 'text-slate-300 hover:text-slate-100'}"
                     )
     
-    # Update alarm counter periodically
-    async def update_alarm_counter():
-        try:
-            count = await get_alarm_count()
-            alarm_count_label.text = str(count)
-            if count > 0:
-                alarm_badge.style('display: flex;')
-                # Add animation for new alarms
-                alarm_button.classes(remove='animate-pulse')
-                alarm_button.classes('animate-pulse')
-            else:
-                alarm_badge.style('display: none;')
-                alarm_button.classes(remove='animate-pulse')
-        except Exception as e:
-            print(f"Error updating alarm counter: {e}")
+    # Alarm counter is pushed whenever alarms are created or change state
+    def update_alarm_counter(counts: dict):
+        count = sum(counts.values())
+        alarm_count_label.text = str(count)
+        alarm_tooltip.text = get_alarm_counter_tooltip(counts)
+        if count > 0:
+            alarm_badge.style('display: flex;')
+            alarm_button.classes('animate-pulse')
+        else:
+            alarm_badge.style('display: none;')
+            alarm_button.classes(remove='animate-pulse')
     
     # Update timezone indicator
     async def update_timezone_indicator():
@@ -211,10 +211,24 @@ def layout():
             print(f"Error updating timezone indicator: {e}")
             timezone_label.text = 'UTC'
     
-    # Initial update and periodic updates
-    ui.timer(10.0, update_alarm_counter)  # Update every 10 seconds
-    ui.timer(30.0, update_timezone_indicator)  # Update timezone every 30 seconds
+    # Agent status is pushed by the background health probe
+    def update_agent_status(health):
+        online_class = "emerald" if health.online else "red"
+        agent_dot.classes(remove="bg-emerald-400 bg-red-400", add=f"bg-{online_class}-400")
+        agent_badge.classes(
+            remove="bg-emerald-500 bg-red-500",
+            add="bg-emerald-500" if health.online else "bg-red-500",
+        )
+        agent_status_label.text = health.status
+        agent_badge_tooltip.text = get_agent_status_tooltip(health)
+    
+    unsubscribe_agent_status = agent_health.changes.subscribe(update_agent_status)
+    
+    update_alarm_counter(active_alarm_counter.snapshot())
+    unsubscribe_alarm_counter = active_alarm_counter.changes.subscribe(update_alarm_counter)
+    
+    # Pushes stop only when the page's client is deleted, not on reconnects
+    _OnDelete(unsubscribe_agent_status, unsubscribe_alarm_counter)
     
-    # Run initial updates
-    ui.context.client.on_connect(update_alarm_counter)
+    # Timezone only changes from the settings page, which reloads the page
     ui.context.client.on_connect(update_timezone_indicator)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from nicegui import ui
+from nicegui import ui, app
 from ..layout import layout
 from ...schemas.project_schema import ProjectCreate
 from ...utils.db_context import db_context
@@ -9,6 +9,9 @@ from ...services.project_service import (
     delete_project,
     get_project_by_id,
 )
+from ...services.project_log_service import get_user_timezone
+from ...services.project_log_stats_service import get_error_sparklines, get_last_error_times
+from ...utils.timezone_utils import format_datetime_for_user
 
 # Global variables for UI elements
 project_table = None
@@ -50,6 +53,25 @@ def get_log_format_info(framework: str) -> str:
     }
     return formats.get(framework.lower(), 'No specific format defined')
 
+def build_sparkline_svg(counts, width: int = 120, height: int = 28, color: str = '#ef4444') -> str:
+    """Inline SVG bar sparkline of hourly counts, cheap enough for every row"""
+    counts = counts or [0] * 24
+    peak = max(counts) or 1
+    bar_width = width / len(counts)
+    bars = []
+    for i, count in enumerate(counts):
+        if count:
+            bar_height = max(count / peak * height, 1)
+            bars.append(
+                f'<rect x="{i * bar_width:.1f}" y="{height - bar_height:.1f}" '
+                f'width="{max(bar_width - 1, 1):.1f}" height="{bar_height:.1f}" />'
+            )
+    bars = ''.join(bars)
+    return (
+        f'<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" fill="{color}">'
+        f'<line x1="0" y1="{height - 0.5}" x2="{width}" y2="{height - 0.5}" stroke="#e5e7eb" />{bars}</svg>'
+    )
+
 async def handle_create_project():
     """Show create project dialog"""
     frameworks = ["laravel", "python", "django", "flask", "express", "spring", "fastapi"]
@@ -205,8 +227,13 @@ async def handle_delete_project(project_id: int, project_name: str):
 
 def refresh_project_data():
     """Refresh project table"""
+    user_session = app.storage.user.get("session") or {}
     with db_context() as db:
         projects = get_all_projects(db)
+        # Both come from the hourly counters, not from project_logs
+        sparklines = get_error_sparklines(db)
+        last_errors = get_last_error_times(db)
+        user_timezone = get_user_timezone(db, user_session.get('id'))
         projects_data = [
             {
                 "id": p.id,
@@ -215,6 +242,8 @@ def refresh_project_data():
                 "log_path": p.log_path,
                 "framework_type": p.framework_type,
                 "is_alert": getattr(p, "is_alert", False),
+                "error_counts": sparklines.get(p.id, []),
+                "last_error_at": format_datetime_for_user(last_errors.get(p.id), user_timezone),
             }
             for p in projects
         ]
@@ -238,6 +267,7 @@ def update_project_table(projects):
                 ui.label("Project").classes("flex-1")
                 ui.label("Framework").classes("w-32 text-center")
                 ui.label("Log Path").classes("w-64")
+                ui.label("Errors (24h)").classes("w-40")
                 ui.label("Actions").classes("w-40 text-center")
             
             # Table rows
@@ -258,6 +288,13 @@ def update_project_table(projects):
                     with ui.element('div').classes("w-64"):
                         ui.label(project["log_path"]).classes("text-sm font-mono text-gray-600 break-words whitespace-normal")
                     
+                    # Errors per hour and last error
+                    with ui.column().classes("w-40 gap-1"):
+                        ui.html(build_sparkline_svg(project["error_counts"]))
+                        ui.label(
+                            f"Last error: {project['last_error_at']}" if project["last_error_at"] else "No errors"
+                        ).classes("text-xs text-gray-600")
+                    
                     # Actions
                     with ui.row().classes("w-40 justify-center gap-1"):
                         # View details button
@@ -1,27 +1,25 @@
+import json
 from nicegui import ui, app
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from ...services.project_service import get_project_by_id
 from ...utils.db_context import db_context
 from ..layout import layout
-from ...services.project_log_service import get_pagination_log_project
+from ...services.project_log_service import (
+    get_log_project_block,
+    count_log_project,
+    get_log_facets,
+    get_user_timezone,
+)
+from ...services.log_template_service import get_top_error_patterns
+from ...services.project_log_stats_service import get_hourly_log_counts, get_last_error_times
+from ...utils.timezone_utils import to_utc_epoch_ms, format_datetime_for_user
 from datetime import datetime
 
-# Global variables for UI elements
-log_table = None
-pagination_info = None
-page_label = None
-prev_btn = None
-next_btn = None
-current_page = 1
-current_limit = 10
-total_count = 0
-
-# Filter state
-filters = {
-    'search': '',
-    'log_level': '',
-    'date_from': '',
-    'date_to': ''
-}
+# Rows fetched per request while scrolling, and blocks kept in the browser
+LOG_BLOCK_SIZE = 100
+LOG_MAX_BLOCKS_IN_CACHE = 10
+LOG_FILTER_KEYS = ('search', 'log_level__eq', 'controller__eq', 'file_path__eq', 'log_time__gte', 'log_time__lte')
 
 def get_log_level_color(level: str) -> str:
     """Get color based on log level"""
@@ -45,164 +43,154 @@ def get_log_level_icon(level: str) -> str:
     }
     return icons.get(level.upper(), 'help')
 
-def refresh_log_data(project):
-    """Refresh log table data"""
-    global log_table, current_page, current_limit, total_count
+def build_log_query_params(filters: dict) -> dict:
+    """Convert the filter form values into QueryAdapter parameters"""
+    query_params = {}
     
-    with db_context() as db:
-        # Build query params with filters
-        query_params = {
-            'page': str(current_page),
-            'limit': str(current_limit),
-            'project_id__eq': str(project.id)
-        }
-        
-        # Add search filter
-        if filters['search']:
-            query_params['search'] = filters['search']
-        
-        # Add log level filter
-        if filters['log_level']:
-            query_params['log_level__eq'] = filters['log_level']
-        
-        # Add date range filters
-        if filters['date_from']:
-            query_params['log_time__gte'] = filters['date_from']
-        
-        if filters['date_to']:
-            # Add end of day to include the full day
-            end_date = datetime.strptime(filters['date_to'], '%Y-%m-%d')
-            end_date = end_date.replace(hour=23, minute=59, second=59)
-            query_params['log_time__lte'] = end_date.isoformat()
-        print(query_params)
-        # Get user session for timezone conversion
-        user_session = app.storage.user.get("session")
-        user_id = user_session.get('id') if user_session else None
-        
-        result = get_pagination_log_project(
-            db=db,
-            request=None,
-            user_id=user_id,
-            query_params=query_params
-        )
-        
-        total_count = result.total
-        update_log_table([log.model_dump() for log in result.data])
-        update_pagination_info()
-
-def update_log_table(logs):
-    """Update the log table with new data"""
-    global log_table
+    # Add search filter
+    if filters['search']:
+        query_params['search'] = filters['search']
     
-    if log_table:
-        log_table.clear()
-        
-        if not logs:
-            with log_table:
-                ui.label("No logs found").classes("text-center text-gray-500 p-4")
-            return
-        
-        with log_table:
-            # Table header
-            with ui.row().classes("w-full bg-gray-100 p-3 rounded-t-lg font-bold text-sm"):
-                ui.label("Level").classes("w-24 text-center")
-                ui.label("Message").classes("flex-1")
-                ui.label("Time").classes("w-48 text-center")
-            
-            # Table rows
-            for log in logs:
-                with ui.row().classes("w-full border-b border-gray-200 p-3 hover:bg-gray-50 items-center"):
-                    # Log Level
-                    with ui.element('div').classes("w-24 flex justify-center"):
-                        ui.icon(get_log_level_icon(log.get('log_level', ''))).classes(
-                            f"text-{get_log_level_color(log.get('log_level', ''))}-500 mr-1"
-                        )
-                        ui.chip(
-                            log.get('log_level', 'UNKNOWN'),
-                            color=get_log_level_color(log.get('log_level', ''))
-                        ).classes("text-xs")
-                    
-                    # Message
-                    with ui.column().classes("flex-1"):
-                        ui.label(log.get('message', '')).classes("text-sm break-all").style('word-break: break-all; white-space: normal')
-                    
-                    # Time
-                    with ui.element('div').classes("w-48 text-center"):
-                        log_time = log.get('log_time')
-                        if log_time:
-                            if isinstance(log_time, str):
-                                try:
-                                    log_time = datetime.fromisoformat(log_time.replace('Z', '+00:00'))
-                                except (ValueError, TypeError):
-                                    pass
-                            if isinstance(log_time, datetime):
-                                formatted_time = log_time.strftime('%d/%m/%Y %H:%M:%S')
-                            else:
-                                formatted_time = str(log_time)
-                            ui.label(formatted_time).classes("text-xs font-mono")
-
-def update_pagination_info():
-    """Update pagination information display"""
-    global pagination_info, page_label, prev_btn, next_btn, current_page, total_count, current_limit
+    # Add log level filter
+    if filters['log_level']:
+        query_params['log_level__eq'] = filters['log_level']
     
-    if pagination_info:
-        start_item = (current_page - 1) * current_limit + 1
-        end_item = min(current_page * current_limit, total_count)
-        pagination_info.text = f"Showing {start_item}-{end_item} of {total_count} logs"
+    # Add structured field filters (facets)
+    if filters['controller']:
+        query_params['controller__eq'] = filters['controller']
     
-    if page_label:
-        total_pages = max(1, (total_count + current_limit - 1) // current_limit)
-        page_label.text = f"Page {current_page} of {total_pages}"
+    if filters['file_path']:
+        query_params['file_path__eq'] = filters['file_path']
     
-    # Update button states
-    if prev_btn:
-        if current_page <= 1:
-            prev_btn.disable()
-        else:
-            prev_btn.enable()
+    # Add date range filters
+    if filters['date_from']:
+        query_params['log_time__gte'] = filters['date_from']
     
-    if next_btn:
-        if current_page * current_limit >= total_count:
-            next_btn.disable()
-        else:
-            next_btn.enable()
+    if filters['date_to']:
+        # Add end of day to include the full day
+        end_date = datetime.strptime(filters['date_to'], '%Y-%m-%d')
+        end_date = end_date.replace(hour=23, minute=59, second=59)
+        query_params['log_time__lte'] = end_date.isoformat()
+    return query_params
 
-def apply_filters(project):
-    """Apply filters and refresh data"""
-    global current_page
-    current_page = 1  # Reset to first page when applying filters
-    refresh_log_data(project)
+def build_log_datasource(project_id: int, query_params: dict) -> str:
+    """JavaScript datasource for the AG Grid infinite row model.
 
-def reset_filters(project, search_input, log_level_select, date_from_input, date_to_input):
-    """Reset all filters"""
-    global current_page
-    filters.update({
-        'search': '',
-        'log_level': '',
-        'date_from': '',
-        'date_to': ''
-    })
-    current_page = 1
+    Each block remembers the keyset cursor of the block after it, so scrolling
+    down never uses OFFSET; jumping straight to an unseen block falls back to
+    an offset request.
+    """
+    return f'''{{
+        params: {json.dumps(query_params)},
+        cursors: {{}},
+        getRows(request) {{
+            const query = new URLSearchParams(this.params);
+            query.set("limit", request.endRow - request.startRow);
+            const cursor = this.cursors[request.startRow];
+            if (cursor) query.set("cursor", cursor);
+            else query.set("offset", request.startRow);
+            fetch(`/project/{project_id}/logs/data?${{query}}`)
+                .then((response) => response.ok ? response.json() : Promise.reject(response.status))
+                .then((block) => {{
+                    if (block.next_cursor) this.cursors[request.endRow] = block.next_cursor;
+                    const lastRow = block.next_cursor ? -1 : request.startRow + block.data.length;
+                    request.successCallback(block.data, lastRow);
+                }})
+                .catch(() => request.failCallback());
+        }},
+    }}'''
+
+def build_log_time_formatter(user_timezone: str) -> str:
+    """JavaScript formatter rendering UTC epoch milliseconds in the user's timezone"""
+    return f'''(params) => {{
+        if (params.value == null) return "";
+        try {{
+            window.devopinLogTimeFormat ??= new Intl.DateTimeFormat("en-GB", {{
+                timeZone: {json.dumps(user_timezone)},
+                day: "2-digit", month: "2-digit", year: "numeric",
+                hour: "2-digit", minute: "2-digit", second: "2-digit", hour12: false,
+            }});
+        }} catch (e) {{
+            window.devopinLogTimeFormat = new Intl.DateTimeFormat("en-GB", {{timeZone: "UTC", dateStyle: "short", timeStyle: "medium"}});
+        }}
+        return window.devopinLogTimeFormat.format(new Date(params.value)).replace(",", "");
+    }}'''
+
+@app.get("/project/{id}/logs/data")
+def project_logs_data(id: int, request: Request, cursor: str | None = None, offset: int = 0, limit: int = LOG_BLOCK_SIZE):
+    """Serve one block of project logs to the detail page grid"""
+    user_session = app.storage.user.get("session")
+    if not user_session:
+        raise HTTPException(status_code=401, detail="Not authenticated")
     
-    # Update UI elements
-    search_input.value = ''
-    log_level_select.value = ''
-    date_from_input.value = ''
-    date_to_input.value = ''
+    query_params = {
+        key: value for key, value in request.query_params.items()
+        if key in LOG_FILTER_KEYS
+    }
+    with db_context() as db:
+        # Times stay in UTC, the grid formats them in the user's timezone
+        block = get_log_project_block(
+            db,
+            project_id=id,
+            query_params=query_params,
+            cursor=cursor,
+            offset=max(offset, 0),
+            limit=max(1, min(limit, 500)),
+            user_timezone=None,
+        )
     
-    refresh_log_data(project)
+    return {
+        "data": [
+            {
+                "id": log.id,
+                "log_level": log.log_level,
+                "message": log.message,
+                "controller": log.controller,
+                "file_path": f"{log.file_path}:{log.line_number}" if log.file_path and log.line_number else log.file_path,
+                "log_time": to_utc_epoch_ms(log.log_time),
+            }
+            for log in block.data
+        ],
+        "next_cursor": block.next_cursor,
+    }
+
+def _count_logs_sync(project_id: int, query_params: dict) -> int:
+    with db_context() as db:
+        return count_log_project(db, project_id, query_params)
+
+def _log_facets_sync(project_id: int, query_params: dict) -> dict:
+    """Facet values with counts for the current date range"""
+    with db_context() as db:
+        return {
+            field: get_log_facets(
+                db, project_id, field,
+                date_from=query_params.get('log_time__gte'),
+                date_to=query_params.get('log_time__lte'),
+            )
+            for field in ('controller', 'file_path')
+        }
+
+def build_facet_options(facets: list, selected: str) -> dict:
+    """Select options labelled with their counts, keeping the selected value"""
+    options = {value: f'{value} ({count})' for value, count in facets}
+    if selected and selected not in options:
+        options[selected] = f'{selected} (0)'
+    return options
 
 @ui.page("/project/{id}/detail")
 def detail(id: str):
     """Project detail page"""
-    global log_table, pagination_info, page_label, prev_btn, next_btn
-    
     project = None
+    user_session = app.storage.user.get("session") or {}
     with db_context() as db:
         project = get_project_by_id(db, int(id))
         if project is None:
             ui.navigate.to("/404")
             return
+        user_timezone = get_user_timezone(db, user_session.get('id'))
+        error_patterns = get_top_error_patterns(db, project.id)
+        activity_hours, activity_series = get_hourly_log_counts(db, project.id)
+        last_error_at = get_last_error_times(db, project.id).get(project.id)
     
     ui.add_css('''
         .detail-container {
@@ -273,7 +261,96 @@ def detail(id: str):
                         ui.label('Description').classes('text-sm font-medium text-gray-600')
                         ui.label(project.description).classes('text-base')
         
+        # Log Activity Card (hourly counters, last 7 days)
+        with ui.card().classes('detail-card w-full mb-6'):
+            with ui.column().classes('p-6 w-full'):
+                with ui.row().classes('w-full justify-between items-center mb-4'):
+                    ui.label('Log Activity (last 7 days)').classes('text-xl font-semibold')
+                    ui.label(
+                        f"Last error at: {format_datetime_for_user(last_error_at, user_timezone)}" if last_error_at else 'No errors recorded'
+                    ).classes('text-sm text-gray-600')
+                ui.highchart({
+                    'chart': {'type': 'column'},
+                    'title': {'text': None},
+                    'xAxis': {'categories': [format_datetime_for_user(hour, user_timezone, '%m-%d %H:00') for hour in activity_hours]},
+                    'yAxis': {'title': {'text': 'Logs per hour'}},
+                    'plotOptions': {'column': {'stacking': 'normal', 'groupPadding': 0, 'pointPadding': 0}},
+                    'series': [
+                        {'name': level, 'data': counts, 'color': get_log_level_color(level)}
+                        for level, counts in activity_series.items()
+                    ],
+                }).classes('w-full h-64')
+        
+        # Top Error Patterns Card
+        with ui.card().classes('detail-card w-full mb-6'):
+            with ui.column().classes('p-6 w-full'):
+                ui.label('Top Error Patterns (last 24 hours)').classes('text-xl font-semibold mb-4')
+                if error_patterns:
+                    ui.table(
+                        columns=[
+                            {'name': 'template', 'label': 'Pattern', 'field': 'template', 'align': 'left'},
+                            {'name': 'log_level', 'label': 'Level', 'field': 'log_level', 'align': 'left'},
+                            {'name': 'count', 'label': 'Count', 'field': 'count', 'sortable': True},
+                            {'name': 'last_seen', 'label': 'Last Seen', 'field': 'last_seen', 'align': 'left'},
+                        ],
+                        rows=[
+                            {
+                                'id': pattern.id,
+                                'template': pattern.template,
+                                'log_level': pattern.log_level,
+                                'count': pattern.count,
+                                'last_seen': format_datetime_for_user(pattern.last_seen, user_timezone) or '-',
+                            } for pattern in error_patterns
+                        ],
+                        row_key='id',
+                    ).classes('w-full').props('flat wrap-cells')
+                else:
+                    ui.label('No error patterns recorded yet').classes('text-sm text-gray-600')
+        
         # Project Logs Card
+        filters = {
+            'search': '',
+            'log_level': '',
+            'controller': '',
+            'file_path': '',
+            'date_from': '',
+            'date_to': ''
+        }
+        
+        async def reload_logs():
+            """Reset the grid to the first block with the current filters"""
+            query_params = build_log_query_params(filters)
+            ui.run_javascript(f'''
+                const api = getElement({log_grid.id}).api;
+                const datasource = api.getGridOption("datasource");
+                datasource.params = {json.dumps(query_params)};
+                datasource.cursors = {{}};
+                api.setGridOption("datasource", datasource);
+            ''')
+            total = await run_in_threadpool(_count_logs_sync, project.id, query_params)
+            log_count_label.text = f"{total} logs"
+            facets = await run_in_threadpool(_log_facets_sync, project.id, query_params)
+            controller_select.set_options(build_facet_options(facets['controller'], filters['controller']), value=filters['controller'] or None)
+            file_select.set_options(build_facet_options(facets['file_path'], filters['file_path']), value=filters['file_path'] or None)
+        
+        def reset_filters():
+            """Reset all filters"""
+            search_input.value = ''
+            log_level_select.value = ''
+            controller_select.value = None
+            file_select.value = None
+            date_from_input.value = ''
+            date_to_input.value = ''
+            filters.update({
+                'search': '',
+                'log_level': '',
+                'controller': '',
+                'file_path': '',
+                'date_from': '',
+                'date_to': ''
+            })
+            return reload_logs()
+        
         with ui.card().classes('detail-card w-full'):
             with ui.column().classes('p-6 w-full'):
                 # Header with filters
@@ -292,69 +369,82 @@ def detail(id: str):
                             label='Level',
                         ).classes('w-32').props('outlined dense clearable')
                         log_level_select.bind_value_to(filters,'log_level')
+                        controller_select = ui.select(
+                            options={},
+                            label='Controller',
+                            with_input=True,
+                        ).classes('w-44').props('outlined dense clearable')
+                        controller_select.bind_value_to(filters, 'controller', forward=lambda value: value or '')
+                        file_select = ui.select(
+                            options={},
+                            label='File',
+                            with_input=True,
+                        ).classes('w-44').props('outlined dense clearable')
+                        file_select.bind_value_to(filters, 'file_path', forward=lambda value: value or '')
                         date_from_input = ui.input(
                             placeholder='From',
                             value=filters['date_from'],
-                            on_change=lambda e: setattr(filters, 'date_from', e.value)
                         ).classes('w-36').props('outlined dense type=date')
                         date_from_input.bind_value_to(filters,'date_from')
                         
                         date_to_input = ui.input(
                             placeholder='To', 
                             value=filters['date_to'],
-                            on_change=lambda e: setattr(filters, 'date_to', e.value)
                         ).classes('w-36').props('outlined dense type=date')
                         date_to_input.bind_value_to(filters,'date_to')
                         
                         # Action buttons
                         ui.button(
                             icon='filter_list',
-                            on_click=lambda: apply_filters(project)
+                            on_click=reload_logs
                         ).classes('p-2').props('color=primary').tooltip('Apply Filters')
                         
                         ui.button(
                             icon='clear',
-                            on_click=lambda: reset_filters(project, search_input, log_level_select, date_from_input, date_to_input)
+                            on_click=reset_filters
                         ).classes('p-2').props('color=secondary').tooltip('Reset Filters')
                         
                         ui.button(
                             icon='refresh',
-                            on_click=lambda: refresh_log_data(project)
+                            on_click=reload_logs
                         ).classes('p-2').props('color=primary outlined').tooltip('Refresh')
                 
-                # Log table container
-                log_table = ui.column().classes("w-full")
+                # Log grid, rows are fetched lazily in blocks while scrolling
+                level_colors = {level: get_log_level_color(level) for level in ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']}
+                log_grid = ui.aggrid({
+                    'rowModelType': 'infinite',
+                    'cacheBlockSize': LOG_BLOCK_SIZE,
+                    'maxBlocksInCache': LOG_MAX_BLOCKS_IN_CACHE,
+                    'infiniteInitialRowCount': LOG_BLOCK_SIZE,
+                    ':getRowId': '(params) => String(params.data.id)',
+                    ':datasource': build_log_datasource(project.id, build_log_query_params(filters)),
+                    'columnDefs': [
+                        {
+                            'headerName': 'Level',
+                            'field': 'log_level',
+                            'width': 110,
+                            ':cellStyle': f'(params) => ({{color: {json.dumps(level_colors)}[(params.value || "").toUpperCase()] || "gray", fontWeight: 600}})',
+                        },
+                        {'headerName': 'Message', 'field': 'message', 'flex': 1, 'tooltipField': 'message'},
+                        {'headerName': 'Controller', 'field': 'controller', 'width': 180, 'tooltipField': 'controller'},
+                        {'headerName': 'File', 'field': 'file_path', 'width': 200, 'cellClass': 'font-mono', 'tooltipField': 'file_path'},
+                        {
+                            'headerName': 'Time',
+                            'field': 'log_time',
+                            'width': 180,
+                            'cellClass': 'font-mono',
+                            ':valueFormatter': build_log_time_formatter(user_timezone),
+                        },
+                    ],
+                    'defaultColDef': {'sortable': False, 'resizable': True},
+                }, auto_size_columns=False).classes('w-full').style('height: 600px')
                 
-                # Pagination info
+                # Row count
                 with ui.row().classes('w-full justify-between items-center mt-4'):
-                    pagination_info = ui.label('Loading...').classes('text-sm text-gray-600')
-                    
-                    with ui.row().classes('gap-2'):
-                        prev_btn = ui.button(
-                            icon='chevron_left',
-                            on_click=lambda: handle_pagination(-1, project)
-                        ).classes('p-1').props('flat dense').tooltip('Previous Page')
-                        
-                        page_label = ui.label('Page 1').classes('text-sm px-2 py-1')
-                        
-                        next_btn = ui.button(
-                            icon='chevron_right',
-                            on_click=lambda: handle_pagination(1, project)
-                        ).classes('p-1').props('flat dense').tooltip('Next Page')
+                    log_count_label = ui.label('Loading...').classes('text-sm text-gray-600')
     
-    # Load initial data
-    refresh_log_data(project)
+    # Load initial count
+    ui.context.client.on_connect(reload_logs)
     
     # Add layout
     layout()
-
-def handle_pagination(direction: int, project):
-    """Handle pagination navigation"""
-    global current_page, total_count, current_limit
-    
-    if direction == -1 and current_page > 1:
-        current_page -= 1
-    elif direction == 1 and current_page * current_limit < total_count:
-        current_page += 1
-    
-    refresh_log_data(project)
\ No newline at end of file
@@ -141,7 +141,7 @@ async def handle_service_control(action: str, worker: dict):
     ui.notify(f"{action.capitalize()}ing {service_name}...", type="info")
     
     # Send command to agent
-    result = agent_controller.send_command(action, service_name)
+    result = await agent_controller.send_command_async(action, service_name)
     status_update = 'active' if action in ['start', 'restart'] else 'inactive'
     
     if result.get("success"):
@@ -1,179 +1,174 @@
+import json
 from nicegui import ui
 from ..layout import layout
-from ...utils.agent_controller import AgentController
-import json
-import threading
-import time
-
-# Global variables for log streaming
-log_container = None
-is_streaming = False
-current_stream_id = None
-log_thread = None
-service_name_global = None
-
-def stop_streaming():
-    """Stop log streaming"""
-    global is_streaming, current_stream_id, log_thread
-    is_streaming = False
-    
-    if current_stream_id:
-        try:
-            agent_controller = AgentController()
-            agent_controller.stop_log_stream(current_stream_id)
-        except Exception as e:
-            print(f"Error stopping stream: {e}")
-    
-    if log_thread and log_thread.is_alive():
-        try:
-            log_thread.join(timeout=1.0)
-        except Exception:
-            pass
-
-def start_streaming():
-    """Start log streaming"""
-    global is_streaming, current_stream_id, log_thread, log_container, service_name_global
-    
-    if is_streaming:
-        return
-    
-    if not service_name_global or service_name_global == "unknown":
-        ui.notify("Service name not available", type="negative")
-        return
-    
-    is_streaming = True
-    
-    def stream_logs():
-        global current_stream_id, is_streaming
-        try:
-            agent_controller = AgentController()
-            # Start stream - ensure service_name_global is not None
-            if not service_name_global:
-                ui.notify("Service name is not available", type="negative")
-                return
-            result = agent_controller.start_log_stream(service_name_global)
-            
-            if not result.get("success"):
-                ui.notify(f"Failed to start log stream: {result.get('message', 'Unknown error')}", type="negative")
-                return
-            
-            stream_socket = result.get("socket")
-            if not stream_socket:
-                ui.notify("No socket returned for streaming", type="negative")
-                return
-            
-            # Read initial response to get stream_id
-            try:
-                response = stream_socket.recv(1024).decode()
-                initial_data = json.loads(response)
-                current_stream_id = initial_data.get("stream_id")
-                
-                if initial_data.get("success"):
-                    ui.notify(f"Log streaming started for {service_name_global}", type="positive")
-                
-            except Exception as e:
-                ui.notify(f"Error reading initial response: {e}", type="negative")
-                return
-            
-            # Read log data continuously
-            buffer = ""
-            while is_streaming:
-                try:
-                    data = stream_socket.recv(1024).decode()
-                    if not data:
-                        break
-                    
-                    buffer += data
-                    while '\n' in buffer:
-                        line, buffer = buffer.split('\n', 1)
-                        if line.strip():
-                            try:
-                                log_entry = json.loads(line)
-                                command = log_entry.get("command")
-                                
-                                if command == "logs_data":
-                                    # Parse journalctl JSON data
-                                    log_data = log_entry.get("data", "")
-                                    if log_data:
-                                        try:
-                                            journal_entry = json.loads(log_data)
-                                            timestamp = journal_entry.get("__REALTIME_TIMESTAMP", "")
-                                            message = journal_entry.get("MESSAGE", "")
-                                            unit = journal_entry.get("_SYSTEMD_UNIT", service_name_global)
-                                            
-                                            # Format timestamp
-                                            if timestamp:
-                                                try:
-                                                    ts = int(timestamp) / 1000000  # Convert from microseconds
-                                                    formatted_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
-                                                except Exception:
-                                                    formatted_time = timestamp
-                                            else:
-                                                formatted_time = time.strftime("%Y-%m-%d %H:%M:%S")
-                                            
-                                            # Add log entry to UI
-                                            if log_container:
-                                                with log_container:
-                                                    with ui.row().classes('w-full border-b border-gray-100 p-2 text-sm font-mono'):
-                                                        ui.label(f"[{formatted_time}]").classes('text-gray-500 w-48 flex-shrink-0')
-                                                        ui.label(f"{unit}:").classes('text-blue-600 w-32 flex-shrink-0')
-                                                        ui.label(message).classes('flex-1 text-gray-800 break-words')
-                                            
-                                        except json.JSONDecodeError:
-                                            # Handle non-JSON log data
-                                            if log_container:
-                                                with log_container:
-                                                    with ui.row().classes('w-full border-b border-gray-100 p-2 text-sm font-mono'):
-                                                        ui.label(f"[{time.strftime('%H:%M:%S')}]").classes('text-gray-500 w-48 flex-shrink-0')
-                                                        ui.label(f"{service_name_global}:").classes('text-blue-600 w-32 flex-shrink-0')
-                                                        ui.label(log_data).classes('flex-1 text-gray-800 break-words')
-                                
-                                elif command == "logs_stream_ended":
-                                    ui.notify("Log streaming ended", type="info")
-                                    break
-                                    
-                            except json.JSONDecodeError:
-                                continue
-                
-                except Exception as e:
-                    if is_streaming:
-                        print(f"Error reading log data: {e}")
-                    break
-            
-            stream_socket.close()
-            
-        except Exception as e:
-            ui.notify(f"Error in log streaming: {e}", type="negative")
-        finally:
-            is_streaming = False
-    
-    # Start streaming in background thread
-    log_thread = threading.Thread(target=stream_logs, daemon=True)
-    log_thread.start()
-
-def clear_logs():
-    """Clear log container"""
-    global log_container
-    if log_container:
-        log_container.clear()
-        with log_container:
-            ui.label('Logs cleared. Click "Start Streaming" to view real-time logs...').classes('text-gray-500 text-center p-4')
+from ...utils.log_stream_hub import log_stream_hub
+
+# Lines kept in the browser and interval between UI flushes
+MAX_RENDERED_LINES = 5000
+FLUSH_INTERVAL = 0.1
+
+# Appends a batch of lines in one DOM update and trims the oldest ones
+LOG_VIEW_SCRIPT = '''
+<script>
+window.devopinAppendLogs = (id, lines, maxLines) => {
+  const el = document.getElementById(id);
+  if (!el) return;
+  const atBottom = el.scrollTop + el.clientHeight >= el.scrollHeight - 20;
+  const fragment = document.createDocumentFragment();
+  for (const [time, unit, message] of lines) {
+    const row = document.createElement("div");
+    row.className = "log-line";
+    for (const [cls, text] of [["log-time", `[${time}]`], ["log-unit", `${unit}:`], ["log-message", message]]) {
+      const span = document.createElement("span");
+      span.className = cls;
+      span.textContent = text;
+      row.appendChild(span);
+    }
+    fragment.appendChild(row);
+  }
+  el.appendChild(fragment);
+  while (el.childElementCount > maxLines) el.removeChild(el.firstElementChild);
+  if (atBottom) el.scrollTop = el.scrollHeight;
+};
+window.devopinClearLogs = (id) => {
+  const el = document.getElementById(id);
+  if (el) el.replaceChildren();
+};
+</script>
+'''
+
+
+class ServiceLogViewer:
+    """Per-client state of the service logs page.
+
+    Incoming lines are only queued; a timer flushes them to the browser every
+    FLUSH_INTERVAL seconds as a single JavaScript call, and the browser keeps
+    at most MAX_RENDERED_LINES rows. While paused, lines are counted but not
+    rendered.
+    """
+
+    def __init__(self, service_name: str):
+        self.service_name = service_name
+        self.client = ui.context.client
+        self.log_container = None
+        self.status_icon = None
+        self.status_label = None
+        self.counter_label = None
+        self.pause_button = None
+        self.unsubscribe = None
+        self.pending = []
+        self.paused = False
+        self.received_count = 0
+        self.skipped_count = 0
+
+    @property
+    def is_streaming(self) -> bool:
+        return self.unsubscribe is not None
+
+    def start_streaming(self):
+        """Start log streaming"""
+        if self.is_streaming:
+            return
+
+        if not self.service_name or self.service_name == "unknown":
+            ui.notify("Service name not available", type="negative")
+            return
+
+        self.clear_logs()
+        self.unsubscribe = log_stream_hub.subscribe(
+            self.service_name, self.append_log, self.handle_event
+        )
+        self.set_status(True)
+
+    def stop_streaming(self):
+        """Stop log streaming"""
+        if self.unsubscribe:
+            self.unsubscribe()
+            self.unsubscribe = None
+        self.set_status(False)
+
+    def clear_logs(self):
+        """Clear log container"""
+        self.pending.clear()
+        if self.log_container and self.client.has_socket_connection:
+            self.client.run_javascript(f'devopinClearLogs("{self.log_container.html_id}")')
+
+    def toggle_pause(self):
+        """Pause or resume rendering; lines keep being counted while paused"""
+        self.paused = not self.paused
+        if self.paused:
+            self.pending.clear()
+        if self.pause_button:
+            self.pause_button.text = 'Resume' if self.paused else 'Pause'
+            self.pause_button.props(f"icon={'play_circle' if self.paused else 'pause_circle'}")
+        self.update_counters()
+
+    def update_counters(self):
+        if self.counter_label:
+            text = f"{self.received_count} lines received"
+            if self.skipped_count:
+                text += f", {self.skipped_count} skipped while paused"
+            if self.paused:
+                text += " (paused)"
+            if self.counter_label.text != text:
+                self.counter_label.text = text
+
+    def set_status(self, streaming: bool):
+        if self.status_icon and self.status_label:
+            self.status_icon.name = 'radio_button_checked' if streaming else 'radio_button_unchecked'
+            self.status_icon.classes(replace='text-emerald-500' if streaming else 'text-red-500')
+            self.status_label.text = 'Streaming' if streaming else 'Stopped'
+            self.status_label.classes(replace=f"{'text-emerald-500' if streaming else 'text-red-500'} font-medium")
+
+    def handle_event(self, kind: str, message: str):
+        with self.client:
+            if kind == "started":
+                ui.notify(message, type="positive")
+            elif kind == "ended":
+                ui.notify(message, type="info")
+            else:
+                ui.notify(message, type="negative")
+        if kind != "started":
+            # Drop the subscription so the hub can close a dead stream
+            self.stop_streaming()
+
+    def append_log(self, entry: dict):
+        self.received_count += 1
+        if self.paused:
+            self.skipped_count += 1
+            return
+        self.pending.append((entry['time'], entry['unit'], entry['message']))
+        if len(self.pending) > 2 * MAX_RENDERED_LINES:
+            # Client not flushing (e.g. reconnecting): keep memory bounded
+            del self.pending[:-MAX_RENDERED_LINES]
+
+    def flush(self):
+        """Send queued lines to the browser in one update"""
+        if not self.pending and not self.is_streaming:
+            return
+        if self.pending and self.log_container and self.client.has_socket_connection:
+            # Lines beyond the render buffer would be trimmed right away
+            lines = self.pending[-MAX_RENDERED_LINES:]
+            self.pending = []
+            self.client.run_javascript(
+                f'devopinAppendLogs("{self.log_container.html_id}", {json.dumps(lines)}, {MAX_RENDERED_LINES})'
+            )
+        self.update_counters()
+
 
 @ui.page("/service-worker/logs")
 def service_worker_logs(service: str = "unknown"):
     """Service worker logs viewing page"""
-    global log_container, service_name_global
-    
     # Get service name from URL parameters
-    service_name_global = service
-    
+    viewer = ServiceLogViewer(service)
+
     ui.add_css('''
         .logs-container {
             padding: 20px;
             max-width: 1400px;
             margin: 0 auto;
         }
-        
+
         .logs-card {
             background: rgba(255, 255, 255, 0.95);
             backdrop-filter: blur(10px);
@@ -181,12 +176,26 @@ def service_worker_logs(service: str = "unknown"):
             border-radius: 12px;
             box-shadow: 0 4px 20px rgba(0, 0, 0, 0.1);
         }
-        
+
         .log-entry {
             font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace;
         }
+
+        .log-line {
+            display: flex;
+            gap: 8px;
+            padding: 4px 8px;
+            border-bottom: 1px solid #f3f4f6;
+            font-size: 0.875rem;
+            font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace;
+        }
+
+        .log-time { color: #6b7280; width: 12rem; flex-shrink: 0; }
+        .log-unit { color: #2563eb; width: 8rem; flex-shrink: 0; }
+        .log-message { flex: 1; color: #1f2937; word-break: break-word; white-space: pre-wrap; }
     ''')
-    
+    ui.add_body_html(LOG_VIEW_SCRIPT)
+
     with ui.column().classes('logs-container w-full'):
         # Header
         with ui.row().classes('w-full justify-between items-center mb-6'):
@@ -195,59 +204,63 @@ def service_worker_logs(service: str = "unknown"):
                     icon="arrow_back",
                     on_click=lambda: ui.navigate.to("/service-worker")
                 ).classes("bg-gray-600 text-white hover:bg-gray-700").tooltip("Back to Service Workers")
-                
-                ui.label(f'📋 Service Logs: {service_name_global}').classes('text-3xl font-bold')
-            
+
+                ui.label(f'📋 Service Logs: {viewer.service_name}').classes('text-3xl font-bold')
+
             # Control buttons
             with ui.row().classes('items-center gap-3'):
                 ui.button(
                     'Start Streaming',
                     icon='play_arrow',
-                    on_click=start_streaming
+                    on_click=viewer.start_streaming
                 ).classes('bg-green-600 text-white hover:bg-green-700')
-                
+
                 ui.button(
                     'Stop Streaming',
                     icon='stop',
-                    on_click=stop_streaming
+                    on_click=viewer.stop_streaming
                 ).classes('bg-red-600 text-white hover:bg-red-700')
-                
+
+                viewer.pause_button = ui.button(
+                    'Pause',
+                    icon='pause_circle',
+                    on_click=viewer.toggle_pause
+                ).classes('bg-slate-600 text-white hover:bg-slate-700')
+
                 ui.button(
                     'Clear Logs',
                     icon='clear',
-                    on_click=clear_logs
+                    on_click=viewer.clear_logs
                 ).classes('bg-amber-600 text-white hover:bg-amber-700')
-        
+
         # Status indicator
         with ui.row().classes('w-full items-center gap-2 mb-4'):
-            ui.icon('radio_button_unchecked').classes('text-red-500')
-            ui.label('Stopped').classes('text-red-500 font-medium')
-        
+            viewer.status_icon = ui.icon('radio_button_unchecked').classes('text-red-500')
+            viewer.status_label = ui.label('Stopped').classes('text-red-500 font-medium')
+            viewer.counter_label = ui.label('0 lines received').classes('text-sm text-gray-500 ml-4')
+
         # Main logs card
         with ui.card().classes('logs-card w-full'):
             with ui.column().classes('p-6 w-full'):
                 with ui.row().classes('w-full justify-between items-center mb-4'):
                     ui.label('Real-time Service Logs').classes('text-xl font-semibold')
-                    
+
                     # Info text
-                    ui.label(f'Streaming logs from journalctl -u {service_name_global} -f --output=json').classes('text-sm text-gray-600')
-                
-                # Log container with scroll area
-                with ui.scroll_area().classes('w-full h-96 border border-gray-300 rounded bg-gray-50'):
-                    log_container = ui.column().classes('w-full p-2')
-                    
-                    # Initial message
-                    with log_container:
-                        ui.label('Click "Start Streaming" to view real-time logs...').classes('text-gray-500 text-center p-4')
-    
+                    ui.label(f'Streaming logs from journalctl -u {viewer.service_name} -f --output=json').classes('text-sm text-gray-600')
+
+                # Log container with scroll area, filled from the browser side
+                viewer.log_container = ui.element('div').classes(
+                    'w-full h-96 overflow-auto border border-gray-300 rounded bg-gray-50 p-2'
+                )
+
     # Auto-start streaming when page loads
-    ui.timer(1.0, lambda: start_streaming(), once=True)
-    
+    ui.timer(1.0, viewer.start_streaming, once=True)
+
+    # Flush queued lines to the browser in batches
+    ui.timer(FLUSH_INTERVAL, viewer.flush)
+
     # Cleanup when page is closed
-    def cleanup():
-        stop_streaming()
-    
-    ui.context.client.on_disconnect(cleanup)
-    
+    ui.context.client.on_disconnect(viewer.stop_streaming)
+
     # Add layout
-    layout()
\ No newline at end of file
+    layout()
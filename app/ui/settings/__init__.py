@@ -1,9 +1,10 @@
 from nicegui import ui, app
 from ..layout import layout
 from ...utils.db_context import db_context
-from ...services.user_service import get_user_by_id
+from ...services.user_service import get_user_by_id, resolve_user_timezone, invalidate_user_timezone
 from ...models.user import User
 from ...utils.timezone_utils import get_available_timezones
+from ...utils.rate_limiter import ingest_limiter
 from sqlalchemy.exc import IntegrityError
 
 
@@ -15,6 +16,7 @@ def update_user_timezone(user_id: int, new_timezone: str):
             if user:
                 user.user_timezone = new_timezone
                 db.commit()
+                invalidate_user_timezone(user_id)
                 
                 # Update session data
                 user_session = app.storage.user.get("session", {})
@@ -31,6 +33,41 @@ def update_user_timezone(user_id: int, new_timezone: str):
         return False
 
 
+def render_ingest_limits():
+    """Card with the ingest rate limiter state, refreshed every few seconds"""
+    columns = [
+        {'name': 'kind', 'label': 'Type', 'field': 'kind', 'align': 'left'},
+        {'name': 'key', 'label': 'Agent / Project', 'field': 'key', 'align': 'left'},
+        {'name': 'rate', 'label': 'Lines/sec', 'field': 'rate'},
+        {'name': 'tokens', 'label': 'Tokens left', 'field': 'tokens'},
+        {'name': 'burst', 'label': 'Burst', 'field': 'burst'},
+    ]
+    
+    with ui.card().classes('w-full mb-4'):
+        ui.label('Ingest Rate Limits').classes('text-lg font-semibold mb-2')
+        summary_label = ui.label().classes('text-gray-600 mb-2')
+        rejections_label = ui.label().classes('text-gray-600 mb-2')
+        table = ui.table(columns=columns, rows=[], row_key='id', pagination=10).classes('w-full')
+    
+    def refresh():
+        stats = ingest_limiter.get_stats()
+        summary_label.set_text(
+            f"Agent limit: {stats['agent_rate']:g} lines/s, project limit: {stats['project_rate']:g} lines/s, "
+            f"in flight: {stats['in_flight']}/{stats['max_in_flight']}, admitted: {stats['admitted']} requests ({stats['lines']} lines)"
+        )
+        rejections = stats['rejections']
+        rejections_label.set_text(
+            'Rejections: ' + (', '.join(f'{kind} {count}' for kind, count in sorted(rejections.items())) or 'none')
+        )
+        table.rows = [
+            {**bucket, 'id': f"{bucket['kind']}:{bucket['key']}", 'key': str(bucket['key'])} for bucket in stats['buckets']
+        ]
+        table.update()
+    
+    refresh()
+    ui.timer(5.0, refresh)
+
+
 @ui.page('/settings')
 def settings_page():
     layout()
@@ -47,9 +84,7 @@ def settings_page():
     # Get current user timezone from database
     try:
         with db_context() as db:
-            user = db.query(User).filter(User.id == user_id).first()
-            if user and hasattr(user, 'user_timezone'):
-                current_timezone = user.user_timezone
+            current_timezone = resolve_user_timezone(db, user_id)
     except Exception:
         pass
     
@@ -91,4 +126,6 @@ def settings_page():
             
             with ui.row().classes('items-center mb-2'):
                 ui.label('Email:').classes('font-medium w-20')
-                ui.label(user_session.get('email', 'N/A')).classes('text-gray-700')
\ No newline at end of file
+                ui.label(user_session.get('email', 'N/A')).classes('text-gray-700')
+        
+        render_ingest_limits()
\ No newline at end of file
@@ -11,6 +11,7 @@ from ...services.threshold_service import (
     duplicate_threshold
 )
 from ...services.service_worker_service import get_all_workers
+from ...services.project_service import get_all_projects
 from ...schemas.threshold_schema import (
     ThresholdCreate,
     ThresholdUpdate,
@@ -35,7 +36,8 @@ def get_metric_icon(metric_type: str) -> str:
         'cpu': 'memory',
         'memory': 'storage',
         'disk': 'data_usage',
-        'service_worker_inactive': 'work_off'
+        'service_worker_inactive': 'work_off',
+        'log_error_rate': 'error_outline'
     }
     return icons.get(metric_type.lower(), 'settings')
 
@@ -107,6 +109,15 @@ async def handle_create_threshold():
                 duration_input.visible = False  # Duration not used for service worker monitoring
                 condition_select.value = 'greater_than'  # Only greater_than makes sense
                 condition_select.set_enabled(False)  # Disable condition selection
+            elif metric_select.value == 'log_error_rate':
+                threshold_input.label = 'Errors per minute'
+                threshold_input.min = 0
+                threshold_input.max = 1000000
+                threshold_input.step = 1
+                threshold_input.value = 10
+                threshold_input.tooltip('Project errors per minute, checked for every minute of the duration')
+                duration_input.visible = True
+                condition_select.set_enabled(True)
             else:
                 threshold_input.label = 'Threshold (%)'
                 threshold_input.min = 0
@@ -155,9 +166,17 @@ async def handle_create_threshold():
                 worker_options.update({worker.name: worker.name for worker in workers})
                 
                 source_filter_select.options = worker_options
+                source_filter_select.props('label="Select Service Worker (optional)"')
                 source_filter_select.visible = True
                 source_filter_input.visible = False
                 source_filter_select.tooltip('Select specific service worker to monitor')
+            elif metric_select.value == 'log_error_rate':
+                source_filter_select.options = await get_projects_for_dropdown()
+                source_filter_select.props('label="Select Project (optional)"')
+                source_filter_select.value = ''
+                source_filter_select.visible = True
+                source_filter_input.visible = False
+                source_filter_select.tooltip('Select the project whose error rate is monitored')
             else:
                 source_filter_input.label = 'Source Filter (optional)'
                 source_filter_input.tooltip('Optional filter for metric sources')
@@ -177,7 +196,7 @@ async def handle_create_threshold():
                 from ...schemas.threshold_schema import ThresholdTypeEnum,ThresholdSeverityEnum,ThresholdConditionEnum
                 try:
                     # Get source filter value based on metric type
-                    if metric_select.value == 'service_worker_inactive':
+                    if metric_select.value in ('service_worker_inactive', 'log_error_rate'):
                         source_filter_value = source_filter_select.value if source_filter_select.value else None
                     else:
                         source_filter_value = source_filter_input.value if source_filter_input.value else None
@@ -293,11 +312,27 @@ async def handle_edit_threshold(threshold_id: int):
                 worker_options.update({worker.name: worker.name for worker in workers})
                 
                 source_filter_select.options = worker_options
+                source_filter_select.props('label="Select Service Worker (optional)"')
                 # Set current value if exists
                 source_filter_select.value = threshold_data.source_filter or ''
                 source_filter_select.visible = True
                 source_filter_input.visible = False
                 source_filter_select.tooltip('Select specific service worker to monitor')
+            elif metric_select.value == 'log_error_rate':
+                threshold_input.label = 'Errors per minute'
+                threshold_input.min = 0
+                threshold_input.max = 1000000
+                threshold_input.step = 1
+                threshold_input.tooltip('Project errors per minute, checked for every minute of the duration')
+                duration_input.visible = True
+                condition_select.set_enabled(True)
+                
+                source_filter_select.options = await get_projects_for_dropdown()
+                source_filter_select.props('label="Select Project (optional)"')
+                source_filter_select.value = threshold_data.source_filter or ''
+                source_filter_select.visible = True
+                source_filter_input.visible = False
+                source_filter_select.tooltip('Select the project whose error rate is monitored')
             else:
                 threshold_input.label = 'Threshold (%)'
                 threshold_input.min = 0
@@ -327,7 +362,7 @@ async def handle_edit_threshold(threshold_id: int):
             async def update_action():
                 try:
                     # Get source filter value based on metric type
-                    if metric_select.value == 'service_worker_inactive':
+                    if metric_select.value in ('service_worker_inactive', 'log_error_rate'):
                         source_filter_value = source_filter_select.value if source_filter_select.value else None
                     else:
                         source_filter_value = source_filter_input.value if source_filter_input.value else None
@@ -483,6 +518,18 @@ async def get_service_workers_for_dropdown():
     """Get service workers for dropdown selection"""
     return await run_in_threadpool(_get_service_workers_sync)
 
+def _get_projects_sync():
+    """Get all projects for dropdown"""
+    with db_context() as db:
+        return get_all_projects(db)
+
+async def get_projects_for_dropdown():
+    """Get project options (id as string -> name) for dropdown selection"""
+    projects = await run_in_threadpool(_get_projects_sync)
+    project_options = {'': 'All Projects'}  # Empty option for all projects
+    project_options.update({str(project.id): project.name for project in projects})
+    return project_options
+
 async def refresh_threshold_data():
     """Refresh threshold table and summary"""
     global current_page, current_limit, total_count
@@ -537,6 +584,8 @@ def update_threshold_table(thresholds):
                     with ui.element('div').classes("w-32 text-center"):
                         if threshold.metric_type.lower() == 'service_worker_inactive':
                             condition_text = f">= {threshold.threshold_value}min"
+                        elif threshold.metric_type.lower() == 'log_error_rate':
+                            condition_text = f"{get_condition_text(threshold.condition)} {threshold.threshold_value:g}/min"
                         else:
                             condition_text = f"{get_condition_text(threshold.condition)} {threshold.threshold_value}%"
                         ui.label(condition_text).classes("text-sm font-mono")
@@ -0,0 +1,261 @@
+import os
+import json
+import asyncio
+import itertools
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from ..core.logging_config import get_logger
+
+# Load environment variables
+load_dotenv()
+
+logger = get_logger("app.agent_client")
+
+
+class AgentError(Exception):
+    """Raised when the agent cannot be reached or the exchange breaks"""
+
+
+class _AgentConnection:
+    """One persistent Unix socket connection to the agent.
+
+    Frames are single JSON documents terminated by a newline. Every request
+    carries a ``request_id`` so several requests can be in flight on the same
+    connection; replies that echo the id are matched by it, replies that don't
+    are matched to the oldest pending request (the agent answers in order).
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.write_lock = asyncio.Lock()
+        self.closed = False
+        self.reader_task = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        error: Exception = AgentError("Agent closed the connection")
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    response = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Dropping malformed agent frame: {line[:200]!r}")
+                    continue
+                self._dispatch(response)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            # ValueError: frame larger than the reader limit
+            error = AgentError(f"Agent connection lost: {e}")
+        except asyncio.CancelledError:
+            error = AgentError("Agent connection closed")
+        finally:
+            self._fail_pending(error)
+            self.close()
+
+    def _dispatch(self, response):
+        future = None
+        request_id = response.get("request_id") if isinstance(response, dict) else None
+        if request_id is not None:
+            future = self.pending.pop(str(request_id), None)
+        if future is None and self.pending:
+            # Agent did not echo the id: replies come back in request order
+            future = self.pending.pop(next(iter(self.pending)))
+        if future is not None and not future.done():
+            future.set_result(response)
+
+    def _fail_pending(self, error: Exception):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self.pending.clear()
+
+    async def request(self, request_id: str, payload: dict) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        try:
+            async with self.write_lock:
+                self.writer.write(json.dumps(payload).encode() + b"\n")
+                await self.writer.drain()
+        except Exception:
+            self.pending.pop(request_id, None)
+            self.close()
+            raise
+        return future
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+        if not self.reader_task.done() and self.reader_task is not asyncio.current_task():
+            self.reader_task.cancel()
+
+
+class AgentClient:
+    """Asyncio client for the devopin-agent Unix socket.
+
+    Keeps a small pool of persistent connections on a dedicated event loop
+    thread so it can be used from NiceGUI handlers, FastAPI routes and worker
+    threads alike. Use ``call`` from synchronous code and ``acall`` from
+    coroutines running on any loop.
+    """
+
+    def __init__(self, socket_path: str, pool_size: int = 2, timeout: float = 10.0,
+                 max_frame_size: int = 16 * 1024 * 1024):
+        self.socket_path = socket_path
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self.max_frame_size = max_frame_size
+        self._connections: List[Optional[_AgentConnection]] = [None] * self.pool_size
+        self._connect_locks: List[Optional[asyncio.Lock]] = [None] * self.pool_size
+        self._slot = itertools.count()
+        self._ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    # -- event loop management -------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is not None:
+            return self._loop
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=loop.run_forever, name="agent-client", daemon=True
+                )
+                self._thread.start()
+                self._loop = loop
+        return self._loop
+
+    def close(self):
+        """Close pooled connections and stop the client loop"""
+        loop = self._loop
+        if loop is None:
+            return
+
+        async def _close_all():
+            for index, connection in enumerate(self._connections):
+                if connection is not None:
+                    connection.close()
+                self._connections[index] = None
+
+        asyncio.run_coroutine_threadsafe(_close_all(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        self._loop = None
+
+    # -- connection pool -------------------------------------------------------
+
+    async def _get_connection(self) -> _AgentConnection:
+        index = next(self._slot) % self.pool_size
+        connection = self._connections[index]
+        if connection is not None and not connection.closed:
+            return connection
+
+        lock = self._connect_locks[index]
+        if lock is None:
+            lock = self._connect_locks[index] = asyncio.Lock()
+        async with lock:
+            connection = self._connections[index]
+            if connection is None or connection.closed:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_unix_connection(self.socket_path, limit=self.max_frame_size),
+                    timeout=self.timeout,
+                )
+                connection = _AgentConnection(reader, writer)
+                self._connections[index] = connection
+                logger.debug(f"Opened agent connection #{index} to {self.socket_path}")
+            return connection
+
+    # -- requests ----------------------------------------------------------------
+
+    async def request(self, command: str, timeout: Optional[float] = None, **params) -> dict:
+        """Send one command and wait for its reply (must run on the client loop)"""
+        timeout = self.timeout if timeout is None else timeout
+        request_id = str(next(self._ids))
+        payload = {"command": command, "request_id": request_id, **params}
+
+        try:
+            connection = await self._get_connection()
+            future = await connection.request(request_id, payload)
+        except ConnectionError:
+            # The agent may have closed an idle pooled connection; the frame
+            # never went out, so it is safe to retry once on a fresh one.
+            connection = await self._get_connection()
+            future = await connection.request(request_id, payload)
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            connection.pending.pop(request_id, None)
+            # A late reply without request_id would be matched to the next
+            # request, so drop the connection instead of risking a mix-up.
+            connection.close()
+            raise
+
+    def submit(self, command: str, timeout: Optional[float] = None, **params) -> Future:
+        """Schedule a command on the client loop and return a concurrent future"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(
+            self.request(command, timeout=timeout, **params), loop
+        )
+
+    def call(self, command: str, timeout: Optional[float] = None, **params) -> dict:
+        """Blocking variant of ``request`` for synchronous callers"""
+        return self._wrap_errors(lambda: self.submit(command, timeout=timeout, **params).result())
+
+    async def acall(self, command: str, timeout: Optional[float] = None, **params) -> dict:
+        """Awaitable variant of ``request`` usable from any event loop"""
+        future = asyncio.wrap_future(self.submit(command, timeout=timeout, **params))
+        try:
+            return await future
+        except Exception as e:
+            return self._error_response(e)
+
+    async def open_stream(self, command: str, **params):
+        """Open a dedicated connection for a streaming command.
+
+        Streams occupy their connection for their whole lifetime, so they are
+        not taken from the pool and live on the caller's event loop. Returns
+        the reader/writer pair after the command has been sent.
+        """
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_unix_connection(self.socket_path, limit=self.max_frame_size),
+            timeout=self.timeout,
+        )
+        payload = {"command": command, "request_id": str(next(self._ids)), **params}
+        writer.write(json.dumps(payload).encode() + b"\n")
+        await writer.drain()
+        return reader, writer
+
+    def _wrap_errors(self, fn) -> dict:
+        try:
+            return fn()
+        except Exception as e:
+            return self._error_response(e)
+
+    def _error_response(self, error: Exception) -> dict:
+        if isinstance(error, asyncio.TimeoutError):
+            return {"success": False, "message": "Command timeout. Agent may be busy."}
+        if isinstance(error, FileNotFoundError):
+            return {"success": False, "message": f"Agent socket not found at {self.socket_path}. Is devopin-agent running?"}
+        if isinstance(error, ConnectionRefusedError):
+            return {"success": False, "message": "Cannot connect to agent. Is devopin-agent service running?"}
+        if isinstance(error, PermissionError):
+            return {"success": False, "message": f"Permission denied accessing socket: {str(error)}"}
+        return {"success": False, "message": f"Error communicating with agent: {str(error)}"}
+
+
+def get_pool_size() -> int:
+    """Get agent connection pool size from environment variables."""
+    return int(os.getenv('AGENT_POOL_SIZE', '2'))
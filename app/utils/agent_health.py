@@ -0,0 +1,114 @@
+import os
+import time
+import asyncio
+from dataclasses import dataclass
+from typing import Optional
+from .agent_controller import agent_client
+from .broadcast import Broadcaster
+from ..core.logging_config import get_logger
+
+logger = get_logger("app.agent_health")
+
+
+@dataclass(frozen=True)
+class AgentHealth:
+    online: bool
+    status: str
+    latency_ms: Optional[float] = None
+    checked_at: Optional[float] = None
+    message: str = ""
+
+
+UNKNOWN = AgentHealth(online=False, status="Unknown", message="Agent not probed yet")
+
+
+class AgentHealthProbe:
+    """Background prober keeping a cached agent status for page renders.
+
+    Probes every ``interval`` seconds while the agent answers and backs off
+    exponentially (up to ``max_backoff``) while it is down. Status changes are
+    pushed to subscribers through ``changes``; readers that only need the
+    current value call ``snapshot()``, which never touches the socket.
+    """
+
+    def __init__(self, interval: float = 15.0, max_backoff: float = 120.0,
+                 ttl: Optional[float] = None, timeout: float = 3.0):
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.ttl = ttl if ttl is not None else interval * 3
+        self.timeout = timeout
+        self.changes = Broadcaster()
+        self._health = UNKNOWN
+        self._delay = interval
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def snapshot(self) -> AgentHealth:
+        """Return the cached status, or Unknown once it is older than the TTL"""
+        health = self._health
+        if health.checked_at is None:
+            return health
+        # While backing off the agent is known to be down, keep reporting it
+        max_age = max(self.ttl, self._delay + self.timeout)
+        if time.monotonic() - health.checked_at > max_age:
+            return UNKNOWN
+        return health
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def refresh(self):
+        """Probe immediately instead of waiting for the next cycle"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def probe(self) -> AgentHealth:
+        started = time.monotonic()
+        result = await agent_client.acall("status", timeout=self.timeout)
+        latency_ms = (time.monotonic() - started) * 1000
+        if result.get("success"):
+            health = AgentHealth(True, "Online", round(latency_ms, 1), time.monotonic())
+        else:
+            health = AgentHealth(False, "Offline", None, time.monotonic(), result.get("message", ""))
+        self._update(health)
+        return health
+
+    def _update(self, health: AgentHealth):
+        previous = self._health
+        self._health = health
+        if previous.online != health.online or previous.status != health.status:
+            logger.info(f"Agent status changed: {previous.status} -> {health.status}")
+            self.changes.publish(health)
+
+    async def _run(self):
+        while True:
+            try:
+                health = await self.probe()
+            except Exception as e:
+                logger.error(f"Agent health probe failed: {e}")
+                health = AgentHealth(False, "Offline", None, time.monotonic(), str(e))
+                self._update(health)
+
+            if health.online:
+                self._delay = self.interval
+            else:
+                self._delay = min(self._delay * 2, self.max_backoff)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+agent_health = AgentHealthProbe(
+    interval=float(os.getenv('AGENT_HEALTH_INTERVAL', '15')),
+    max_backoff=float(os.getenv('AGENT_HEALTH_MAX_BACKOFF', '120')),
+)
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..core.logging_config import get_logger
+
+logger = get_logger("app.broadcast")
+
+
+class Broadcaster:
+    """Fan a value out to subscribed UI callbacks.
+
+    Each callback runs on the event loop it was subscribed from, so
+    publishers may live on worker threads (threadpool DB calls, background
+    monitors) without touching NiceGUI elements off-loop. Callbacks
+    subscribed outside a running loop are called in the publisher's thread.
+    """
+
+    def __init__(self):
+        self._listeners: List[Tuple[Callable[..., Any], Optional[asyncio.AbstractEventLoop]]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[..., Any]) -> Callable[[], None]:
+        """Register a callback and return a function that removes it"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        listener = (callback, loop)
+        with self._lock:
+            self._listeners.append(listener)
+
+        def unsubscribe():
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+        return unsubscribe
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._listeners)
+
+    def publish(self, *args: Any) -> None:
+        """Deliver ``args`` to every subscriber on its own event loop"""
+        by_loop: Dict[Optional[asyncio.AbstractEventLoop], List[Callable[..., Any]]] = {}
+        with self._lock:
+            # Listeners of loops that are gone can never run again
+            self._listeners = [(callback, loop) for callback, loop in self._listeners if loop is None or not loop.is_closed()]
+            for callback, loop in self._listeners:
+                by_loop.setdefault(loop, []).append(callback)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        for loop, callbacks in by_loop.items():
+            if loop is None or loop is running:
+                self._dispatch(callbacks, args)
+            else:
+                try:
+                    loop.call_soon_threadsafe(self._dispatch, callbacks, args)
+                except RuntimeError:
+                    # Closed between the check and the call
+                    pass
+
+    @staticmethod
+    def _dispatch(callbacks: List[Callable[..., Any]], args: tuple) -> None:
+        for callback in callbacks:
+            try:
+                result = callback(*args)
+                if asyncio.iscoroutine(result):
+                    asyncio.ensure_future(result)
+            except Exception as e:
+                logger.warning(f"Broadcast listener failed: {e}")
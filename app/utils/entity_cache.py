@@ -0,0 +1,131 @@
+import time
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, Optional, Set, Tuple
+from .broadcast import Broadcaster
+from ..core.logging_config import get_logger
+
+logger = get_logger("app.entity_cache")
+
+PROJECTS = "projects"
+WORKERS = "workers"
+THRESHOLDS = "thresholds"
+
+
+class EntityCache:
+    """Read-through cache for small, rarely changing tables.
+
+    Every entity type has a version counter. Cached values remember the
+    version they were loaded at and are reloaded once the service layer bumps
+    the counter after a write, so readers never see data older than the last
+    committed change made through the services.
+
+    Versions start from the process start time in milliseconds, so a version
+    handed out before a restart is always older than any current one. The ids
+    passed to ``bump`` are kept in a bounded change log for delta syncs.
+    Every bump is published on ``changes`` as ``(entity, version)``.
+    """
+
+    def __init__(self, change_log_size: int = 1000):
+        self._base_version = int(time.time() * 1000)
+        self._versions: Dict[str, int] = {}
+        self._entries: Dict[Tuple[str, Hashable], Tuple[int, Any]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._changes: Dict[str, Deque[Tuple[int, Any, bool]]] = {}
+        # Oldest ``since`` the change log can still answer, per entity
+        self._log_start: Dict[str, int] = {}
+        self._change_log_size = change_log_size
+        self._lock = threading.Lock()
+        self.changes = Broadcaster()
+
+    def version(self, entity: str) -> int:
+        return self._versions.get(entity, self._base_version)
+
+    def bump(self, entity: str, changed: Iterable = (), deleted: Iterable = ()) -> int:
+        """Mark an entity type as changed and return its new version
+
+        ``changed`` and ``deleted`` are the ids of the affected rows. Leaving
+        both empty means the change is unknown and forces a full resync.
+        """
+        with self._lock:
+            version = self.version(entity) + 1
+            self._versions[entity] = version
+            for key in [key for key in self._entries if key[0] == entity]:
+                del self._entries[key]
+
+            log = self._changes.setdefault(entity, deque(maxlen=self._change_log_size))
+            records = [(version, row_id, False) for row_id in changed]
+            records += [(version, row_id, True) for row_id in deleted]
+            if not records:
+                log.clear()
+                self._log_start[entity] = version
+            elif len(log) + len(records) > self._change_log_size:
+                log.extend(records)
+                # The oldest retained version may have lost some of its ids
+                self._log_start[entity] = log[0][0]
+            else:
+                log.extend(records)
+        logger.debug(f"{entity} cache version bumped to {version}")
+        self.changes.publish(entity, version)
+        return version
+
+    def changes_since(self, entity: str, since: int) -> Optional[Tuple[Set, Set]]:
+        """Ids changed and deleted after version ``since``
+
+        Returns None when the change log cannot answer (version from another
+        process, unknown change or trimmed log) and the caller must resync.
+        """
+        with self._lock:
+            current = self.version(entity)
+            if since == current:
+                return set(), set()
+            log = list(self._changes.get(entity, ()))
+            log_start = self._log_start.get(entity, self._base_version)
+        if since > current or since < log_start:
+            return None
+
+        changed: Set = set()
+        deleted: Set = set()
+        for version, row_id, is_deleted in log:
+            if version <= since:
+                continue
+            if is_deleted:
+                changed.discard(row_id)
+                deleted.add(row_id)
+            else:
+                deleted.discard(row_id)
+                changed.add(row_id)
+        return changed, deleted
+
+    def get_or_load(self, entity: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for ``(entity, key)`` or load and cache it"""
+        version = self.version(entity)
+        entry = self._entries.get((entity, key))
+        stats = self._stats.setdefault(entity, {"hits": 0, "misses": 0})
+        if entry is not None and entry[0] == version:
+            stats["hits"] += 1
+            return entry[1]
+
+        stats["misses"] += 1
+        value = loader()
+        with self._lock:
+            # A write during the load makes the value stale, don't keep it
+            if self.version(entity) == version:
+                self._entries[(entity, key)] = (version, value)
+        return value
+
+    def get_stats(self) -> dict:
+        stats = {}
+        for entity in sorted(set(self._versions) | set(self._stats)):
+            counts = self._stats.get(entity, {"hits": 0, "misses": 0})
+            lookups = counts["hits"] + counts["misses"]
+            stats[entity] = {
+                "version": self.version(entity),
+                "hits": counts["hits"],
+                "misses": counts["misses"],
+                "hit_ratio": round(counts["hits"] / lookups, 3) if lookups else None,
+            }
+        return stats
+
+
+entity_cache = EntityCache()
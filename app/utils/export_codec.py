@@ -0,0 +1,142 @@
+import io
+import csv
+import json
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List
+from fastapi import HTTPException
+
+# Export format -> media type of the uncompressed file
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Rows encoded per chunk (and per Parquet row group)
+EXPORT_CHUNK_ROWS = 1000
+
+
+def check_export_format(export_format: str):
+    """Reject unknown formats, and Parquet without pyarrow, before a response starts"""
+    if export_format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {export_format}")
+    if export_format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise HTTPException(status_code=501, detail="Parquet export requires the 'pyarrow' package") from e
+
+
+def export_filename(name: str, export_format: str, compress: bool) -> str:
+    return f"{name}.{export_format}.gz" if compress else f"{name}.{export_format}"
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _text_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _encode_csv(chunks: Iterator[List[dict]], columns: Dict[str, type]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for chunk in chunks:
+        writer.writerows([_text_value(row.get(column)) for column in columns] for row in chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only when there were no rows
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _encode_ndjson(chunks: Iterator[List[dict]], columns: Dict[str, type]) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield "".join(
+            json.dumps({column: _text_value(row.get(column)) for column in columns}, ensure_ascii=False) + "\n"
+            for row in chunk
+        ).encode()
+
+
+class _StreamSink:
+    """Write-only file handing out the bytes written since the last take()"""
+
+    mode = "wb"
+    closed = False
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _encode_parquet(chunks: Iterator[List[dict]], columns: Dict[str, type]) -> Iterator[bytes]:
+    import pyarrow
+    import pyarrow.parquet
+
+    types = {int: pyarrow.int64(), float: pyarrow.float64(), str: pyarrow.string(), datetime: pyarrow.timestamp("us")}
+    schema = pyarrow.schema([(column, types[kind]) for column, kind in columns.items()])
+    sink = _StreamSink()
+    # One row group per chunk, written out as soon as it is complete
+    with pyarrow.parquet.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            writer.write_table(pyarrow.Table.from_pylist(chunk, schema=schema))
+            yield sink.take()
+    yield sink.take()
+
+
+_ENCODERS = {"csv": _encode_csv, "ndjson": _encode_ndjson, "parquet": _encode_parquet}
+
+
+def encode_export(rows: Iterable[dict], columns: Dict[str, type], export_format: str,
+                  compress: bool = False, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Encode rows as CSV, NDJSON or Parquet while they are read, one chunk of
+    ``chunk_rows`` rows at a time, optionally gzip compressed on the fly.
+    ``columns`` maps each exported field to its Python type (int, float,
+    str or datetime), which Parquet needs for the schema.
+    """
+    encoded = _ENCODERS[export_format](_chunks(rows, chunk_rows), columns)
+    if not compress:
+        yield from encoded
+        return
+    # wbits 16+ writes a gzip container
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for data in encoded:
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
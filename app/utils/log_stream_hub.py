@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import asyncio
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+from .agent_controller import agent_client
+from ..core.logging_config import get_logger
+
+logger = get_logger("app.log_stream_hub")
+
+LineCallback = Callable[[dict], None]
+EventCallback = Callable[[str, str], None]
+
+
+def parse_journal_line(service_name: str, log_data: str) -> dict:
+    """Convert a journalctl JSON record into a display entry"""
+    try:
+        journal_entry = json.loads(log_data)
+    except json.JSONDecodeError:
+        # Handle non-JSON log data
+        return {
+            "time": time.strftime("%H:%M:%S"),
+            "unit": service_name,
+            "message": log_data,
+        }
+
+    timestamp = journal_entry.get("__REALTIME_TIMESTAMP", "")
+    if timestamp:
+        try:
+            ts = int(timestamp) / 1000000  # Convert from microseconds
+            formatted_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+        except Exception:
+            formatted_time = timestamp
+    else:
+        formatted_time = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    return {
+        "time": formatted_time,
+        "unit": journal_entry.get("_SYSTEMD_UNIT", service_name),
+        "message": journal_entry.get("MESSAGE", ""),
+    }
+
+
+class _Subscriber:
+    def __init__(self, on_line: LineCallback, on_event: Optional[EventCallback]):
+        self.on_line = on_line
+        self.on_event = on_event
+
+
+class _ServiceStream:
+    """One upstream ``logs_stream`` for a service shared by all its viewers"""
+
+    def __init__(self, service: str, replay_size: int):
+        self.service = service
+        self.subscribers: List[_Subscriber] = []
+        self.replay: Deque[dict] = deque(maxlen=replay_size)
+        self.stream_id: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class LogStreamHub:
+    """Multiplex journal log streams from the agent across viewers.
+
+    The first subscriber for a service opens the upstream stream, later
+    subscribers share it and get the bounded replay buffer immediately, and
+    the upstream is stopped when the last subscriber leaves.
+    """
+
+    def __init__(self, replay_size: int = 500):
+        self.replay_size = replay_size
+        self._streams: Dict[str, _ServiceStream] = {}
+
+    def subscribe(self, service: str, on_line: LineCallback,
+                  on_event: Optional[EventCallback] = None) -> Callable[[], None]:
+        """Subscribe to a service's log lines and return the unsubscribe function"""
+        stream = self._streams.get(service)
+        if stream is None:
+            stream = _ServiceStream(service, self.replay_size)
+            self._streams[service] = stream
+            stream.task = asyncio.create_task(self._run(stream))
+        elif stream.stream_id and on_event:
+            on_event("started", f"Log streaming started for {service}")
+
+        subscriber = _Subscriber(on_line, on_event)
+        stream.subscribers.append(subscriber)
+        for entry in list(stream.replay):
+            on_line(entry)
+
+        def unsubscribe():
+            self._unsubscribe(stream, subscriber)
+
+        return unsubscribe
+
+    def get_stats(self) -> dict:
+        return {
+            service: {
+                "subscribers": len(stream.subscribers),
+                "buffered": len(stream.replay),
+                "stream_id": stream.stream_id,
+            }
+            for service, stream in self._streams.items()
+        }
+
+    def _unsubscribe(self, stream: _ServiceStream, subscriber: _Subscriber):
+        if subscriber in stream.subscribers:
+            stream.subscribers.remove(subscriber)
+        if not stream.subscribers and self._streams.get(stream.service) is stream:
+            self._close(stream)
+
+    def _close(self, stream: _ServiceStream):
+        self._streams.pop(stream.service, None)
+        if stream.task is not None and not stream.task.done():
+            stream.task.cancel()
+        if stream.stream_id:
+            asyncio.ensure_future(agent_client.acall("logs_stop", stream_id=stream.stream_id))
+        logger.info(f"Closed log stream for {stream.service}")
+
+    def _emit_event(self, stream: _ServiceStream, kind: str, message: str):
+        for subscriber in list(stream.subscribers):
+            if subscriber.on_event:
+                try:
+                    subscriber.on_event(kind, message)
+                except Exception as e:
+                    logger.warning(f"Log stream event listener failed: {e}")
+
+    def _emit_line(self, stream: _ServiceStream, entry: dict):
+        stream.replay.append(entry)
+        for subscriber in list(stream.subscribers):
+            try:
+                subscriber.on_line(entry)
+            except Exception as e:
+                logger.warning(f"Log stream line listener failed: {e}")
+
+    async def _run(self, stream: _ServiceStream):
+        writer = None
+        try:
+            reader, writer = await agent_client.open_stream("logs_stream", service=stream.service)
+
+            # Initial response carries the stream id
+            initial_data = json.loads(await reader.readline() or b"{}")
+            if not initial_data.get("success"):
+                self._emit_event(stream, "error", f"Failed to start log stream: {initial_data.get('message', 'Unknown error')}")
+                return
+            stream.stream_id = initial_data.get("stream_id")
+            self._emit_event(stream, "started", f"Log streaming started for {stream.service}")
+            logger.info(f"Opened log stream {stream.stream_id} for {stream.service}")
+
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    log_entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                command = log_entry.get("command")
+                if command == "logs_data":
+                    log_data = log_entry.get("data", "")
+                    if log_data:
+                        self._emit_line(stream, parse_journal_line(stream.service, log_data))
+                elif command == "logs_stream_ended":
+                    break
+
+            self._emit_event(stream, "ended", "Log streaming ended")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in log streaming for {stream.service}: {e}")
+            self._emit_event(stream, "error", f"Error in log streaming: {e}")
+        finally:
+            if writer is not None:
+                writer.close()
+            # Drop a finished upstream so the next subscriber starts a fresh one
+            if self._streams.get(stream.service) is stream:
+                self._streams.pop(stream.service, None)
+
+
+log_stream_hub = LogStreamHub(replay_size=int(os.getenv('LOG_STREAM_REPLAY_SIZE', '500')))
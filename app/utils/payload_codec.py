@@ -0,0 +1,189 @@
+import io
+import os
+import zlib
+from typing import Any, AsyncIterator, Callable, Iterator
+from fastapi import HTTPException
+
+# Upper bound for a decompressed request body, protects against zip bombs
+MAX_BODY_SIZE = int(os.getenv('INGEST_MAX_BODY_SIZE', str(64 * 1024 * 1024)))
+
+# Longest accepted NDJSON record
+MAX_LINE_SIZE = int(os.getenv('INGEST_MAX_LINE_SIZE', str(1024 * 1024)))
+
+# Upper bound for the decompressed size of a streamed (gzip / zstd) body
+MAX_STREAM_SIZE = int(os.getenv('INGEST_MAX_STREAM_SIZE', str(1024 * 1024 * 1024)))
+
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def decode_body(body: bytes, content_encoding: str = "", max_size: int = MAX_BODY_SIZE) -> bytes:
+    """Undo the request Content-Encoding (identity, gzip, deflate or zstd)"""
+    encoding = (content_encoding or "identity").strip().lower()
+    if encoding in ("", "identity"):
+        data = body
+    elif encoding in ("gzip", "x-gzip", "deflate"):
+        # wbits 32+ auto-detects gzip and zlib headers
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+        try:
+            data = decompressor.decompress(body, max_size + 1)
+        except zlib.error as e:
+            raise HTTPException(status_code=400, detail=f"Invalid {encoding} body: {e}") from e
+    elif encoding == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise HTTPException(status_code=415, detail="zstd bodies require the 'zstandard' package") from e
+        try:
+            reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(body))
+            data = reader.read(max_size + 1)
+        except zstandard.ZstdError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid zstd body: {e}") from e
+    else:
+        raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding: {encoding}")
+
+    if len(data) > max_size:
+        raise HTTPException(status_code=413, detail="Decompressed body too large")
+    return data
+
+
+def is_msgpack(content_type: str) -> bool:
+    return (content_type or "").split(";")[0].strip().lower() in MSGPACK_CONTENT_TYPES
+
+
+def unpack_msgpack(data: bytes) -> Any:
+    """Decode a msgpack document into plain Python objects"""
+    try:
+        import msgpack
+    except ImportError as e:
+        raise HTTPException(status_code=415, detail="msgpack bodies require the 'msgpack' package") from e
+    try:
+        # Native msgpack timestamps come back as datetime objects
+        return msgpack.unpackb(data, raw=False, timestamp=3)
+    except (ValueError, msgpack.UnpackException) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid msgpack body: {e}") from e
+
+
+# Largest piece of decompressed output handled at once while streaming
+STREAM_PIECE_SIZE = 64 * 1024
+
+# Compressed bytes fed to the zstd decompressor per call, and the most output
+# one such slice may expand to (only reached by decompression bombs)
+ZSTD_INPUT_SLICE = 4 * 1024
+ZSTD_SLICE_OUTPUT_LIMIT = 256 * STREAM_PIECE_SIZE
+
+
+class _PieceSink:
+    """zstd stream_writer target collecting decompressed pieces until taken"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.pieces = []
+        self.pending = 0
+
+    def write(self, data) -> int:
+        self.pending += len(data)
+        if self.pending > self.limit:
+            raise HTTPException(status_code=413, detail="Decompressed body too large")
+        self.pieces.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> list:
+        pieces, self.pieces, self.pending = self.pieces, [], 0
+        return pieces
+
+
+def _stream_decompressor(content_encoding: str, max_size: int = MAX_STREAM_SIZE) -> Callable[[bytes], Iterator[bytes]]:
+    """Return a function turning each body chunk into bounded decompressed pieces"""
+    encoding = (content_encoding or "identity").strip().lower()
+    if encoding in ("", "identity"):
+        return lambda chunk: iter((chunk,))
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+
+        def pieces(chunk: bytes) -> Iterator[bytes]:
+            data = decompressor.decompress(chunk, STREAM_PIECE_SIZE)
+            yield data
+            while decompressor.unconsumed_tail:
+                yield decompressor.decompress(decompressor.unconsumed_tail, STREAM_PIECE_SIZE)
+    elif encoding == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise HTTPException(status_code=415, detail="zstd bodies require the 'zstandard' package") from e
+        # decompressobj() has no output bound, a stream_writer hands the
+        # output over in STREAM_PIECE_SIZE pieces as it is produced
+        sink = _PieceSink(ZSTD_SLICE_OUTPUT_LIMIT)
+        writer = zstandard.ZstdDecompressor().stream_writer(sink, write_size=STREAM_PIECE_SIZE)
+
+        def pieces(chunk: bytes) -> Iterator[bytes]:
+            for start in range(0, len(chunk), ZSTD_INPUT_SLICE):
+                writer.write(chunk[start:start + ZSTD_INPUT_SLICE])
+                yield from sink.take()
+    else:
+        raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding: {encoding}")
+
+    total = 0
+
+    def inflate(chunk: bytes) -> Iterator[bytes]:
+        nonlocal total
+        for data in pieces(chunk):
+            total += len(data)
+            if total > max_size:
+                raise HTTPException(status_code=413, detail="Decompressed body too large")
+            yield data
+
+    return inflate
+
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes], content_encoding: str = "",
+                            max_line_size: int = MAX_LINE_SIZE) -> AsyncIterator[bytes]:
+    """
+    Split a (possibly compressed) streamed body into NDJSON lines.
+
+    Only the current partial line is buffered. The body is pulled as lines are
+    consumed, so a slow consumer slows the sender down instead of growing
+    memory. Oversized lines are skipped and yielded as empty bytes so the
+    caller can count them as rejected.
+    """
+    decompress = _stream_decompressor(content_encoding)
+    buffer = b""
+    skipping = False
+    async for chunk in chunks:
+        pieces = decompress(chunk)
+        while True:
+            try:
+                data = next(pieces)
+            except StopIteration:
+                break
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Invalid {content_encoding} body: {e}") from e
+            start = 0
+            while True:
+                end = data.find(b"\n", start)
+                if end == -1:
+                    if not skipping:
+                        buffer += data[start:]
+                        if len(buffer) > max_line_size:
+                            buffer = b""
+                            skipping = True
+                    break
+                if skipping:
+                    skipping = False
+                    yield b""
+                else:
+                    line = buffer + data[start:end]
+                    buffer = b""
+                    if len(line) > max_line_size:
+                        yield b""
+                    elif line.strip():
+                        yield line
+                start = end + 1
+    if skipping:
+        yield b""
+    elif buffer.strip():
+        yield buffer
@@ -0,0 +1,178 @@
+import os
+import math
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+from ..core.logging_config import get_logger
+
+logger = get_logger("app.rate_limiter")
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, at most ``burst`` stored"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        # ``now`` may be read just before the bucket was created
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """
+        Seconds until ``amount`` tokens are available, 0 when they are now.
+        An amount above the burst only needs a full bucket; taking it leaves
+        the bucket negative, and that debt is paid back before the next take.
+        """
+        self._refill(now)
+        amount = min(amount, self.burst)
+        if amount <= self.tokens:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= amount
+
+
+class RateLimited(Exception):
+    """Raised when an ingest request has to be retried later"""
+
+    def __init__(self, reason: str, retry_after: float, suggested_batch_size: int, suggested_interval: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+        self.suggested_batch_size = suggested_batch_size
+        self.suggested_interval = suggested_interval
+
+    def to_dict(self) -> dict:
+        return {
+            "reason": self.reason,
+            "retry_after": math.ceil(self.retry_after),
+            "suggested_batch_size": self.suggested_batch_size,
+            "suggested_interval": math.ceil(self.suggested_interval),
+        }
+
+
+class IngestRateLimiter:
+    """
+    Token-bucket limits on ingested log lines per agent and per project,
+    plus a cap on concurrently processed ingest requests.
+
+    A request is admitted only when every bucket it touches has enough
+    tokens, and then takes from all of them at once, so a rejected request
+    costs nothing. Rejections carry a Retry-After and a batch size / report
+    interval the agent can switch to so it stays under its limit. A rate of
+    0 disables that limit.
+    """
+
+    def __init__(self, agent_rate: float = 2000, project_rate: float = 1000,
+                 burst_seconds: float = 10, max_in_flight: int = 8,
+                 report_interval: float = 30, max_buckets: int = 10000):
+        self.agent_rate = agent_rate
+        self.project_rate = project_rate
+        self.burst_seconds = burst_seconds
+        self.max_in_flight = max_in_flight
+        self.report_interval = report_interval
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+        self._rejections: Dict[str, int] = {}
+        self._admitted = 0
+        self._lines = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _bucket(self, key: Hashable, rate: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(rate, rate * self.burst_seconds)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _reject(self, reason: str, key: str, retry_after: float, rate: float) -> RateLimited:
+        self._rejections[key] = self._rejections.get(key, 0) + 1
+        # The most the agent can send per report without tripping the limit again
+        interval = max(self.report_interval, retry_after)
+        batch_size = int(min(rate * interval, rate * self.burst_seconds)) if rate else 0
+        return RateLimited(reason, max(retry_after, 1), max(batch_size, 1), interval)
+
+    def acquire(self, peer: str, lines_by_project: Dict[int, int], label: Optional[str] = None):
+        """
+        Admit one ingest request or raise RateLimited; pair with ``release``.
+
+        The agent bucket is keyed on ``peer``, the sender's address; ``label``
+        only names the agent in log messages.
+        """
+        total = sum(lines_by_project.values())
+        with self._lock:
+            if self.max_in_flight and self._in_flight >= self.max_in_flight:
+                raise self._reject("ingest queue saturated", "saturated", 1, self.agent_rate)
+
+            now = time.monotonic()
+            checks = []
+            if self.agent_rate and total:
+                checks.append((f"agent {peer}", ("agent", peer), self.agent_rate, total))
+            if self.project_rate:
+                checks.extend(
+                    (f"project {project_id}", ("project", project_id), self.project_rate, lines)
+                    for project_id, lines in lines_by_project.items() if lines
+                )
+            buckets = []
+            for label, key, rate, amount in checks:
+                bucket = self._bucket(key, rate)
+                wait = bucket.wait_time(amount, now)
+                if wait:
+                    error = self._reject(f"{label} over {rate:g} lines/s", key[0], wait, rate)
+                    logger.warning(f"Ingest from {label or peer} rate limited: {error.reason}")
+                    raise error
+                buckets.append((bucket, amount))
+            for bucket, amount in buckets:
+                bucket.take(amount)
+            self._in_flight += 1
+            self._admitted += 1
+            self._lines += total
+
+    def release(self):
+        with self._lock:
+            self._in_flight = max(self._in_flight - 1, 0)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            buckets = []
+            for (kind, key), bucket in self._buckets.items():
+                bucket._refill(now)
+                buckets.append({
+                    "kind": kind,
+                    "key": key,
+                    "rate": bucket.rate,
+                    "tokens": round(bucket.tokens, 1),
+                    "burst": bucket.burst,
+                })
+            return {
+                "agent_rate": self.agent_rate,
+                "project_rate": self.project_rate,
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self._in_flight,
+                "admitted": self._admitted,
+                "lines": self._lines,
+                "rejections": dict(self._rejections),
+                "buckets": buckets,
+            }
+
+
+ingest_limiter = IngestRateLimiter(
+    agent_rate=float(os.getenv('INGEST_AGENT_LINES_PER_SEC', '2000')),
+    project_rate=float(os.getenv('INGEST_PROJECT_LINES_PER_SEC', '1000')),
+    burst_seconds=float(os.getenv('INGEST_BURST_SECONDS', '10')),
+    max_in_flight=int(os.getenv('INGEST_MAX_IN_FLIGHT', '8')),
+    report_interval=float(os.getenv('AGENT_REPORT_INTERVAL', '30')),
+)
@@ -1,6 +1,24 @@
-from datetime import datetime, timezone
+from datetime import datetime, timezone, tzinfo
+from functools import lru_cache
 import pytz
-from typing import Optional
+from typing import Iterable, List, Optional, Sequence
+
+
+@lru_cache(maxsize=None)
+def get_tzinfo(user_timezone: str) -> Optional[tzinfo]:
+    """
+    Get the tzinfo object for a timezone name, cached per name
+    
+    Args:
+        user_timezone: Timezone string (e.g., 'Asia/Jakarta')
+    
+    Returns:
+        tzinfo object, or None if the timezone is unknown
+    """
+    try:
+        return pytz.timezone(user_timezone)
+    except pytz.exceptions.UnknownTimeZoneError:
+        return None
 
 
 def convert_utc_to_user_timezone(utc_datetime: datetime, user_timezone: str) -> datetime:
@@ -21,12 +39,53 @@ def convert_utc_to_user_timezone(utc_datetime: datetime, user_timezone: str) ->
     if utc_datetime.tzinfo is None:
         utc_datetime = utc_datetime.replace(tzinfo=timezone.utc)
     
-    try:
-        user_tz = pytz.timezone(user_timezone)
-        return utc_datetime.astimezone(user_tz)
-    except pytz.exceptions.UnknownTimeZoneError:
+    user_tz = get_tzinfo(user_timezone)
+    if user_tz is None:
         # Fallback to UTC if timezone is invalid
         return utc_datetime
+    return utc_datetime.astimezone(user_tz)
+
+
+def convert_fields_to_user_timezone(items: Iterable, fields: Sequence[str], user_timezone: str) -> List:
+    """
+    Convert datetime attributes of a whole result page to user's timezone
+    
+    Args:
+        items: Objects (e.g. response models) whose attributes are converted in place
+        fields: Names of the datetime attributes to convert
+        user_timezone: User's timezone string
+    
+    Returns:
+        The items as a list
+    """
+    items = list(items)
+    user_tz = get_tzinfo(user_timezone) or timezone.utc
+    for item in items:
+        for field in fields:
+            value = getattr(item, field, None)
+            if value is None:
+                continue
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            setattr(item, field, value.astimezone(user_tz))
+    return items
+
+
+def to_utc_epoch_ms(utc_datetime: Optional[datetime]) -> Optional[int]:
+    """
+    Convert a UTC datetime to epoch milliseconds for browser-side formatting
+    
+    Args:
+        utc_datetime: datetime object in UTC (naive values are treated as UTC)
+    
+    Returns:
+        Milliseconds since the epoch, or None
+    """
+    if not utc_datetime:
+        return None
+    if utc_datetime.tzinfo is None:
+        utc_datetime = utc_datetime.replace(tzinfo=timezone.utc)
+    return int(utc_datetime.timestamp() * 1000)
 
 
 def convert_user_timezone_to_utc(local_datetime: datetime, user_timezone: str) -> datetime:
@@ -43,19 +102,18 @@ def convert_user_timezone_to_utc(local_datetime: datetime, user_timezone: str) -
     if not local_datetime:
         return local_datetime
     
-    try:
-        user_tz = pytz.timezone(user_timezone)
-        
-        # If datetime is naive, localize it to user's timezone
-        if local_datetime.tzinfo is None:
-            local_datetime = user_tz.localize(local_datetime)
-        
-        return local_datetime.astimezone(timezone.utc)
-    except pytz.exceptions.UnknownTimeZoneError:
+    user_tz = get_tzinfo(user_timezone)
+    if user_tz is None:
         # Fallback: assume it's already UTC
         if local_datetime.tzinfo is None:
             return local_datetime.replace(tzinfo=timezone.utc)
         return local_datetime
+    
+    # If datetime is naive, localize it to user's timezone
+    if local_datetime.tzinfo is None:
+        local_datetime = user_tz.localize(local_datetime)
+    
+    return local_datetime.astimezone(timezone.utc)
 
 
 def get_user_timezone_from_session(session_data: dict) -> str:
@@ -0,0 +1,54 @@
+import time
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """Small thread-safe cache whose entries expire after ``ttl`` seconds.
+
+    ``get_or_compute`` runs the loader at most once per key at a time, so
+    concurrent viewers of the same page share a single computation. Writers
+    call ``invalidate`` to drop stale entries before the TTL runs out.
+    """
+
+    def __init__(self, ttl: float = 5.0):
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._generation = 0
+
+    def get_or_compute(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        entry = self._fresh(key)
+        if entry is not None:
+            return entry[1]
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Another caller may have filled it while we waited
+            entry = self._fresh(key)
+            if entry is not None:
+                return entry[1]
+            generation = self._generation
+            value = loader()
+            with self._lock:
+                # Don't store a value computed before an invalidation
+                if generation == self._generation:
+                    self._entries[key] = (time.monotonic() + self.ttl, value)
+            return value
+
+    def invalidate(self, key: Hashable = None):
+        """Drop one entry, or every entry when no key is given"""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _fresh(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry
+        return None
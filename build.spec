@@ -96,6 +96,8 @@ a = Analysis(
         
         # 🎯 Data serialization
         'orjson',
+        'msgpack',
+        'zstandard',
         'pyyaml',
         'python_multipart',
         
@@ -0,0 +1,81 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from app.api import route
+from app.utils.rate_limiter import RateLimited
+
+
+class _Socket:
+    headers = {}
+    client = SimpleNamespace(host="10.0.0.1")
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+def _log_frame(seq: int) -> dict:
+    return {"type": "log", "seq": seq, "project_id": 1, "level": "INFO", "message": f"line {seq}", "timestamp": "2025-01-01T00:00:00"}
+
+
+def test_rate_limited_log_frames_stay_buffered(monkeypatch):
+    limited = [True]
+    stored = []
+
+    @asynccontextmanager
+    async def slot(peer, lines_by_project, max_wait=0, label=None):
+        if limited[0]:
+            raise RateLimited("agent over limit", 5, 10, 30)
+        yield
+
+    monkeypatch.setattr(route, "ingest_slot", slot)
+    monkeypatch.setattr(route, "store_project_log_chunk", lambda chunk: stored.extend(chunk.entries) or len(chunk.entries))
+
+    async def run():
+        channel = route.AgentChannel(_Socket())
+        for seq in (1, 2):
+            await channel.handle(_log_frame(seq))
+            channel.last_seq = seq
+            channel.unacked += 1
+        await channel.ack()
+        limited[0] = False
+        channel.unacked = 1
+        await channel.ack()
+        return channel.websocket.sent
+
+    nack, ack = asyncio.run(run())
+    assert nack["type"] == "nack" and nack["pending"] == [1, 2] and nack["failed"] == []
+    assert ack == {"type": "ack", "seq": 2, "count": 1, "errors": []}
+    assert [entry.message for entry in stored] == ["line 1", "line 2"]
+
+
+def test_failed_log_chunk_is_nacked(monkeypatch):
+    @asynccontextmanager
+    async def slot(peer, lines_by_project, max_wait=0, label=None):
+        yield
+
+    def fail(chunk):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(route, "ingest_slot", slot)
+    monkeypatch.setattr(route, "store_project_log_chunk", fail)
+
+    async def run():
+        channel = route.AgentChannel(_Socket())
+        await channel.handle(_log_frame(7))
+        channel.last_seq = 7
+        channel.unacked = 1
+        await channel.ack()
+        return channel.websocket.sent
+
+    (nack,) = asyncio.run(run())
+    assert nack["failed"] == [7] and nack["pending"] == [] and nack["error"] == "disk full"
+
+
+def test_agent_header_only_labels_the_peer():
+    socket = _Socket()
+    socket.headers = {"x-agent-id": "web-1"}
+    assert route._agent_source(socket) == ("10.0.0.1", "web-1 (10.0.0.1)")
+    assert route._agent_source(_Socket()) == ("10.0.0.1", "10.0.0.1")
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+from app.utils.broadcast import Broadcaster
+
+
+def test_publish_runs_each_callback_on_its_own_loop():
+    broadcaster = Broadcaster()
+    received = {}
+    done = threading.Barrier(3)
+    ready = threading.Barrier(3)
+
+    def run_loop(name):
+        async def main():
+            delivered = asyncio.Event()
+
+            def callback(value):
+                received[name] = (value, threading.current_thread().name)
+                delivered.set()
+
+            broadcaster.subscribe(callback)
+            await asyncio.to_thread(ready.wait)
+            await asyncio.wait_for(delivered.wait(), 5)
+
+        asyncio.run(main())
+        done.wait()
+
+    threads = [threading.Thread(target=run_loop, args=(name,), name=name) for name in ("first", "second")]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    broadcaster.publish(42)
+    done.wait()
+    for thread in threads:
+        thread.join()
+
+    assert received == {"first": (42, "first"), "second": (42, "second")}
+
+
+def test_listeners_of_closed_loops_are_dropped():
+    broadcaster = Broadcaster()
+
+    async def subscribe():
+        broadcaster.subscribe(lambda value: None)
+
+    asyncio.run(subscribe())
+    broadcaster.publish(1)
+    assert broadcaster.subscriber_count == 0
@@ -0,0 +1,22 @@
+from app.utils.entity_cache import EntityCache
+
+
+def test_get_or_load_hits_before_any_bump():
+    cache = EntityCache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return "value"
+
+    assert [cache.get_or_load("projects", "all", loader) for _ in range(3)] == ["value"] * 3
+    assert len(calls) == 1
+    assert cache.get_stats()["projects"]["hits"] == 2
+
+
+def test_bump_invalidates_cached_value():
+    cache = EntityCache()
+    cache.get_or_load("projects", "all", lambda: "old")
+    cache.bump("projects", changed=[1])
+    assert cache.get_or_load("projects", "all", lambda: "new") == "new"
+    assert cache.get_or_load("projects", "all", lambda: "unused") == "new"
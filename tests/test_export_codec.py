@@ -0,0 +1,32 @@
+import csv
+import gzip
+import io
+import sys
+from datetime import datetime
+import pytest
+from fastapi import HTTPException
+from app.utils.export_codec import check_export_format, encode_export
+
+COLUMNS = {"id": int, "message": str, "log_time": datetime}
+ROWS = [{"id": i, "message": f"line, {i}", "log_time": datetime(2025, 1, 1, 0, 0, i)} for i in range(5)]
+
+
+def test_csv_export_is_gzipped_on_the_fly():
+    data = b"".join(encode_export(iter(ROWS), COLUMNS, "csv", compress=True, chunk_rows=2))
+    lines = list(csv.reader(io.StringIO(gzip.decompress(data).decode())))
+    assert lines[0] == ["id", "message", "log_time"]
+    assert lines[1] == ["0", "line, 0", "2025-01-01T00:00:00"]
+    assert len(lines) == 6
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        check_export_format("xml")
+    assert error.value.status_code == 400
+
+
+def test_parquet_without_pyarrow_is_not_implemented(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(HTTPException) as error:
+        check_export_format("parquet")
+    assert error.value.status_code == 501
@@ -0,0 +1,89 @@
+import threading
+import time
+import pytest
+from datetime import datetime, timezone
+from app.schemas.monitoring_schema import MonitoringData
+from app.services import monitoring_service
+from app.services.ingest_batch_service import BatchInFlight, RecentBatchIndex
+
+
+def _report(batch_id: str) -> MonitoringData:
+    now = datetime.now(timezone.utc)
+    return MonitoringData(
+        timestamp=now,
+        logs={},
+        system_metrics={"timestamp": now, "cpu_percent": 1, "memory_percent": 2, "memory_available": 3, "disk_usage": {}},
+        services=[],
+        batch_id=batch_id,
+    )
+
+
+def _fresh_index(monkeypatch) -> RecentBatchIndex:
+    index = RecentBatchIndex()
+    index._loaded = True
+    monkeypatch.setattr(monitoring_service, "recent_batches", index)
+    return index
+
+
+def test_concurrent_retry_waits_and_gets_the_stored_result(monkeypatch):
+    index = _fresh_index(monkeypatch)
+    calls = []
+
+    def ingest(db, data):
+        calls.append(data.batch_id)
+        time.sleep(0.2)
+        index.remember(data.batch_id)
+        return {"system_metric_id": 7, "log_ids": [1, 2], "logs_received": 2, "logs_inserted": 2,
+                "workers_updated": 0, "created_alarms": ["alarm"], "duplicate": False}
+
+    monkeypatch.setattr(monitoring_service, "_ingest_report", ingest)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(monitoring_service.ingest_monitoring_data(None, _report("b1"))))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["b1"]
+    original, duplicate = results
+    assert original["duplicate"] is False
+    assert duplicate["duplicate"] is True
+    assert duplicate["system_metric_id"] == 7 and duplicate["log_ids"] == [1, 2]
+    assert duplicate["created_alarms"] == []
+
+
+def test_failed_report_can_be_retried(monkeypatch):
+    _fresh_index(monkeypatch)
+    calls = []
+
+    def ingest(db, data):
+        calls.append(data.batch_id)
+        if len(calls) == 1:
+            raise RuntimeError("metric insert failed")
+        return {"system_metric_id": 1, "log_ids": [], "logs_received": 0, "logs_inserted": 0,
+                "workers_updated": 0, "created_alarms": [], "duplicate": False}
+
+    monkeypatch.setattr(monitoring_service, "_ingest_report", ingest)
+    try:
+        monitoring_service.ingest_monitoring_data(None, _report("b2"))
+    except RuntimeError:
+        pass
+    assert monitoring_service.ingest_monitoring_data(None, _report("b2"))["duplicate"] is False
+    assert calls == ["b2", "b2"]
+
+
+def test_retry_of_a_slow_report_times_out(monkeypatch):
+    index = _fresh_index(monkeypatch)
+    index.claim_timeout = 0.1
+    assert index.claim("b3")
+    started = time.monotonic()
+    with pytest.raises(BatchInFlight):
+        monitoring_service.ingest_monitoring_data(None, _report("b3"))
+    assert time.monotonic() - started < 1
+    # Released without storing, so the next retry may store it
+    index.release("b3")
+    assert index.claim("b3")
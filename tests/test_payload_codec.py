@@ -0,0 +1,34 @@
+import asyncio
+import gzip
+import pytest
+import zstandard
+from fastapi import HTTPException
+from app.utils.payload_codec import iter_ndjson_lines
+
+
+async def _collect(body: bytes, encoding: str, chunk_size: int = 1000) -> list:
+    async def chunks():
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+    return [line async for line in iter_ndjson_lines(chunks(), encoding)]
+
+
+@pytest.mark.parametrize("encoding,compress", [
+    ("gzip", gzip.compress),
+    ("zstd", lambda data: zstandard.ZstdCompressor().compress(data)),
+])
+def test_streamed_body_is_decompressed(encoding, compress):
+    body = b"".join(b'{"n": %d}\n' % i for i in range(5000))
+    lines = asyncio.run(_collect(compress(body), encoding))
+    assert lines == body.splitlines()
+
+
+def test_zstd_bomb_is_rejected_in_bounded_pieces():
+    compressor = zstandard.ZstdCompressor(level=19).compressobj()
+    block = b"\n" * (1024 * 1024)
+    bomb = b"".join(compressor.compress(block) for _ in range(512)) + compressor.flush()
+    assert len(bomb) < 64 * 1024
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(_collect(bomb, "zstd", chunk_size=len(bomb)))
+    assert error.value.status_code == 413
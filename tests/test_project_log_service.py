@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from app.models.project import Project
+from app.schemas.project_log_schema import ProjectLogCreate
+from app.services.project_log_service import create_project_logs_batch, get_log_project_block
+
+
+def _add_logs(db, count: int):
+    db.add(Project(id=1, name="api"))
+    start = datetime(2025, 1, 1)
+    create_project_logs_batch(db, [
+        ProjectLogCreate(project_id=1, log_level="INFO", message=f"line {i}", log_time=start + timedelta(seconds=i // 2))
+        for i in range(count)
+    ])
+    db.commit()
+
+
+def _walk_by_cursor(db, limit: int) -> list:
+    ids, cursor = [], None
+    while True:
+        block = get_log_project_block(db, 1, cursor=cursor, limit=limit, user_timezone=None)
+        ids += [log.id for log in block.data]
+        cursor = block.next_cursor
+        if not cursor:
+            return ids
+
+
+def test_offset_blocks_match_the_cursor_walk(db):
+    _add_logs(db, 95)
+    expected = _walk_by_cursor(db, 20)
+
+    blocks = [
+        [log.id for log in get_log_project_block(db, 1, offset=offset, limit=20, user_timezone=None).data]
+        for offset in range(0, 100, 20)
+    ]
+
+    assert len(expected) == 95
+    assert [log_id for block in blocks for log_id in block] == expected
+    assert blocks[-1] == expected[80:]
+
+
+def test_offset_block_keeps_filters(db):
+    _add_logs(db, 30)
+    block = get_log_project_block(db, 1, {"message__like": "line 2"}, offset=5, limit=10, user_timezone=None)
+    assert [log.message for log in block.data] == ["line 24", "line 23", "line 22", "line 21", "line 20", "line 2"]
@@ -0,0 +1,29 @@
+import pytest
+from app.utils.rate_limiter import IngestRateLimiter, RateLimited, TokenBucket
+
+
+def test_amount_above_burst_waits_for_a_full_bucket():
+    bucket = TokenBucket(rate=10, burst=100)
+    assert bucket.wait_time(500, bucket.updated) == 0
+    bucket.take(500)
+    # The 400 token debt plus a full bucket again
+    assert bucket.wait_time(500, bucket.updated) == pytest.approx(50)
+
+
+def test_report_larger_than_burst_is_admitted_then_throttled():
+    limiter = IngestRateLimiter(agent_rate=10, project_rate=0, burst_seconds=10)
+    limiter.acquire("agent", {1: 1000})
+    limiter.release()
+    with pytest.raises(RateLimited) as error:
+        limiter.acquire("agent", {1: 1})
+    assert error.value.retry_after == pytest.approx(90, abs=1)
+
+
+def test_agent_bucket_is_keyed_on_the_peer_not_the_label():
+    limiter = IngestRateLimiter(agent_rate=10, project_rate=0, burst_seconds=10)
+    limiter.acquire("10.0.0.1", {1: 100}, "agent-a (10.0.0.1)")
+    limiter.release()
+    # A new X-Agent-Id from the same address does not get a fresh bucket
+    with pytest.raises(RateLimited):
+        limiter.acquire("10.0.0.1", {1: 100}, "agent-b (10.0.0.1)")
+    limiter.acquire("10.0.0.2", {1: 100}, "agent-a (10.0.0.2)")
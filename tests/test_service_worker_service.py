@@ -0,0 +1,19 @@
+from app.models.service_worker import ServiceWorker
+from app.services.service_worker_service import delete_worker
+from app.utils.entity_cache import entity_cache, WORKERS
+
+
+def test_delete_worker_records_deletion(db):
+    worker = ServiceWorker(name="nginx", status="active")
+    db.add(worker)
+    db.commit()
+    since = entity_cache.version(WORKERS)
+
+    assert delete_worker(db, worker.id) is True
+
+    assert db.query(ServiceWorker).count() == 0
+    assert entity_cache.changes_since(WORKERS, since) == (set(), {worker.id})
+
+
+def test_delete_missing_worker_returns_false(db):
+    assert delete_worker(db, 123) is False
@@ -0,0 +1,31 @@
+from types import SimpleNamespace
+from app.models.threshold import ThresholdCondition
+from app.services import threshold_monitor as monitor_module
+from app.services.threshold_monitor import ThresholdMonitor
+
+
+class _Rates:
+    """Error rate counter stand-in: project 1 has no history yet"""
+
+    def projects(self):
+        return [1, 2]
+
+    def per_minute(self, project_id, minutes):
+        return None if project_id == 1 else [9] * minutes
+
+
+def test_error_rate_alarm_skips_projects_without_history(monkeypatch):
+    monkeypatch.setattr(monitor_module, "log_error_rates", _Rates())
+    monitor = ThresholdMonitor()
+    alarmed = []
+    monkeypatch.setattr(
+        monitor, "_create_log_error_rate_alarm",
+        lambda db, threshold, project_id, rates: alarmed.append(project_id) or SimpleNamespace(id=1),
+    )
+    threshold = SimpleNamespace(
+        id=1, name="errors", source_filter="", duration_minutes=5,
+        threshold_value=5, condition=ThresholdCondition.GREATER_THAN,
+    )
+
+    assert monitor._check_log_error_rate_threshold(None, threshold) is not None
+    assert alarmed == [2]